@@ -0,0 +1,157 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Callable, Optional
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gdk", "3.0")
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+gi.require_version("Libxfce4windowing", "0.0")
+from gi.repository import Gtk, Gdk, Gio, GLib, Libxfce4windowing
+
+SCREEN_SAVER_INTERFACES: tuple[str, ...] = (
+    "org.freedesktop.ScreenSaver",
+    "org.gnome.ScreenSaver",
+)
+
+
+class ActivityMonitor:
+    """
+    Tells whether the applet can be seen at all.
+
+    The applet is suspended when the screen is locked, or when every watched panel
+    is either hidden (unmapped, e.g. auto-hidden) or covered by the fullscreen
+    active window. While suspended, animations, timers and prefetching should stop.
+
+    Suspension is reported right away, the resume is reported to all
+    the callbacks from a single idle, so that the refreshes are batched.
+
+    There is one shared instance, use ActivityMonitor.get_default()
+    """
+
+    _default: Optional["ActivityMonitor"] = None
+
+    def __init__(self):
+        self.suspended: bool = False
+        self._callbacks: dict[int, Callable[[bool], None]] = {}
+        self._next_callback_id: int = 0
+        self._resume_idle_id: Optional[int] = None
+
+        self._panels: set[Gtk.Widget] = set()
+        self._screen_locked: bool = False
+        self._fullscreen_window: Optional[Libxfce4windowing.Window] = None
+        self._active_window: Optional[Libxfce4windowing.Window] = None
+        self._active_window_handler_id: Optional[int] = None
+
+        self._screen: Libxfce4windowing.Screen = (
+            Libxfce4windowing.Screen.get_default()
+        )
+        self._screen.connect("active-window-changed", self._active_window_changed)
+        self._active_window_changed(self._screen, None)
+
+        session_bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        for interface in SCREEN_SAVER_INTERFACES:
+            session_bus.signal_subscribe(
+                None,  # Sender
+                interface,  # Interface
+                "ActiveChanged",  # Member
+                None,  # Object path
+                None,  # Arg0
+                Gio.DBusSignalFlags.NONE,  # Flags
+                self._screen_saver_active_changed,  # Callback function
+            )
+
+    @classmethod
+    def get_default(cls) -> "ActivityMonitor":
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def watch_panel(self, widget: Gtk.Widget) -> None:
+        """watch the visibility of the panel the widget (the applet) is in"""
+        self._panels.add(widget)
+        widget.connect("map", lambda _: self._update())
+        widget.connect("unmap", lambda _: self._update())
+        widget.connect("destroy", self._panel_destroyed)
+        self._update()
+
+    def add_callback(self, callback: Callable[[bool], None]) -> int:
+        """callback(suspended) is called when the suspension changes, returns its id"""
+        self._next_callback_id += 1
+        self._callbacks[self._next_callback_id] = callback
+        return self._next_callback_id
+
+    def remove_callback(self, callback_id: int) -> None:
+        self._callbacks.pop(callback_id, None)
+
+    def _panel_destroyed(self, widget: Gtk.Widget) -> None:
+        self._panels.discard(widget)
+        self._update()
+
+    def _active_window_changed(self, screen: Libxfce4windowing.Screen, _) -> None:
+        if self._active_window is not None:
+            self._active_window.disconnect(self._active_window_handler_id)
+        self._active_window = screen.get_active_window()
+        self._active_window_handler_id = None
+        if self._active_window is not None:
+            self._active_window_handler_id = self._active_window.connect(
+                "state-changed", lambda *_: self._active_window_state_changed()
+            )
+        self._active_window_state_changed()
+
+    def _active_window_state_changed(self) -> None:
+        window = self._active_window
+        if window is not None and window.is_fullscreen():
+            self._fullscreen_window = window
+        else:
+            self._fullscreen_window = None
+        self._update()
+
+    def _screen_saver_active_changed(
+        self, _, __, ___, ____, _____, parameters: GLib.Variant
+    ) -> None:
+        self._screen_locked = parameters[0]
+        self._update()
+
+    def _is_panel_hidden(self, widget: Gtk.Widget) -> bool:
+        if not widget.get_mapped():
+            return True
+        if self._fullscreen_window is None:
+            return False
+
+        gdk_window = widget.get_window()
+        if gdk_window is None:
+            return True
+        monitor = gdk_window.get_display().get_monitor_at_window(gdk_window)
+        geometry = self._fullscreen_window.get_geometry()
+        if monitor is None or geometry is None or geometry.width <= 0:
+            # the geometry is not known (e.g. on wayland), assume it covers the panel
+            return True
+        return Gdk.Rectangle.intersect(monitor.get_geometry(), geometry)[0]
+
+    def _update(self) -> None:
+        suspended = self._screen_locked or (
+            bool(self._panels) and all(map(self._is_panel_hidden, self._panels))
+        )
+        if suspended == self.suspended:
+            return
+        self.suspended = suspended
+
+        if suspended:
+            if self._resume_idle_id is not None:
+                GLib.source_remove(self._resume_idle_id)
+                self._resume_idle_id = None
+            self._notify()
+        elif self._resume_idle_id is None:
+            self._resume_idle_id = GLib.idle_add(self._on_resume_idle)
+
+    def _on_resume_idle(self) -> bool:
+        self._resume_idle_id = None
+        self._notify()
+        return False
+
+    def _notify(self) -> None:
+        for callback in list(self._callbacks.values()):
+            callback(self.suspended)
@@ -1,13 +1,17 @@
 # Copyright 2023 - 2025, zalesyc and the budgie-media-player-applet contributors
 # SPDX-License-Identifier: GPL-3.0-or-later
 from dataclasses import dataclass
-from typing import Optional, Callable
+from typing import Optional, Callable, Union
 import gi
 from SettingsPage import SettingsPage
 from PopupPlasmaControlView import PopupPlasmaControlView
-from EnumsStructs import PanelLengthMode
+from EnumsStructs import PanelLengthMode, PanelRenderer
+from PanelControlView import PanelControlView
+from PanelCanvasView import PanelCanvasView
 from FixedSizeBin import FixedSizeBin
 from Popover import Popover
+from ActivityMonitor import ActivityMonitor
+from PanelFollowPolicy import PanelFollowPolicy
 from BudgieApiVersions import BUDGIE_VERSION_X11, BUDGIE_VERSION_WAYLAND
 
 gi.require_version("Gtk", "3.0")
@@ -95,8 +99,11 @@ class BudgieMediaPlayer(Budgie.Applet):
                 else None
             ),
             orientation=self.orientation,
+            skip_text_remeasure=True,
         )
         self.box.pack_start(self.panel_view_size_bin, False, False, 0)
+        # one panel view for the whole applet, it is rebound to the panel player
+        self.panel_view: Union[PanelControlView, PanelCanvasView, None] = None
 
         self.popup_icon: Gtk.Image = Gtk.Image.new_from_icon_name(
             "budgie-media-player-applet-arrow-drop-down-symbolic", Gtk.IconSize.MENU
@@ -127,14 +134,22 @@ class BudgieMediaPlayer(Budgie.Applet):
         self.players_list: dict[str, PopupPlasmaControlView] = {}
         # service name of the player that has the panel view
         self.panel_player: PanelPlayer = PanelPlayer()
+        # players that appeared on the bus, they are added together from an idle
+        self._pending_service_names: list[str] = []
+        self._add_pending_idle_id: Optional[int] = None
+        self.follow_policy: PanelFollowPolicy = PanelFollowPolicy(
+            self.settings,
+            is_playing=self._player_is_playing,
+            switch_to=self._follow_player,
+        )
 
         if dbus_names:
-            for dbus_service_name in dbus_names:
-                self._add_popup_plasma_control_view(dbus_service_name)
+            self._add_popup_plasma_control_views(dbus_names)
         else:
             self._add_nothing_playing_label()
 
         self.show_all()
+        ActivityMonitor.get_default().watch_panel(self)
 
         if not self.settings.get_boolean("show-arrow"):
             self.popup_icon.hide()
@@ -148,16 +163,18 @@ class BudgieMediaPlayer(Budgie.Applet):
             return
 
         if service_name == self.panel_player.service_name:
-            for key, value in self.players_list.items():
-                if key == service_name:
+            self.follow_policy.pin(None)
+            for player in self._players_by_activity():
+                if player.service_name == service_name:
                     continue
 
-                self.players_list[service_name].remove_panel_view()
-                self._add_panel_view(value)
+                self.players_list[service_name].detach_panel_view()
+                self._add_panel_view(player)
                 return
             return
 
-        self.players_list[self.panel_player.service_name].remove_panel_view()
+        self.follow_policy.pin(service_name)
+        self.players_list[self.panel_player.service_name].detach_panel_view()
 
         self._add_panel_view(self.players_list[service_name])
 
@@ -179,26 +196,34 @@ class BudgieMediaPlayer(Budgie.Applet):
         self, _, __, ___, ____, _____, changes: GLib.Variant
     ) -> None:
         if (changes[0] not in self.players_list) and changes[2]:  # player was added
-            if self.panel_player.nothing_playing_label is not None:
-                self.panel_player.nothing_playing_label.destroy()
-                self.panel_player.nothing_playing_label = None
-            self._add_popup_plasma_control_view(changes[0])
+            if changes[0] in self._pending_service_names:
+                return
+            # a burst of players (e.g. a restored browser session) is added at once
+            self._pending_service_names.append(changes[0])
+            if self._add_pending_idle_id is None:
+                self._add_pending_idle_id = GLib.idle_add(self._add_pending_players)
 
         elif not changes[2]:  # player was removed
+            if changes[0] in self._pending_service_names:
+                self._pending_service_names.remove(changes[0])
+                return
+
             player_to_get_del = self.players_list.pop(changes[0], None)
             if player_to_get_del is None:
                 return
+            self.follow_policy.player_removed(changes[0])
 
             had_panel_view = player_to_get_del.panel_view is not None
-            player_to_get_del.destroy()
+            self.popover.remove_players([player_to_get_del])
 
             if had_panel_view:
                 if len(self.players_list) > 0:
-                    for player in self.players_list.values():
-                        self._add_panel_view(player)
-                        break
+                    self._add_panel_view(self._players_by_activity()[0])
                 else:
+                    # keep the view around for the next player
+                    self.panel_view_size_bin.remove(self.panel_view)
                     self.panel_player.service_name = None
+                    self.follow_policy.panel_player_changed(None)
                     self._add_nothing_playing_label()
 
     def settings_changed(self, _, changed_key_name: str) -> None:
@@ -218,6 +243,18 @@ class BudgieMediaPlayer(Budgie.Applet):
                 self.panel_view_size_bin.set_size(None)
             return
 
+        if changed_key_name == "panel-renderer":
+            if self.panel_view is None:
+                return
+            player = self.players_list.get(self.panel_player.service_name)
+            if player is not None:
+                player.detach_panel_view()
+            self.panel_view.destroy()
+            self.panel_view = None
+            if player is not None:
+                self._add_panel_view(player)
+            return
+
         if changed_key_name == "panel-show-nothing-playing":
             if self.settings.get_boolean("panel-show-nothing-playing"):
                 self._add_nothing_playing_label()
@@ -230,27 +267,87 @@ class BudgieMediaPlayer(Budgie.Applet):
                 self.panel_player.nothing_playing_label.text_changed()
 
     def _add_panel_view(self, player: PopupPlasmaControlView) -> None:
-        player.add_panel_view(
-            orientation=self.orientation,
-            panel_size=self.panel_size,
-        )
-        self.panel_view_size_bin.add(player.panel_view)
+        if self.panel_view is None:
+            panel_view_class = (
+                PanelCanvasView
+                if self.settings.get_uint("panel-renderer") == PanelRenderer.drawn
+                else PanelControlView
+            )
+            self.panel_view = panel_view_class(
+                dbus_player=player.dbus_player,
+                state=player.panel_state(),
+                open_popover_func=self.show_popup,
+                orientation=self.orientation,
+                panel_size=self.panel_size,
+                settings=self.settings,
+            )
+        if self.panel_view.get_parent() is None:
+            self.panel_view_size_bin.add(self.panel_view)
+        player.attach_panel_view(self.panel_view)
         self.panel_player.service_name = player.service_name
-
-    def _add_popup_plasma_control_view(self, service_name: str) -> None:
-        new_view = PopupPlasmaControlView(
-            service_name=service_name,
-            open_popover_func=self.show_popup,
-            on_pin_clicked=self.favorite_player_clicked,
-            settings=self.settings,
+        self.follow_policy.panel_player_changed(player.service_name)
+
+    def _players_by_activity(self) -> list[PopupPlasmaControlView]:
+        """the players, the most recently active first"""
+        return sorted(
+            self.players_list.values(),
+            key=lambda player: player.last_active,
+            reverse=True,
         )
 
-        self.popover.add_player(new_view)
+    def _player_activity(self, service_name: str) -> None:
+        player = self.players_list.get(service_name)
+        if player is not None:
+            self.popover.player_activity_changed(player)
+            self.follow_policy.player_activity(service_name, player.playing)
+
+    def _player_is_playing(self, service_name: str) -> bool:
+        player = self.players_list.get(service_name)
+        return player is not None and player.playing
+
+    def _follow_player(self, service_name: str) -> None:
+        """move the panel view to the player, see PanelFollowPolicy"""
+        player = self.players_list.get(service_name)
+        if player is None or service_name == self.panel_player.service_name:
+            return
+        current = self.players_list.get(self.panel_player.service_name)
+        if current is not None:
+            current.detach_panel_view()
+        self._add_panel_view(player)
+
+    def _add_pending_players(self) -> bool:
+        self._add_pending_idle_id = None
+        service_names, self._pending_service_names = self._pending_service_names, []
+        if not service_names:
+            return False
+
+        if self.panel_player.nothing_playing_label is not None:
+            self.panel_player.nothing_playing_label.destroy()
+            self.panel_player.nothing_playing_label = None
+        self._add_popup_plasma_control_views(service_names)
+        return False
+
+    def _add_popup_plasma_control_views(self, service_names: list[str]) -> None:
+        new_views = [
+            PopupPlasmaControlView(
+                service_name=service_name,
+                open_popover_func=self.show_popup,
+                on_pin_clicked=self.favorite_player_clicked,
+                on_activity=self._player_activity,
+                settings=self.settings,
+            )
+            for service_name in service_names
+        ]
+
+        self.popover.add_players(new_views)
 
         if len(self.players_list) < 1:
-            self._add_panel_view(new_view)
+            # a player that already plays gets the panel, not the first found
+            self._add_panel_view(max(new_views, key=lambda view: view.last_active))
 
-        self.players_list.update({new_view.service_name: new_view})
+        self.players_list.update({view.service_name: view for view in new_views})
+        for view in new_views:
+            self.follow_policy.player_added(view.service_name, view.playing)
 
     def _add_nothing_playing_label(self) -> None:
         if not self.settings.get_boolean("panel-show-nothing-playing"):
@@ -271,10 +368,10 @@ class BudgieMediaPlayer(Budgie.Applet):
         self, panel_size: int, icon_size: int, small_icon_size: int
     ) -> None:
         self.panel_size = icon_size
-        if (
-            player := self.players_list.get(self.panel_player.service_name, None)
-        ) is not None:
-            player.panel_size_changed(self.panel_size)
+        if self.panel_view is not None:
+            self.panel_view.panel_size_changed(
+                self.panel_size, self.panel_view.state.album_cover
+            )
 
     def do_panel_position_changed(self, position: Budgie.PanelPosition) -> None:
         if position in {Budgie.PanelPosition.LEFT, Budgie.PanelPosition.RIGHT}:
@@ -283,10 +380,10 @@ class BudgieMediaPlayer(Budgie.Applet):
             self.orientation = Gtk.Orientation.HORIZONTAL
 
         self.box.set_orientation(self.orientation)
-        if (
-            player := self.players_list.get(self.panel_player.service_name, None)
-        ) is not None:
-            player.panel_orientation_changed(self.orientation)
+        if self.panel_view is not None:
+            self.panel_view.orientation_changed(
+                self.orientation, self.panel_view.state.album_cover
+            )
 
         if self.panel_player.nothing_playing_label is not None:
             self.panel_player.nothing_playing_label.set_orientation(self.orientation)
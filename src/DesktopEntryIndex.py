@@ -0,0 +1,174 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+from typing import Callable, Optional
+from ImagePipeline import ImagePipeline
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gio", "2.0")
+from gi.repository import Gtk, Gio
+
+DESKTOP_SUFFIX: str = ".desktop"
+
+
+class DesktopEntryIndex:
+    """
+    Maps the DesktopEntry and Identity reported by the MPRIS players
+    to the icons of the installed applications.
+
+    Players often report a name that is not the id of their desktop entry
+    (e.g. flatpaks report "spotify" for com.spotify.Client.desktop),
+    so the entries are indexed, case-insensitively, by their id, flatpak app id,
+    StartupWMClass, executable and name, in this order of precedence.
+
+    The index is built on a worker thread, when first used,
+    and rebuilt when the installed applications change.
+    Until it is ready the desktop entries are looked up directly.
+
+    There is one shared instance, use DesktopEntryIndex.get_default()
+    """
+
+    _default: Optional["DesktopEntryIndex"] = None
+
+    def __init__(self):
+        self._icons: Optional[dict[str, Gio.Icon]] = None
+        self._resolved: dict[
+            tuple[Optional[str], Optional[str]], Optional[Gio.Icon]
+        ] = {}
+        """memoized lookup_icon() results"""
+        self._building: bool = False
+        self._rebuild_pending: bool = False
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._next_callback_id: int = 0
+
+        self._app_info_monitor: Gio.AppInfoMonitor = Gio.AppInfoMonitor.get()
+        self._app_info_monitor.connect("changed", lambda _: self._build())
+        Gtk.IconTheme.get_default().connect("changed", self._icon_theme_changed)
+        self._build()
+
+    @classmethod
+    def get_default(cls) -> "DesktopEntryIndex":
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def add_callback(self, callback: Callable[[], None]) -> int:
+        """
+        callback() is called when lookup_icon() may give other results,
+        returns its id
+        """
+        self._next_callback_id += 1
+        self._callbacks[self._next_callback_id] = callback
+        return self._next_callback_id
+
+    def remove_callback(self, callback_id: int) -> None:
+        self._callbacks.pop(callback_id, None)
+
+    def lookup_icon(
+        self, desktop_entry: Optional[str], identity: Optional[str]
+    ) -> Optional[Gio.Icon]:
+        """
+        The icon of the application with the desktop entry (without .desktop),
+        or with the identity if the desktop entry doesn't match,
+        None if there is no such application
+        """
+        key = (desktop_entry, identity)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        icon = None
+        if self._icons is None:
+            icon = self._lookup_directly(desktop_entry)
+        else:
+            for name in (desktop_entry, identity):
+                if name and (icon := self._icons.get(name.lower())) is not None:
+                    break
+
+        if icon is None and desktop_entry:
+            if Gtk.IconTheme.get_default().has_icon(desktop_entry):
+                icon = Gio.ThemedIcon.new(desktop_entry)
+
+        if self._icons is not None:
+            # the direct lookups are not remembered, the index may find more
+            self._resolved[key] = icon
+        return icon
+
+    @staticmethod
+    def _lookup_directly(desktop_entry: Optional[str]) -> Optional[Gio.Icon]:
+        if not desktop_entry:
+            return None
+        try:
+            desktop_app_info = Gio.DesktopAppInfo.new(desktop_entry + DESKTOP_SUFFIX)
+        except TypeError:
+            return None
+        if desktop_app_info is None:
+            return None
+        return desktop_app_info.get_icon()
+
+    def _build(self) -> None:
+        if self._building:
+            self._rebuild_pending = True
+            return
+        self._building = True
+        ImagePipeline.get_default().submit(
+            self._read_entries, self._on_built, priority=ImagePipeline.PRIORITY_LOW
+        )
+
+    @staticmethod
+    def _read_entries() -> dict[str, Gio.Icon]:
+        """runs on a worker thread"""
+        by_id: dict[str, Gio.Icon] = {}
+        by_flatpak_id: dict[str, Gio.Icon] = {}
+        by_wm_class: dict[str, Gio.Icon] = {}
+        by_executable: dict[str, Gio.Icon] = {}
+        by_name: dict[str, Gio.Icon] = {}
+
+        for app_info in Gio.AppInfo.get_all():
+            icon = app_info.get_icon()
+            if icon is None:
+                continue
+
+            app_id = app_info.get_id() or ""
+            if app_id.endswith(DESKTOP_SUFFIX):
+                app_id = app_id[: -len(DESKTOP_SUFFIX)]
+            if app_id:
+                by_id.setdefault(app_id.lower(), icon)
+
+            if isinstance(app_info, Gio.DesktopAppInfo):
+                if flatpak_id := app_info.get_string("X-Flatpak"):
+                    by_flatpak_id.setdefault(flatpak_id.lower(), icon)
+                if wm_class := app_info.get_startup_wm_class():
+                    by_wm_class.setdefault(wm_class.lower(), icon)
+
+            executable = os.path.basename(app_info.get_executable() or "")
+            # every flatpak is started by the flatpak executable
+            if executable and executable != "flatpak":
+                by_executable.setdefault(executable.lower(), icon)
+            if name := app_info.get_name():
+                by_name.setdefault(name.lower(), icon)
+
+        icons: dict[str, Gio.Icon] = {}
+        for names in (by_id, by_flatpak_id, by_wm_class, by_executable, by_name):
+            for name, icon in names.items():
+                icons.setdefault(name, icon)
+        return icons
+
+    def _on_built(self, icons: Optional[dict[str, Gio.Icon]]) -> None:
+        self._building = False
+        if icons is not None:
+            self._icons = icons
+            self._resolved.clear()
+            self._notify()
+        if self._rebuild_pending:
+            self._rebuild_pending = False
+            self._build()
+
+    def _icon_theme_changed(self, _) -> None:
+        self._resolved.clear()
+        self._notify()
+
+    def _notify(self) -> None:
+        for callback in list(self._callbacks.values()):
+            callback()
@@ -3,7 +3,7 @@
 
 from typing import Optional, Union
 from enum import IntEnum
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 import gi
 
 gi.require_version("Gio", "2.0")
@@ -30,6 +30,29 @@ class AlbumCoverData:
     image_url_http: Optional[str]
     song_cover_pixbuf: Optional[GdkPixbuf.Pixbuf]
     song_cover_other: Union[Gio.Icon, str, None]
+    image_cache_key: Optional[str] = None
+    """key of song_cover_pixbuf in the ImagePipeline cache"""
+
+
+@dataclass
+class PanelState:
+    """What the panel view shows of its player"""
+
+    title: Optional[str]
+    artist: Optional[list[str]]
+    album_cover: AlbumCoverData
+    """a copy, the player changes its AlbumCoverData in place"""
+    playing: bool
+    can_play_or_pause: bool
+    can_go_previous: bool
+    can_go_next: bool
+
+    def changed_fields(self, other: "PanelState") -> set[str]:
+        return {
+            field.name
+            for field in fields(self)
+            if getattr(self, field.name) != getattr(other, field.name)
+        }
 
 
 class PanelLengthMode(IntEnum):
@@ -38,8 +61,26 @@ class PanelLengthMode(IntEnum):
     Fixed = 2
 
 
+class PanelRenderer(IntEnum):
+    widgets: int = 0
+    drawn: int = 1
+
+
+class PopoverLayout(IntEnum):
+    tabs: int = 0
+    list: int = 1
+
+
 class PanelClickAction(IntEnum):
     open_popover: int = 0
     play_pause: int = 1
     next: int = 2
     previous: int = 3
+
+
+class PowerSavingMode(IntEnum):
+    automatic: int = 0
+    """when the power-saver profile is on or when running on battery"""
+    power_saver_only: int = 1
+    never: int = 2
+    always: int = 3
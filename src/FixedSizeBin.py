@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import gi
-from typing import Optional
+from typing import Callable, Optional
 
 gi.require_version("Gtk", "3.0")
 gi.require_version("Gdk", "3.0")
@@ -12,27 +12,76 @@ from gi.repository import Gtk, Gdk
 class FixedSizeBin(Gtk.Bin):
     """
     A single-child container that has fixed size (width or height) based on orientation.
+
+    The preferred sizes of the child are measured at most once per layout cycle,
+    for each axis, the measurements are reused by the other size requests
+    and by the allocation, until the next allocation or invalidate_measurements().
+
+    With skip_text_remeasure and a fixed size, a resize that the child announced
+    by text_changed() (the text of ellipsized labels changed)
+    doesn't measure the child along the fixed axis again, as its minimal size
+    can't change there. The other axis is measured, as e.g. fallback fonts
+    may change the height of the text.
     """
 
     def __init__(
         self,
         size: Optional[int] = None,
         orientation: Gtk.Orientation = Gtk.Orientation.HORIZONTAL,
+        skip_text_remeasure: bool = False,
         **kwargs
     ):
         super().__init__(**kwargs)
         self.preferred_size: Optional[int] = size
         self.orientation: Gtk.Orientation = orientation
+        self.skip_text_remeasure: bool = skip_text_remeasure
+        self._child_width: Optional[tuple[int, int]] = None
+        self._child_height: Optional[tuple[int, int]] = None
+        self._width_measured: bool = False
+        self._height_measured: bool = False
+        """the measurement of the axis is from the current layout cycle"""
+        self._text_only_change: bool = False
+        self._other_change: bool = False
 
     def set_size(self, new_size: Optional[int]) -> None:
         self.preferred_size = new_size
+        self.invalidate_measurements()
         self.queue_resize()
 
     def set_orientation(self, new_orientation: Gtk.Orientation) -> None:
         self.orientation = new_orientation
+        self.invalidate_measurements()
         self.queue_resize()
 
+    def text_changed(self) -> None:
+        """the child is going to resize only because the text of its labels changed"""
+        if not self._other_change:
+            self._text_only_change = True
+
+    def invalidate_measurements(self) -> None:
+        """the child has to be measured again in the next layout cycle"""
+        self._text_only_change = False
+        self._other_change = True
+        self._width_measured = False
+        self._height_measured = False
+
+    def do_add(self, widget: Gtk.Widget) -> None:
+        self.invalidate_measurements()
+        Gtk.Bin.do_add(self, widget)
+
+    def do_remove(self, widget: Gtk.Widget) -> None:
+        self.invalidate_measurements()
+        Gtk.Bin.do_remove(self, widget)
+
     def do_size_allocate(self, allocation: Gdk.Rectangle) -> None:
+        self._allocate_child(allocation)
+        # the layout cycle is over, the next one measures the child again
+        self._text_only_change = False
+        self._other_change = False
+        self._width_measured = False
+        self._height_measured = False
+
+    def _allocate_child(self, allocation: Gdk.Rectangle) -> None:
         if self.get_child() is None:
             return
         if self.preferred_size is None:
@@ -42,14 +91,14 @@ class FixedSizeBin(Gtk.Bin):
         child_allocation.x = allocation.x
         child_allocation.y = allocation.y
         if self.orientation == Gtk.Orientation.HORIZONTAL:
-            child_min_width, _ = self.get_child().get_preferred_width()
+            child_min_width, _ = self._cached_child_width()
             child_allocation.height = allocation.height
             child_allocation.width = min(
                 max(child_min_width, self.preferred_size),
                 allocation.width,
             )
         else:
-            child_min_height, _ = self.get_child().get_preferred_height()
+            child_min_height, _ = self._cached_child_height()
             child_allocation.width = allocation.width
             child_allocation.height = min(
                 max(child_min_height, self.preferred_size),
@@ -62,30 +111,79 @@ class FixedSizeBin(Gtk.Bin):
         if self.get_child() is None:
             return 0, 0
 
+        child_width = self._measure_child_width()
         if self.preferred_size is None:
-            return self.get_child().get_preferred_width()
+            return child_width
 
         if self.orientation == Gtk.Orientation.HORIZONTAL:
-            child_min_width, _ = self.get_child().get_preferred_width()
+            child_min_width, _ = child_width
             return child_min_width, max(child_min_width, self.preferred_size)
         else:
-            return self.get_child().get_preferred_width()
+            return child_width
 
     def do_get_preferred_height(self):
         if self.get_child() is None:
             return 0, 0
 
+        child_height = self._measure_child_height()
         if self.preferred_size is None:
-            return self.get_child().get_preferred_height()
+            return child_height
 
         if self.orientation == Gtk.Orientation.HORIZONTAL:
-            return self.get_child().get_preferred_height()
+            return child_height
         else:
-            child_min_height, _ = self.get_child().get_preferred_height()
+            child_min_height, _ = child_height
             return child_min_height, max(child_min_height, self.preferred_size)
 
     def do_get_preferred_height_for_width(self, _) -> tuple[int, int]:
-        return self.do_get_preferred_height()
+        return self._size_for_other_dimension(self._measure_child_height, False)
 
     def do_get_preferred_width_for_height(self, _) -> tuple[int, int]:
-        return self.do_get_preferred_width()
+        return self._size_for_other_dimension(self._measure_child_width, True)
+
+    def _size_for_other_dimension(
+        self, measure: Callable[[], tuple[int, int]], is_width: bool
+    ) -> tuple[int, int]:
+        if self.get_child() is None:
+            return 0, 0
+        child_min, child_nat = measure()
+        main_is_width = self.orientation == Gtk.Orientation.HORIZONTAL
+        if self.preferred_size is None or main_is_width != is_width:
+            return child_min, child_nat
+        return child_min, max(child_min, self.preferred_size)
+
+    def _can_skip_measure(self, is_width: bool) -> bool:
+        """only the fixed axis can be skipped"""
+        return (
+            self.skip_text_remeasure
+            and self.preferred_size is not None
+            and self._text_only_change
+            and not self._other_change
+            and is_width == (self.orientation == Gtk.Orientation.HORIZONTAL)
+        )
+
+    def _measure_child_width(self) -> tuple[int, int]:
+        if self._child_width is None or not (
+            self._width_measured or self._can_skip_measure(True)
+        ):
+            self._child_width = tuple(self.get_child().get_preferred_width())
+        self._width_measured = True
+        return self._child_width
+
+    def _measure_child_height(self) -> tuple[int, int]:
+        if self._child_height is None or not (
+            self._height_measured or self._can_skip_measure(False)
+        ):
+            self._child_height = tuple(self.get_child().get_preferred_height())
+        self._height_measured = True
+        return self._child_height
+
+    def _cached_child_width(self) -> tuple[int, int]:
+        if self._child_width is None:
+            return self._measure_child_width()
+        return self._child_width
+
+    def _cached_child_height(self) -> tuple[int, int]:
+        if self._child_height is None:
+            return self._measure_child_height()
+        return self._child_height
@@ -0,0 +1,174 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Callable, Optional, Union
+import cairo
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gdk", "3.0")
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import Gtk, Gdk, Gio, GLib, GdkPixbuf
+
+
+def play_pause_icon_name(playing: bool) -> str:
+    """the icon of the play / pause button, it shows the action it would do"""
+    if playing:
+        return "media-playback-pause-symbolic"
+    return "media-playback-start-symbolic"
+
+
+class IconCache:
+    """
+    Rendered icons shared by all the views.
+
+    Symbolic icons are recolored with the foreground color of the widget,
+    so they are kept as cairo surfaces keyed by
+    (icon name, size, scale, foreground color). Switching an icon
+    (e.g. play -> pause) is then only a swap of the shown surface,
+    without a lookup in the icon theme.
+
+    The icons shown instead of the album cover (the icon of the player)
+    are kept as pixbufs keyed by (icon, size, scale), so that they are not
+    looked up and rasterised again on every size or orientation change.
+
+    Everything is dropped when the icon theme changes.
+
+    There is one shared instance, use IconCache.get_default()
+    """
+
+    _default: Optional["IconCache"] = None
+
+    def __init__(self):
+        self._symbolic: dict[
+            tuple[str, int, int, str], Optional[cairo.Surface]
+        ] = {}
+        self._fallback: dict[tuple[str, int, int], Optional[GdkPixbuf.Pixbuf]] = {}
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._next_callback_id: int = 0
+        Gtk.IconTheme.get_default().connect("changed", self._icon_theme_changed)
+
+    @classmethod
+    def get_default(cls) -> "IconCache":
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def add_callback(self, callback: Callable[[], None]) -> int:
+        """callback() is called after the cache was cleared, returns its id"""
+        self._next_callback_id += 1
+        self._callbacks[self._next_callback_id] = callback
+        return self._next_callback_id
+
+    def remove_callback(self, callback_id: int) -> None:
+        self._callbacks.pop(callback_id, None)
+
+    def symbolic_surface(
+        self, icon_name: str, size: int, scale: int, style_context: Gtk.StyleContext
+    ) -> Optional[cairo.Surface]:
+        """
+        The symbolic icon colored for the style context, the surface has
+        the device scale set, so it is size x size in logical pixels
+        """
+        color = style_context.get_color(style_context.get_state())
+        key = (icon_name, size, scale, color.to_string())
+        if key in self._symbolic:
+            return self._symbolic[key]
+
+        surface = None
+        icon_info = Gtk.IconTheme.get_default().lookup_icon_for_scale(
+            icon_name, size, scale, Gtk.IconLookupFlags.FORCE_SIZE
+        )
+        if icon_info is not None:
+            pixbuf, _ = icon_info.load_symbolic_for_context(style_context)
+            surface = Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None)
+        self._symbolic[key] = surface
+        return surface
+
+    def fallback_cover_pixbuf(
+        self, icon: Union[Gio.Icon, str], size: int, scale: int
+    ) -> Optional[GdkPixbuf.Pixbuf]:
+        """
+        The icon (a Gio.Icon or an icon name) rendered at size x size
+        logical pixels, so the pixbuf is (size * scale) x (size * scale)
+        """
+        icon_key = icon if isinstance(icon, str) else icon.to_string()
+        if icon_key is None:
+            # the icon can't be serialized, so it can't be a key either
+            return self._load_fallback_cover(icon, size, scale)
+        key = (icon_key, size, scale)
+        if key not in self._fallback:
+            self._fallback[key] = self._load_fallback_cover(icon, size, scale)
+        return self._fallback[key]
+
+    @staticmethod
+    def _load_fallback_cover(
+        icon: Union[Gio.Icon, str], size: int, scale: int
+    ) -> Optional[GdkPixbuf.Pixbuf]:
+        icon_theme = Gtk.IconTheme.get_default()
+        flags = Gtk.IconLookupFlags(Gtk.IconLookupFlags.FORCE_SIZE)
+        if isinstance(icon, str):
+            icon_info = icon_theme.lookup_icon_for_scale(icon, size, scale, flags)
+        else:
+            icon_info = icon_theme.lookup_by_gicon_for_scale(icon, size, scale, flags)
+        if icon_info is None:
+            return None
+        try:
+            return icon_info.load_icon()
+        except GLib.Error:
+            return None
+
+    def _icon_theme_changed(self, _) -> None:
+        self._symbolic.clear()
+        self._fallback.clear()
+        for callback in list(self._callbacks.values()):
+            callback()
+
+
+class SymbolicImage(Gtk.Image):
+    """
+    Gtk.Image showing a symbolic icon from the IconCache,
+    set_icon_name() swaps the surface, the icon is recolored
+    when the style (e.g. the state of the button) changes
+    """
+
+    def __init__(self, icon_name: str, icon_size: Gtk.IconSize = Gtk.IconSize.MENU):
+        super().__init__()
+        self._icon_name: str = icon_name
+        self._icon_size: Gtk.IconSize = icon_size
+        self._pixel_size: int = Gtk.icon_size_lookup(icon_size)[1]
+        self._shown_surface: Optional[cairo.Surface] = None
+
+        self.connect("style-updated", lambda _: self._update_surface())
+        self.connect("notify::scale-factor", lambda *_: self._update_surface())
+        self._callback_id: int = IconCache.get_default().add_callback(
+            self._update_surface
+        )
+        self.connect(
+            "destroy",
+            lambda _: IconCache.get_default().remove_callback(self._callback_id),
+        )
+        self._update_surface()
+
+    def set_icon_name(self, icon_name: str) -> None:
+        if icon_name == self._icon_name:
+            return
+        self._icon_name = icon_name
+        self._update_surface()
+
+    def _update_surface(self) -> None:
+        surface = IconCache.get_default().symbolic_surface(
+            self._icon_name,
+            self._pixel_size,
+            self.get_scale_factor(),
+            self.get_style_context(),
+        )
+        if surface is self._shown_surface:
+            return
+        self._shown_surface = surface
+        if surface is None:
+            self.set_from_icon_name(self._icon_name, self._icon_size)
+        else:
+            self.set_from_surface(surface)
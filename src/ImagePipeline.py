@@ -0,0 +1,359 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import threading
+import queue
+import itertools
+from collections import deque, OrderedDict
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+import requests
+import gi
+
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import Gio, GLib, GdkPixbuf
+
+
+class ImagePipeline:
+    """
+    Decodes and scales images on worker threads.
+
+    The results are delivered to the main loop at GLib.PRIORITY_LOW in batches,
+    a single batch runs for at most FRAME_BUDGET_US, so that the art work
+    doesn't delay the redraws of the panel.
+
+    Decoded and scaled images are kept in a shared LRU cache, which is
+    filled either by regular loads or by prefetch(), so that the cover
+    of the next track is already there when the track changes.
+
+    There is one shared instance, use ImagePipeline.get_default()
+    """
+
+    WORKER_COUNT: int = 2
+    FRAME_BUDGET_US: int = 4_000
+    """time in microseconds a single delivery batch may take, out of the 16 ms frame"""
+
+    PRIORITY_DEFAULT: int = 0
+    PRIORITY_LOW: int = 1
+
+    CACHE_MAX_BYTES: int = 48 * 1024 * 1024
+    RECENT_SIZES_COUNT: int = 4
+    """how many distinct target sizes are remembered for pre-scaling"""
+
+    _default: Optional["ImagePipeline"] = None
+
+    def __init__(self):
+        self._jobs: queue.PriorityQueue = queue.PriorityQueue()
+        self._job_counter = itertools.count()
+
+        self._results: deque = deque()
+        self._results_lock: threading.Lock = threading.Lock()
+        self._delivery_scheduled: bool = False
+
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_bytes: int = 0
+        self._cache_lock: threading.Lock = threading.Lock()
+        self._recent_sizes: deque = deque(maxlen=self.RECENT_SIZES_COUNT)
+
+        for i in range(self.WORKER_COUNT):
+            threading.Thread(
+                target=self._worker,
+                name=f"budgie-media-player-applet-image-{i}",
+                daemon=True,
+            ).start()
+
+    @classmethod
+    def get_default(cls) -> "ImagePipeline":
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def submit(
+        self,
+        work: Callable[[], Any],
+        callback: Optional[Callable[[Any], None]],
+        cancellable: Optional[Gio.Cancellable] = None,
+        priority: int = PRIORITY_DEFAULT,
+    ) -> None:
+        """
+        Run work() on a worker thread and then callback(result) on the main loop,
+        if the cancellable gets cancelled in the meantime, the callback is not called
+        """
+        self._jobs.put((priority, next(self._job_counter), work, callback, cancellable))
+
+    @staticmethod
+    def cache_key(url: str) -> Optional[str]:
+        """
+        The key of the image behind the url in the cache, None if the url
+        cannot be loaded, local files include the modification time,
+        because some players reuse the same file for every track
+        """
+        parsed_url = urlparse(url)
+        if parsed_url.scheme == "https":
+            return url
+        if parsed_url.scheme == "file":
+            try:
+                return f"{url}#{os.stat(parsed_url.path).st_mtime_ns}"
+            except OSError:
+                return None
+        return None
+
+    def load(
+        self,
+        url: str,
+        callback: Callable[[Optional[GdkPixbuf.Pixbuf]], None],
+        cancellable: Optional[Gio.Cancellable] = None,
+        priority: int = PRIORITY_DEFAULT,
+    ) -> None:
+        """
+        Load the image from a file:// or https:// url,
+        if it's cached the callback is called right away
+        """
+        key = self.cache_key(url)
+        if key is None:
+            callback(None)
+            return
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            callback(cached)
+            return
+
+        self.submit(
+            lambda: self._load_and_cache(url, key, cancellable),
+            callback,
+            cancellable,
+            priority,
+        )
+
+    def scale_to_fit(
+        self,
+        pixbuf: GdkPixbuf.Pixbuf,
+        max_width: Optional[int],
+        max_height: Optional[int],
+        callback: Callable[[Optional[GdkPixbuf.Pixbuf]], None],
+        cancellable: Optional[Gio.Cancellable] = None,
+        cache_key: Optional[str] = None,
+        priority: int = PRIORITY_DEFAULT,
+        prescale: bool = True,
+        interp_type: GdkPixbuf.InterpType = GdkPixbuf.InterpType.BILINEAR,
+    ) -> None:
+        """
+        Scale the pixbuf to fit into max_width x max_height (None is unlimited),
+        if cache_key is set, the result is cached and if prescale is True,
+        the size is remembered for the pre-scaling of the prefetched images
+        """
+        width, height = self.fit_size(pixbuf, max_width, max_height)
+        if cache_key is None:
+            self.submit(
+                lambda: self._scale(pixbuf, width, height, interp_type),
+                callback,
+                cancellable,
+                priority,
+            )
+            return
+
+        if prescale:
+            if (max_width, max_height) in self._recent_sizes:
+                self._recent_sizes.remove((max_width, max_height))
+            self._recent_sizes.append((max_width, max_height))
+
+        cached = self._cache_get((cache_key, width, height, interp_type))
+        if cached is not None:
+            callback(cached)
+            return
+
+        self.submit(
+            lambda: self._scale_and_cache(
+                pixbuf, cache_key, width, height, interp_type
+            ),
+            callback,
+            cancellable,
+            priority,
+        )
+
+    def prefetch(
+        self,
+        url: str,
+        cancellable: Optional[Gio.Cancellable] = None,
+        interp_type: GdkPixbuf.InterpType = GdkPixbuf.InterpType.BILINEAR,
+    ) -> None:
+        """
+        Load the image into the cache at low priority and pre-scale it
+        to the sizes recently used by scale_to_fit()
+        """
+        key = self.cache_key(url)
+        if key is None:
+            return
+        sizes = list(self._recent_sizes)
+        self.submit(
+            lambda: self._prefetch(url, key, sizes, cancellable, interp_type),
+            None,
+            cancellable,
+            self.PRIORITY_LOW,
+        )
+
+    @staticmethod
+    def fit_size(
+        pixbuf: GdkPixbuf.Pixbuf,
+        max_width: Optional[int],
+        max_height: Optional[int],
+    ) -> tuple[int, int]:
+        """the size of the pixbuf scaled to fit into max_width x max_height"""
+        scales = []
+        if max_width is not None:
+            scales.append(max_width / pixbuf.get_width())
+        if max_height is not None:
+            scales.append(max_height / pixbuf.get_height())
+        scale = min(scales) if scales else 1.0
+        return (
+            max(round(pixbuf.get_width() * scale), 1),
+            max(round(pixbuf.get_height() * scale), 1),
+        )
+
+    def _worker(self) -> None:
+        while True:
+            _, __, work, callback, cancellable = self._jobs.get()
+            if cancellable is not None and cancellable.is_cancelled():
+                continue
+            try:
+                result = work()
+            except GLib.Error:
+                result = None
+            except Exception as e:
+                # the worker must survive, and the callback still gets called
+                print(f"budgie-media-player-applet: background work failed: {e!r}")
+                result = None
+            if callback is not None:
+                self._post_result(callback, result, cancellable)
+
+    def _post_result(
+        self,
+        callback: Callable[[Any], None],
+        result: Any,
+        cancellable: Optional[Gio.Cancellable],
+    ) -> None:
+        with self._results_lock:
+            self._results.append((callback, result, cancellable))
+            if self._delivery_scheduled:
+                return
+            self._delivery_scheduled = True
+        GLib.idle_add(self._deliver_results, priority=GLib.PRIORITY_LOW)
+
+    def _deliver_results(self) -> bool:
+        deadline = GLib.get_monotonic_time() + self.FRAME_BUDGET_US
+        while True:
+            with self._results_lock:
+                if not self._results:
+                    self._delivery_scheduled = False
+                    return False
+                callback, result, cancellable = self._results.popleft()
+
+            if cancellable is None or not cancellable.is_cancelled():
+                callback(result)
+
+            if GLib.get_monotonic_time() >= deadline:
+                # continue in the next idle, after the pending redraws
+                return True
+
+    def _cache_get(self, key: Any) -> Optional[GdkPixbuf.Pixbuf]:
+        with self._cache_lock:
+            pixbuf = self._cache.get(key)
+            if pixbuf is not None:
+                self._cache.move_to_end(key)
+            return pixbuf
+
+    def _cache_put(self, key: Any, pixbuf: Optional[GdkPixbuf.Pixbuf]) -> None:
+        if pixbuf is None:
+            return
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return
+            self._cache[key] = pixbuf
+            self._cache_bytes += pixbuf.get_byte_length()
+            while self._cache_bytes > self.CACHE_MAX_BYTES and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted.get_byte_length()
+
+    def _load_and_cache(
+        self, url: str, key: str, cancellable: Optional[Gio.Cancellable]
+    ) -> Optional[GdkPixbuf.Pixbuf]:
+        pixbuf = self._cache_get(key)
+        if pixbuf is not None:
+            return pixbuf
+
+        parsed_url = urlparse(url)
+        if parsed_url.scheme == "file":
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(parsed_url.path)
+        else:
+            pixbuf = self._download(url, cancellable)
+        self._cache_put(key, pixbuf)
+        return pixbuf
+
+    def _scale_and_cache(
+        self,
+        pixbuf: GdkPixbuf.Pixbuf,
+        key: str,
+        width: int,
+        height: int,
+        interp_type: GdkPixbuf.InterpType,
+    ) -> Optional[GdkPixbuf.Pixbuf]:
+        scaled = self._scale(pixbuf, width, height, interp_type)
+        self._cache_put((key, width, height, interp_type), scaled)
+        return scaled
+
+    def _prefetch(
+        self,
+        url: str,
+        key: str,
+        sizes: list[tuple[Optional[int], Optional[int]]],
+        cancellable: Optional[Gio.Cancellable],
+        interp_type: GdkPixbuf.InterpType,
+    ) -> None:
+        pixbuf = self._load_and_cache(url, key, cancellable)
+        if pixbuf is None:
+            return
+        for max_width, max_height in sizes:
+            if cancellable is not None and cancellable.is_cancelled():
+                return
+            width, height = self.fit_size(pixbuf, max_width, max_height)
+            if self._cache_get((key, width, height, interp_type)) is None:
+                self._scale_and_cache(pixbuf, key, width, height, interp_type)
+
+    @staticmethod
+    def _scale(
+        pixbuf: GdkPixbuf.Pixbuf,
+        width: int,
+        height: int,
+        interp_type: GdkPixbuf.InterpType,
+    ) -> Optional[GdkPixbuf.Pixbuf]:
+        return pixbuf.scale_simple(width, height, interp_type)
+
+    @staticmethod
+    def _download(
+        url: str, cancellable: Optional[Gio.Cancellable]
+    ) -> Optional[GdkPixbuf.Pixbuf]:
+        img_stream = Gio.MemoryInputStream()
+        try:
+            response = requests.get(url, stream=True, timeout=4)
+            if response.status_code != 200:
+                return None
+
+            for chunk in response.iter_content(chunk_size=1024):
+                if cancellable is not None and cancellable.is_cancelled():
+                    response.close()
+                    return None
+                img_stream.add_bytes(GLib.Bytes.new(chunk))
+
+            pixbuf = GdkPixbuf.Pixbuf.new_from_stream(img_stream, cancellable)
+
+        except requests.exceptions.RequestException:
+            return None
+        finally:
+            img_stream.close()
+
+        return pixbuf
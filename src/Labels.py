@@ -2,6 +2,9 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from typing import Optional
+from math import ceil, pi
+from ActivityMonitor import ActivityMonitor
+import cairo
 import gi
 
 gi.require_version("Gtk", "3.0")
@@ -9,188 +12,367 @@ gi.require_version("Gdk", "3.0")
 gi.require_version("Pango", "1.0")
 gi.require_version("GLib", "2.0")
 
-from gi.repository import Gtk, Gdk
+from gi.repository import Gtk, Gdk, Pango
 from gi.repository.Pango import EllipsizeMode
 from gi.repository.GLib import markup_escape_text
 
+_text_size_providers: dict[int, Gtk.CssProvider] = {}
 
-class ScrollingLabel(Gtk.ScrolledWindow):
+
+def _text_size_provider(size: int) -> tuple[str, Gtk.CssProvider]:
+    """
+    The css class that sets the font size to size px and its provider,
+    the provider for each size is created once and shared by all the labels,
+    it is added only to the style contexts of the labels using it,
+    so a new size doesn't restyle the whole screen (the applet runs in the panel)
+    """
+    class_name = f"budgie-media-player-text-size-{size}"
+    if size not in _text_size_providers:
+        provider = Gtk.CssProvider()
+        provider.load_from_data(f".{class_name} {{ font-size: {size}px; }}".encode())
+        _text_size_providers[size] = provider
+    return class_name, _text_size_providers[size]
+
+
+def _swap_text_size_class(
+    widget: Gtk.Widget, old_size: Optional[int], new_size: Optional[int]
+) -> None:
+    if old_size == new_size:
+        return
+    style_context = widget.get_style_context()
+    if old_size is not None:
+        class_name, provider = _text_size_provider(old_size)
+        style_context.remove_class(class_name)
+        style_context.remove_provider(provider)
+    if new_size is not None:
+        class_name, provider = _text_size_provider(new_size)
+        style_context.add_provider(provider, Gtk.STYLE_PROVIDER_PRIORITY_USER)
+        style_context.add_class(class_name)
+
+
+class ScrollAnimator:
+    """
+    Drives the animation of all the ScrollingLabels from one "update" handler
+    per frame clock, instead of a tick callback per label.
+
+    A label is registered only while it is mapped and its text is overflowing,
+    which means that labels on hidden notebook pages, stack pages or in a closed
+    popover are not ticked. When the last label of a frame clock is removed,
+    the animator stops updating that frame clock.
+
+    While the ActivityMonitor reports the applet as suspended, no frame clock
+    is updated, the labels stay registered and continue after the resume.
+
+    There is one shared instance, use ScrollAnimator.get_default()
+    """
+
+    _default: Optional["ScrollAnimator"] = None
+
+    def __init__(self):
+        self._labels: dict[Gdk.FrameClock, set["ScrollingLabel"]] = {}
+        self._handler_ids: dict[Gdk.FrameClock, int] = {}
+        self._suspended: bool = ActivityMonitor.get_default().suspended
+        ActivityMonitor.get_default().add_callback(self._suspended_changed)
+
+    @classmethod
+    def get_default(cls) -> "ScrollAnimator":
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def add(self, label: "ScrollingLabel", frame_clock: Gdk.FrameClock) -> None:
+        labels = self._labels.setdefault(frame_clock, set())
+        if label in labels:
+            return
+        labels.add(label)
+        if not self._suspended:
+            self._start_updating(frame_clock)
+
+    def remove(self, label: "ScrollingLabel", frame_clock: Gdk.FrameClock) -> None:
+        labels = self._labels.get(frame_clock)
+        if labels is None or label not in labels:
+            return
+        labels.remove(label)
+        if labels:
+            return
+        del self._labels[frame_clock]
+        self._stop_updating(frame_clock)
+
+    def _start_updating(self, frame_clock: Gdk.FrameClock) -> None:
+        if frame_clock in self._handler_ids:
+            return
+        self._handler_ids[frame_clock] = frame_clock.connect("update", self._on_update)
+        frame_clock.begin_updating()
+
+    def _stop_updating(self, frame_clock: Gdk.FrameClock) -> None:
+        handler_id = self._handler_ids.pop(frame_clock, None)
+        if handler_id is None:
+            return
+        frame_clock.disconnect(handler_id)
+        frame_clock.end_updating()
+
+    def _suspended_changed(self, suspended: bool) -> None:
+        self._suspended = suspended
+        for frame_clock in list(self._labels):
+            if suspended:
+                self._stop_updating(frame_clock)
+            else:
+                self._start_updating(frame_clock)
+
+    def _on_update(self, frame_clock: Gdk.FrameClock) -> None:
+        frame_time = frame_clock.get_frame_time()
+        # copy, a label may remove itself while ticking
+        for label in list(self._labels.get(frame_clock, ())):
+            label.tick(frame_time)
+
+
+class ScrollingLabel(Gtk.DrawingArea):
     """
     Label that is scrolling if longer then parent
 
+    The text is shaped once into a cached Pango.Layout, which is then drawn
+    twice, shifted by the scrolling offset, so a frame of the animation
+    only redraws the area of this widget.
+
+    The label animates itself only while it is mapped, overflowing and not paused,
+    it's ticked by the shared ScrollAnimator.
+
+    Like Gtk.Label it can be rotated by set_angle(), but only 0 and 270 are supported
+
     if text_size is None, system default will be used
 
     """
 
+    SEPARATOR: str = " - "
+    SPEED_UNIT: float = 60.0
+    """pixels per second scrolled at speed 1.0 (1px per frame at 60 Hz)"""
+    MAX_FRAME_GAP_US: int = 1_000_000
+    """after a longer gap between ticks (e.g. suspended animator), the text doesn't jump"""
+
     def __init__(
         self,
         text: str = "",
         speed: float = 1.0,
         text_size: Optional[int] = None,
-        is_visible: bool = False,
+        max_fps: int = 0,
     ):
-        Gtk.ScrolledWindow.__init__(self)
-        self.set_policy(Gtk.PolicyType.EXTERNAL, Gtk.PolicyType.NEVER)
+        Gtk.DrawingArea.__init__(self)
 
         self.scrolling_value: float = 0.0
-        self._scroll_callback_id: Optional[int] = None
+        self._animated_frame_clock: Optional[Gdk.FrameClock] = None
         self._speed: float = speed if speed > 0 else 1.0
-        self._is_visible: bool = is_visible
-
-        self._css_provider = Gtk.CssProvider()
-
-        if text_size is None:
-            self._css_provider.load_from_data(b"")
-        else:
-            self._css_provider.load_from_data(
-                f"""
-                .scrolled_label {{
-                    font-size: {text_size}px
-                }}
-                """.encode()
-            )
-
-        self._label1 = Gtk.Label.new(str=text)
-        self._label1.get_style_context().add_class("scrolled_label")
-        self._label1.get_style_context().add_provider(
-            self._css_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
-        )
-        self._label2 = Gtk.Label.new(str=text)
-        self._label2.get_style_context().add_class("scrolled_label")
-        self._label2.get_style_context().add_provider(
-            self._css_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
-        )
-        self._separator1 = Gtk.Label.new(str=" - ")
-        self._separator1.get_style_context().add_class("scrolled_label")
-        self._separator1.get_style_context().add_provider(
-            self._css_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
-        )
-        self._separator2 = Gtk.Label.new(str=" - ")
-        self._separator2.get_style_context().add_class("scrolled_label")
-        self._separator2.get_style_context().add_provider(
-            self._css_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
-        )
-
-        self._labels_hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-        self._labels_hbox.pack_start(self._label1, False, False, 0)
-        self._labels_hbox.pack_start(self._separator1, False, False, 0)
-        self._labels_hbox.pack_start(self._label2, False, False, 0)
-        self._labels_hbox.pack_start(self._separator2, False, False, 0)
-
-        self.add(self._labels_hbox)
-
-        if self._is_visible:
-            self._wait_for_self_allocate_and_resize()
+        self._is_overflowing: bool = False
+        self._is_paused: bool = False
+        self._max_fps: int = max_fps
+        self._last_frame_time: Optional[int] = None
+        """time of the last frame the text was moved in"""
+        self._last_tick_time: int = 0
+        """time of the last frame, moved in or skipped"""
+        self._angle: int = 0
+        self._max_width_chars: int = -1
+
+        self._markup: str = markup_escape_text(text)
+        self._layout: Optional[Pango.Layout] = None
+        self._separator_layout: Optional[Pango.Layout] = None
+        self._text_width: int = 0
+        self._text_height: int = 0
+        self._separator_width: int = 0
+        self._char_width: int = 0
+
+        self._text_size: Optional[int] = None
+        self.set_text_size(text_size)
+        self.get_style_context().add_class("scrolled_label")
+
+        self.connect("style-updated", self._on_style_updated)
+        self.connect("size-allocate", self._on_size_allocate)
+        self.connect("map", self._on_map_changed)
+        self.connect("unmap", self._on_map_changed)
+        self.connect("destroy", self._on_map_changed)
 
     def set_label(self, text: str) -> None:
-        self._label1.set_text(text)
-        self._label2.set_text(text)
-        if self._is_visible:
-            self._resize(
-                self._get_label_width(self._label1),
-                self.get_allocated_width(),
-            )
+        self.set_markup(markup_escape_text(text))
 
     def set_markup(self, markup: str) -> None:
-        self._label1.set_markup(markup)
-        self._label2.set_markup(markup)
-        if self._is_visible:
-            self._resize(
-                self._get_label_width(self._label1),
-                self.get_allocated_width(),
-            )
+        if markup == self._markup:
+            return
+        self._markup = markup
+        if self._layout is not None:
+            self._layout.set_markup(markup, -1)
+            self._measure()
+        self.scrolling_value = 0.0
+        self.queue_resize()
 
     def set_text_size(self, new_size: Optional[int]) -> None:
         """
         set the text size in px, if None use system default
         """
-        if new_size is None:
-            self._css_provider.load_from_data(b"")
-        else:
-            self._css_provider.load_from_data(
-                f"""
-                .scrolled_label {{
-                    font-size: {new_size}px
-                }}
-                """.encode()
-            )
-        if self._is_visible:
-            self._resize(
-                self._get_label_width(self._label1),
-                self.get_allocated_width(),
-            )
+        _swap_text_size_class(self, self._text_size, new_size)
+        self._text_size = new_size
 
     def set_speed(self, new_speed: float) -> None:
+        """the speed is in SPEED_UNIT pixels per second, independent of the refresh rate"""
         if new_speed > 0:
             self._speed = new_speed
 
-    def to_get_visible(self) -> None:
-        """
-        Call this when the label starts to be visible in the ui,
-        it'll start all the animations,
-        see: to_get_invisible()
-        """
-        self._is_visible = True
-        self._wait_for_self_allocate_and_resize()
-
-    def to_get_invisible(self) -> None:
-        """
-        Call this when the label ends being visible in the ui,
-        it'll stop all the animations, to save resources
-        see: to_get_visible()
-        """
-        if self._scroll_callback_id is not None:
-            self.remove_tick_callback(self._scroll_callback_id)
-            self._scroll_callback_id = None
-        self._is_visible = False
-
-    def _resize(self, label_width: int, self_width: int) -> None:
-        if label_width > self_width:
-            self._label2.show()
-            self._separator1.show()
-            self._separator2.show()
-            if self._scroll_callback_id is None:
-                self._scroll_callback_id = self.add_tick_callback(self._scroll, None)
+    def set_max_fps(self, max_fps: int) -> None:
+        """limit the number of redraws per second, 0 means unlimited"""
+        self._max_fps = max(max_fps, 0)
+
+    def set_angle(self, angle: int) -> None:
+        """0 is horizontal, 270 is vertical, read from top to bottom"""
+        angle = 270 if angle == 270 else 0
+        if angle == self._angle:
+            return
+        self._angle = angle
+        self.queue_resize()
+
+    def set_max_width_chars(self, n_chars: int) -> None:
+        """the natural length of the label in characters, -1 is the length of the text"""
+        if n_chars == self._max_width_chars:
+            return
+        self._max_width_chars = n_chars
+        self.queue_resize()
+
+    def set_paused(self, paused: bool) -> None:
+        """a paused label doesn't scroll and shows the start of its text"""
+        if paused == self._is_paused:
+            return
+        self._is_paused = paused
+        self.scrolling_value = 0.0
+        self._update_scrolling()
+        self.queue_draw()
+
+    def do_get_preferred_width(self) -> tuple[int, int]:
+        if self._angle == 270:
+            return self._thickness()
+        return self._length()
+
+    def do_get_preferred_height(self) -> tuple[int, int]:
+        if self._angle == 270:
+            return self._length()
+        return self._thickness()
+
+    def _length(self) -> tuple[int, int]:
+        self._ensure_layout()
+        natural = self._text_width
+        if self._max_width_chars >= 0:
+            natural = min(natural, self._max_width_chars * self._char_width)
+        return 1, max(natural, 1)
+
+    def _thickness(self) -> tuple[int, int]:
+        self._ensure_layout()
+        return self._text_height, self._text_height
+
+    def _allocated_length(self) -> int:
+        if self._angle == 270:
+            return self.get_allocated_height()
+        return self.get_allocated_width()
+
+    def do_draw(self, cr: cairo.Context) -> bool:
+        self._ensure_layout()
+        style_context = self.get_style_context()
+        if self._angle == 270:
+            cr.translate(self.get_allocated_width(), 0)
+            cr.rotate(pi / 2)
+            y = (self.get_allocated_width() - self._text_height) / 2
         else:
-            self._label2.hide()
-            self._separator1.hide()
-            self._separator2.hide()
-            self.get_hadjustment().set_value(0.0)
+            y = (self.get_allocated_height() - self._text_height) / 2
+
+        if not self._is_overflowing:
+            Gtk.render_layout(style_context, cr, 0, y, self._layout)
+            return False
+
+        x = -self.scrolling_value
+        cycle = self._text_width + self._separator_width
+        for start in (x, x + cycle):
+            Gtk.render_layout(style_context, cr, start, y, self._layout)
+            Gtk.render_layout(
+                style_context,
+                cr,
+                start + self._text_width,
+                y,
+                self._separator_layout,
+            )
+        return False
+
+    def _ensure_layout(self) -> None:
+        if self._layout is not None:
+            return
+        self._layout = self.create_pango_layout(None)
+        self._layout.set_markup(self._markup, -1)
+        self._separator_layout = self.create_pango_layout(self.SEPARATOR)
+        self._measure()
+        context = self._layout.get_context()
+        metrics = context.get_metrics(context.get_font_description(), None)
+        self._char_width = ceil(metrics.get_approximate_char_width() / Pango.SCALE)
+
+    def _measure(self) -> None:
+        self._text_width, self._text_height = self._layout.get_pixel_size()
+        self._separator_width = self._separator_layout.get_pixel_size()[0]
+
+    def _on_style_updated(self, _) -> None:
+        # the font may have changed, the layouts have to be shaped again
+        self._layout = None
+        self._separator_layout = None
+        self.queue_resize()
+
+    def _on_size_allocate(self, *_) -> None:
+        self._update_scrolling()
+
+    def _on_map_changed(self, *_) -> None:
+        self._update_scrolling()
+
+    def _update_scrolling(self) -> None:
+        self._ensure_layout()
+        self._is_overflowing = self._text_width > self._allocated_length()
+        animator = ScrollAnimator.get_default()
+        frame_clock = self.get_frame_clock() if self.get_mapped() else None
+        if not self._is_overflowing or self._is_paused:
+            frame_clock = None
+
+        if frame_clock is self._animated_frame_clock:
+            return
+        if self._animated_frame_clock is not None:
+            animator.remove(self, self._animated_frame_clock)
+        self._animated_frame_clock = frame_clock
+        if frame_clock is not None:
+            self._last_frame_time = None
+            animator.add(self, frame_clock)
+            return
+
+        if not self._is_overflowing:
             self.scrolling_value = 0.0
-            if self._scroll_callback_id is not None:
-                self.remove_tick_callback(self._scroll_callback_id)
-                self._scroll_callback_id = None
-
-    def _scroll(self, *_) -> bool:
-        lower = self.get_hadjustment().get_lower()
-        upper = self.get_hadjustment().get_upper()
-        size = upper - lower
-        self.scrolling_value = ((self.scrolling_value + self._speed) % size) + lower
-
-        if self.scrolling_value > size / 2:
-            self.scrolling_value -= size / 2
-
-        self.get_hadjustment().set_value(self.scrolling_value)
-
-        return True
-
-    def _wait_for_self_allocate_and_resize(self) -> None:
-        self._resize(
-            self._get_label_width(self._label1),
-            self.get_allocated_width(),
-        )
-        self.connect("size-allocate", self._size_allocate)
-
-    def _size_allocate(self, _, rect: Gdk.Rectangle) -> None:
-        self._resize(
-            self._get_label_width(self._label1),
-            rect.width,
-        )
-        self.disconnect_by_func(self._size_allocate)
-
-    @staticmethod
-    def _get_label_width(label: Gtk.Label) -> int:
-        return label.get_layout().get_pixel_size()[0]
+        self.queue_draw()
+
+    def tick(self, frame_time: int) -> None:
+        """advance the scrolling to frame_time (in microseconds), called by ScrollAnimator"""
+        if self._last_frame_time is None:
+            self._last_frame_time = frame_time
+            self._last_tick_time = frame_time
+            return
+
+        elapsed = frame_time - self._last_frame_time
+        refresh_interval = frame_time - self._last_tick_time
+        self._last_tick_time = frame_time
+        if elapsed > self.MAX_FRAME_GAP_US:
+            self._last_frame_time = frame_time
+            return
+        # half a refresh period of tolerance, the frame times jitter, a frame
+        # that comes just before the interval would otherwise be skipped
+        # and the text moved one refresh later (e.g. 20 instead of 30 fps at 60 Hz)
+        if (
+            self._max_fps > 0
+            and elapsed < 1_000_000 / self._max_fps - refresh_interval / 2
+        ):
+            # skip this frame, the text would move by a fraction of a pixel anyway
+            return
+        self._last_frame_time = frame_time
+
+        cycle = self._text_width + self._separator_width
+        self.scrolling_value = (
+            self.scrolling_value + self._speed * self.SPEED_UNIT * elapsed / 1_000_000
+        ) % max(cycle, 1)
+        self.queue_draw()
 
 
 class ElliptedLabel(Gtk.Label):
@@ -206,34 +388,13 @@ class ElliptedLabel(Gtk.Label):
         self.set_ellipsize(EllipsizeMode.END)
         self.set_xalign(0.0)
 
-        self._css_provider = Gtk.CssProvider()
-        if text_size is None:
-            self._css_provider.load_from_data(b"")
-        else:
-            self._css_provider.load_from_data(
-                f"""
-                .sized_label {{
-                    font-size: {text_size}px
-                }}
-                """.encode()
-            )
-
+        self._text_size: Optional[int] = None
+        self.set_text_size(text_size)
         self.get_style_context().add_class("sized_label")
-        self.get_style_context().add_provider(
-            self._css_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
-        )
 
     def set_text_size(self, new_size: Optional[int]) -> None:
-        if new_size is None:
-            self._css_provider.load_from_data(b"")
-        else:
-            self._css_provider.load_from_data(
-                f"""
-                .sized_label {{
-                    font-size: {new_size}px
-                }}
-                """.encode()
-            )
+        _swap_text_size_class(self, self._text_size, new_size)
+        self._text_size = new_size
 
 
 class LabelWSubtitle(Gtk.Box):
@@ -0,0 +1,604 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from EnumsStructs import (
+    AlbumCoverType,
+    AlbumCoverData,
+    PanelLengthMode,
+    PanelClickAction,
+    PanelState,
+)
+from mprisWrapper import MprisWrapper
+from ImagePipeline import ImagePipeline
+from PowerPolicy import PowerPolicy
+from IconCache import IconCache, play_pause_icon_name
+from PanelViewBase import PanelViewBase
+from dataclasses import dataclass, replace
+from typing import Optional, Callable
+from math import ceil, pi
+import cairo
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gdk", "3.0")
+gi.require_version("Gio", "2.0")
+gi.require_version("GdkPixbuf", "2.0")
+gi.require_version("Pango", "1.0")
+from gi.repository import Gtk, Gdk, Gio, GdkPixbuf, Pango
+from gi.repository.Gdk import EventButton
+
+TEXT_ELEMENTS: frozenset[str] = frozenset(
+    {"song_name", "song_author", "song_separator"}
+)
+
+
+@dataclass
+class ElementSpan:
+    """the position of an element along the main axis (x when horizontal)"""
+
+    name: str
+    start: int
+    length: int
+
+
+class PanelCanvasView(Gtk.DrawingArea, PanelViewBase):
+    """
+    The same panel view as PanelControlView, but drawn as a single widget.
+
+    The texts are kept in cached Pango layouts and the cover and the button
+    icons in cached cairo surfaces, the clicks are mapped to the elements by
+    their positions. A new title only relayouts the texts inside the current
+    allocation and queues one redraw, the size is requested again only
+    if it has changed.
+    """
+
+    BUTTON_ICON_SIZE: int = 16
+    BUTTON_PADDING: int = 4
+    INSENSITIVE_ALPHA: float = 0.5
+    MARGINS: dict[str, int] = {
+        "album_cover": 5,
+        "song_name": 4,
+        "song_author": 4,
+        "song_separator": 4,
+    }
+    BUTTONS: dict[str, tuple[str, str]] = {
+        "play_pause_button": ("", "Play / Pause"),
+        "backward_button": (
+            "media-skip-backward-symbolic",
+            "Go to the previous song / media",
+        ),
+        "forward_button": ("media-skip-forward-symbolic", "Go to the next song / media"),
+    }
+    """element name: (icon name, tooltip), the play pause icon depends on the state"""
+
+    def __init__(
+        self,
+        dbus_player: MprisWrapper,
+        state: PanelState,
+        open_popover_func: Callable[[], None],
+        orientation: Gtk.Orientation,
+        panel_size: int,
+        settings: Gio.Settings,
+    ):
+        Gtk.DrawingArea.__init__(self)
+        self.dbus_player: MprisWrapper = dbus_player
+        self.album_cover_size: int = panel_size
+        self.open_popover_func = open_popover_func
+        self.orientation: Gtk.Orientation = orientation
+        self.settings: Gio.Settings = settings
+        self.power_policy: PowerPolicy = PowerPolicy.for_settings(settings)
+        self._interp_type: GdkPixbuf.InterpType = self.power_policy.interp_type
+        self._power_policy_callback_id: int = self.power_policy.add_callback(
+            self._power_policy_changed
+        )
+        self.element_order: list[str] = []
+        self._set_element_order(settings.get_strv("element-order"))
+        self.click_actions: dict[int, PanelClickAction] = settings.get_value(
+            "panel-click-action"
+        ).unpack()
+
+        self.state: PanelState = replace(state, album_cover=replace(state.album_cover))
+        self._texts: dict[str, str] = {}
+
+        self._layouts: dict[str, Pango.Layout] = {}
+        self._text_sizes: dict[str, tuple[int, int]] = {}
+        """the unellipsized (width, height) of the texts"""
+        self._char_width: int = 0
+        self._cover_surface: Optional[cairo.Surface] = None
+        self._cover_size: tuple[int, int] = (0, 0)
+        self._cover_pixbuf: Optional[GdkPixbuf.Pixbuf] = None
+        self._cover_scale: int = 1
+        """device pixels per logical pixel of the cover pixbuf"""
+        self._spans: list[ElementSpan] = []
+        self._requested_size: Optional[tuple[int, int, int, int]] = None
+
+        self._album_cover_scale_request: int = 0
+        self._art_cancellable: Gio.Cancellable = Gio.Cancellable()
+
+        self.add_events(Gdk.EventMask.BUTTON_PRESS_MASK)
+        self.set_has_tooltip(True)
+        self.connect("button-press-event", self._on_button_press)
+        self.connect("query-tooltip", self._on_query_tooltip)
+        self.connect("style-updated", self._on_style_updated)
+        self.connect("size-allocate", lambda *_: self._update_spans())
+        self.connect("notify::scale-factor", lambda *_: self._icon_theme_changed())
+        self.connect("destroy", self._on_destroy)
+        self._settings_handler_id: int = self.settings.connect(
+            "changed", self._settings_changed
+        )
+        self._icon_cache_callback_id: int = IconCache.get_default().add_callback(
+            self._icon_theme_changed
+        )
+
+        self._set_texts()
+        if state.album_cover.cover_type != AlbumCoverType.Null:
+            self.set_album_cover(state.album_cover)
+        self.show()
+
+    def orientation_changed(
+        self, new_orientation: Gtk.Orientation, album_cover_data: AlbumCoverData
+    ) -> None:
+        self.orientation = new_orientation
+        self.set_album_cover(album_cover_data)
+        self.queue_resize()
+
+    def panel_size_changed(
+        self, new_size: int, album_cover_data: AlbumCoverData
+    ) -> None:
+        self.album_cover_size = new_size
+        self.set_album_cover(album_cover_data)
+
+    def set_playing(self, playing: bool) -> None:
+        self.state.playing = playing
+        self._queue_draw_element("play_pause_button")
+
+    def set_metadata(self, artist: list[str], title: str) -> None:
+        self.state.title = title
+        self.state.artist = artist
+        self._set_texts()
+
+    def set_can_play_or_pause(self, can_play_or_pause: bool) -> None:
+        self.state.can_play_or_pause = can_play_or_pause
+        self._queue_draw_element("play_pause_button")
+
+    def set_can_go_previous(self, can_go_previous: bool) -> None:
+        self.state.can_go_previous = can_go_previous
+        self._queue_draw_element("backward_button")
+
+    def set_can_go_next(self, can_go_next: bool) -> None:
+        self.state.can_go_next = can_go_next
+        self._queue_draw_element("forward_button")
+
+    def set_album_cover(self, data: AlbumCoverData) -> None:
+        self.state.album_cover = replace(data)
+        self._album_cover_scale_request += 1
+        if data.cover_type == AlbumCoverType.Pixbuf:
+            request = self._album_cover_scale_request
+            ImagePipeline.get_default().scale_to_fit(
+                data.song_cover_pixbuf,
+                (
+                    None
+                    if self.orientation == Gtk.Orientation.HORIZONTAL
+                    else self.album_cover_size
+                ),
+                (
+                    self.album_cover_size
+                    if self.orientation == Gtk.Orientation.HORIZONTAL
+                    else None
+                ),
+                lambda resized: self._on_album_cover_resized(resized, request),
+                self._art_cancellable,
+                cache_key=data.image_cache_key,
+                interp_type=self.power_policy.interp_type,
+            )
+            return
+
+        icon_size = min(
+            Gtk.IconSize.lookup(Gtk.IconSize.DND)[2], self.album_cover_size
+        )
+        pixbuf = None
+        if data.cover_type in {AlbumCoverType.Gicon, AlbumCoverType.IconName}:
+            pixbuf = IconCache.get_default().fallback_cover_pixbuf(
+                data.song_cover_other, icon_size, self.get_scale_factor()
+            )
+        if pixbuf is not None:
+            self._set_cover_pixbuf(pixbuf, self.get_scale_factor())
+
+    def do_get_preferred_width(self) -> tuple[int, int]:
+        main, cross = self._measure()
+        if self.orientation == Gtk.Orientation.HORIZONTAL:
+            return main
+        return cross, cross
+
+    def do_get_preferred_height(self) -> tuple[int, int]:
+        main, cross = self._measure()
+        if self.orientation == Gtk.Orientation.HORIZONTAL:
+            return cross, cross
+        return main
+
+    def do_draw(self, cr: cairo.Context) -> bool:
+        style_context = self.get_style_context()
+        thickness = self._allocated_thickness()
+        for span in self._spans:
+            if span.name == "album_cover":
+                if self._cover_surface is None:
+                    self._paint_icon(cr, "emblem-music-symbolic", span, thickness)
+                    continue
+                width, height = self._cover_size
+                cross_size = (
+                    height if self.orientation == Gtk.Orientation.HORIZONTAL else width
+                )
+                self._paint_surface(
+                    cr,
+                    self._cover_surface,
+                    span.start + ceil(self.MARGINS["album_cover"] / 2),
+                    (thickness - cross_size) / 2,
+                )
+                continue
+
+            if span.name in TEXT_ELEMENTS:
+                layout = self._layouts[span.name]
+                text_height = self._text_sizes[span.name][1]
+                start = span.start + ceil(self.MARGINS[span.name] / 2)
+                cr.save()
+                if self.orientation == Gtk.Orientation.HORIZONTAL:
+                    cr.translate(start, (thickness - text_height) / 2)
+                else:
+                    cr.translate((thickness + text_height) / 2, start)
+                    cr.rotate(pi / 2)
+                Gtk.render_layout(style_context, cr, 0, 0, layout)
+                cr.restore()
+                continue
+
+            self._paint_icon(cr, self._button_icon_name(span.name), span, thickness)
+        return False
+
+    def do_realize(self) -> None:
+        Gtk.DrawingArea.do_realize(self)
+        self._create_cover_surface()
+        self._queue_resize_if_needed()
+
+    def _set_element_order(self, order: list[str]) -> None:
+        self.element_order = []
+        for element_name in order:
+            if element_name not in self.MARGINS and element_name not in self.BUTTONS:
+                print(
+                    f"budgie-media-player-applet: '{element_name}' "
+                    "not in available elements - probably wrong settings -> skipping"
+                )
+                continue
+            self.element_order.append(element_name)
+
+    def _set_texts(self) -> None:
+        name_text, author_text, show_separator = self.song_label_texts(
+            self.state.artist, self.state.title, self.element_order
+        )
+        self._texts = {
+            "song_name": name_text,
+            "song_author": author_text,
+            "song_separator": (
+                self.settings.get_string("separator-text") if show_separator else ""
+            ),
+        }
+        for name, layout in self._layouts.items():
+            layout.set_text(self._texts[name], -1)
+            layout.set_width(-1)
+            self._text_sizes[name] = layout.get_pixel_size()
+        self._queue_resize_if_needed()
+
+    def _ensure_layouts(self) -> None:
+        if self._layouts:
+            return
+        for name in TEXT_ELEMENTS:
+            layout = self.create_pango_layout(self._texts.get(name, ""))
+            layout.set_ellipsize(Pango.EllipsizeMode.END)
+            self._layouts[name] = layout
+            self._text_sizes[name] = layout.get_pixel_size()
+        context = self.get_pango_context()
+        metrics = context.get_metrics(context.get_font_description(), None)
+        self._char_width = ceil(metrics.get_approximate_char_width() / Pango.SCALE)
+
+    def _text_max_length(self, name: str) -> Optional[int]:
+        """the length the text is ellipsized to in the Variable mode, None if unlimited"""
+        if self.settings.get_uint("panel-length-mode") != PanelLengthMode.Variable:
+            return None
+        key = {
+            "song_name": "media-title-max-length",
+            "song_author": "author-name-max-length",
+        }.get(name)
+        if key is None or self.settings.get_int(key) < 0:
+            return None
+        return self.settings.get_int(key) * self._char_width
+
+    def _natural_lengths(self) -> dict[str, int]:
+        """the length of the elements along the main axis, including their margins"""
+        self._ensure_layouts()
+        lengths = {}
+        for name in self.element_order:
+            if name == "album_cover":
+                width, height = self._cover_size
+                if self._cover_surface is None:
+                    width = height = self.BUTTON_ICON_SIZE
+                lengths[name] = self.MARGINS[name] + (
+                    width if self.orientation == Gtk.Orientation.HORIZONTAL else height
+                )
+            elif name in TEXT_ELEMENTS:
+                text_length = self._text_sizes[name][0]
+                max_length = self._text_max_length(name)
+                if max_length is not None:
+                    text_length = min(text_length, max_length)
+                lengths[name] = (self.MARGINS[name] + text_length) if text_length else 0
+            else:
+                lengths[name] = self.BUTTON_ICON_SIZE + 2 * self.BUTTON_PADDING
+        return lengths
+
+    def _measure(self) -> tuple[tuple[int, int], int]:
+        """((minimal length, natural length), thickness)"""
+        self._ensure_layouts()
+        lengths = self._natural_lengths()
+        natural = sum(lengths.values())
+        minimum = sum(
+            length
+            for name, length in lengths.items()
+            if name not in TEXT_ELEMENTS or name == "song_separator"
+        )
+
+        if self.settings.get_uint("panel-length-mode") == PanelLengthMode.Fixed:
+            # the FixedSizeBin sizes this view, the natural size doesn't depend on
+            # the texts, so that a new title doesn't change the size request
+            natural = max(minimum, self.settings.get_uint("panel-length-fixed"))
+
+        thickness = max(
+            [self.BUTTON_ICON_SIZE]
+            + [size[1] for size in self._text_sizes.values()]
+            + [
+                (
+                    self._cover_size[1]
+                    if self.orientation == Gtk.Orientation.HORIZONTAL
+                    else self._cover_size[0]
+                )
+            ]
+        )
+        return (minimum, natural), thickness
+
+    def _queue_resize_if_needed(self) -> None:
+        (minimum, natural), thickness = self._measure()
+        requested_size = (minimum, natural, thickness, self.orientation)
+        if requested_size != self._requested_size:
+            self._requested_size = requested_size
+            self.queue_resize()
+            return
+        self._update_spans()
+        self.queue_draw()
+
+    def _update_spans(self) -> None:
+        lengths = self._natural_lengths()
+        available = self._allocated_length()
+        fixed_length = sum(
+            length
+            for name, length in lengths.items()
+            if name not in TEXT_ELEMENTS or name == "song_separator"
+        )
+        shrinkable = {
+            name: length
+            for name, length in lengths.items()
+            if name in {"song_name", "song_author"}
+        }
+        lengths.update(self._distribute(shrinkable, max(available - fixed_length, 0)))
+
+        self._spans = []
+        position = 0
+        for name, length in lengths.items():
+            if name in TEXT_ELEMENTS:
+                layout = self._layouts[name]
+                text_length = max(length - self.MARGINS[name], 0)
+                if text_length < self._text_sizes[name][0]:
+                    layout.set_width(text_length * Pango.SCALE)
+                else:
+                    layout.set_width(-1)
+            self._spans.append(ElementSpan(name, position, length))
+            position += length
+
+    @staticmethod
+    def _distribute(lengths: dict[str, int], available: int) -> dict[str, int]:
+        """shrink the lengths to fit into available, the longest ones are shrunk first"""
+        result = dict(lengths)
+        remaining = available
+        pending = sorted(lengths, key=lambda name: lengths[name])
+        while pending:
+            share = remaining // len(pending)
+            name = pending.pop(0)
+            result[name] = min(lengths[name], share)
+            remaining -= result[name]
+        return result
+
+    def _allocated_length(self) -> int:
+        if self.orientation == Gtk.Orientation.HORIZONTAL:
+            return self.get_allocated_width()
+        return self.get_allocated_height()
+
+    def _allocated_thickness(self) -> int:
+        if self.orientation == Gtk.Orientation.HORIZONTAL:
+            return self.get_allocated_height()
+        return self.get_allocated_width()
+
+    def _queue_draw_element(self, name: str) -> None:
+        for span in self._spans:
+            if span.name != name:
+                continue
+            if self.orientation == Gtk.Orientation.HORIZONTAL:
+                self.queue_draw_area(
+                    span.start, 0, span.length, self.get_allocated_height()
+                )
+            else:
+                self.queue_draw_area(
+                    0, span.start, self.get_allocated_width(), span.length
+                )
+
+    def _button_icon_name(self, name: str) -> str:
+        if name == "play_pause_button":
+            return play_pause_icon_name(self.state.playing)
+        return self.BUTTONS[name][0]
+
+    def _button_sensitive(self, name: str) -> bool:
+        if name == "play_pause_button":
+            return self.state.can_play_or_pause
+        if name == "backward_button":
+            return self.state.can_go_previous
+        if name == "forward_button":
+            return self.state.can_go_next
+        return True
+
+    def _icon_surface(self, icon_name: str) -> Optional[cairo.Surface]:
+        return IconCache.get_default().symbolic_surface(
+            icon_name,
+            self.BUTTON_ICON_SIZE,
+            self.get_scale_factor(),
+            self.get_style_context(),
+        )
+
+    def _paint_icon(
+        self, cr: cairo.Context, icon_name: str, span: ElementSpan, thickness: int
+    ) -> None:
+        surface = self._icon_surface(icon_name)
+        if surface is None:
+            return
+        offset = (span.length - self.BUTTON_ICON_SIZE) / 2
+        alpha = (
+            1.0
+            if self._button_sensitive(span.name)
+            else self.INSENSITIVE_ALPHA
+        )
+        self._paint_surface(
+            cr,
+            surface,
+            span.start + offset,
+            (thickness - self.BUTTON_ICON_SIZE) / 2,
+            alpha,
+        )
+
+    def _paint_surface(
+        self,
+        cr: cairo.Context,
+        surface: cairo.Surface,
+        main_position: float,
+        cross_position: float,
+        alpha: float = 1.0,
+    ) -> None:
+        if self.orientation == Gtk.Orientation.HORIZONTAL:
+            x, y = main_position, cross_position
+        else:
+            x, y = cross_position, main_position
+        cr.set_source_surface(surface, round(x), round(y))
+        cr.paint_with_alpha(alpha)
+
+    def _on_album_cover_resized(
+        self, pixbuf: Optional[GdkPixbuf.Pixbuf], request: int
+    ) -> None:
+        if pixbuf is None or request != self._album_cover_scale_request:
+            # a newer cover or size was requested in the meantime
+            return
+        self._set_cover_pixbuf(pixbuf)
+
+    def _set_cover_pixbuf(self, pixbuf: GdkPixbuf.Pixbuf, scale: int = 1) -> None:
+        self._cover_pixbuf = pixbuf
+        self._cover_scale = scale
+        self._cover_surface = None
+        if self.get_window() is not None:
+            self._create_cover_surface()
+        self._queue_resize_if_needed()
+
+    def _create_cover_surface(self) -> None:
+        if self._cover_pixbuf is None:
+            return
+        self._cover_surface = Gdk.cairo_surface_create_from_pixbuf(
+            self._cover_pixbuf, self._cover_scale, self.get_window()
+        )
+        self._cover_size = (
+            self._cover_pixbuf.get_width() // self._cover_scale,
+            self._cover_pixbuf.get_height() // self._cover_scale,
+        )
+
+    def _element_at(self, x: float, y: float) -> Optional[str]:
+        position = x if self.orientation == Gtk.Orientation.HORIZONTAL else y
+        for span in self._spans:
+            if span.start <= position < span.start + span.length:
+                return span.name
+        return None
+
+    def _on_button_press(self, _, event: EventButton) -> bool:
+        name = self._element_at(event.x, event.y)
+        if name is None:
+            return False
+
+        if name in self.BUTTONS:
+            if not self._button_sensitive(name):
+                return True
+            self.dbus_player.call_player_method(
+                {
+                    "play_pause_button": "PlayPause",
+                    "backward_button": "Previous",
+                    "forward_button": "Next",
+                }[name]
+            )
+            return True
+
+        action = self.click_actions.get(event.button, PanelClickAction.open_popover)
+        if action == PanelClickAction.next:
+            self.dbus_player.call_player_method("Next")
+        elif action == PanelClickAction.previous:
+            self.dbus_player.call_player_method("Previous")
+        elif action == PanelClickAction.play_pause:
+            self.dbus_player.call_player_method("PlayPause")
+        else:
+            self.open_popover_func()
+        return True
+
+    def _on_query_tooltip(
+        self, _, x: int, y: int, __, tooltip: Gtk.Tooltip
+    ) -> bool:
+        name = self._element_at(x, y)
+        if name not in self.BUTTONS:
+            return False
+        tooltip.set_text(self.BUTTONS[name][1])
+        return True
+
+    def _on_style_updated(self, _) -> None:
+        # the font or the colors may have changed
+        self._layouts = {}
+        self._requested_size = None
+        self._queue_resize_if_needed()
+
+    def _icon_theme_changed(self) -> None:
+        if self.state.album_cover.cover_type != AlbumCoverType.Pixbuf:
+            self.set_album_cover(self.state.album_cover)
+        self.queue_draw()
+
+    def _on_destroy(self, _) -> None:
+        self._art_cancellable.cancel()
+        self.settings.disconnect(self._settings_handler_id)
+        IconCache.get_default().remove_callback(self._icon_cache_callback_id)
+        self.power_policy.remove_callback(self._power_policy_callback_id)
+
+    def _power_policy_changed(self) -> None:
+        if self.power_policy.interp_type == self._interp_type:
+            return
+        self._interp_type = self.power_policy.interp_type
+        if self.state.album_cover.cover_type == AlbumCoverType.Pixbuf:
+            self.set_album_cover(self.state.album_cover)
+
+    def _settings_changed(self, settings: Gio.Settings, key: str) -> None:
+        if key == "element-order":
+            self._set_element_order(settings.get_strv(key))
+            self._set_texts()
+        elif key == "separator-text":
+            self._set_texts()
+        elif key in {
+            "panel-length-mode",
+            "panel-length-fixed",
+            "media-title-max-length",
+            "author-name-max-length",
+        }:
+            self._queue_resize_if_needed()
+        elif key == "panel-click-action":
+            self.click_actions = settings.get_value(key).unpack()
@@ -6,10 +6,17 @@ from EnumsStructs import (
     AlbumCoverData,
     PanelLengthMode,
     PanelClickAction,
+    PanelState,
 )
 from mprisWrapper import MprisWrapper
-from dataclasses import dataclass
-from typing import Optional, Callable
+from ImagePipeline import ImagePipeline
+from PowerPolicy import PowerPolicy
+from Labels import ScrollingLabel
+from IconCache import IconCache, SymbolicImage, play_pause_icon_name
+from FixedSizeBin import FixedSizeBin
+from PanelViewBase import PanelViewBase
+from dataclasses import dataclass, replace
+from typing import Optional, Callable, Union
 from math import ceil, floor
 import gi
 
@@ -18,9 +25,10 @@ gi.require_version("Gio", "2.0")
 gi.require_version("GdkPixbuf", "2.0")
 gi.require_version("Pango", "1.0")
 gi.require_version("Gdk", "3.0")
-from gi.repository import Gtk, GdkPixbuf, Gio
+gi.require_version("GLib", "2.0")
+from gi.repository import Gtk, Gdk, GdkPixbuf, Gio, GLib
 from gi.repository.Pango import EllipsizeMode
-from gi.repository.Gdk import EventButton
+from gi.repository.Gdk import EventButton, EventCrossing, EventType, NotifyType
 
 
 @dataclass
@@ -29,17 +37,11 @@ class MarginElement:
     margin: int
 
 
-class PanelControlView(Gtk.Box):
+class PanelControlView(Gtk.Box, PanelViewBase):
     def __init__(
         self,
         dbus_player: MprisWrapper,
-        title: str,
-        artist: list[str],
-        album_cover: Optional[AlbumCoverData],
-        playing: bool,
-        can_play_or_pause: bool,
-        can_go_previous: bool,
-        can_go_next: bool,
+        state: PanelState,
         open_popover_func: Callable[[], None],
         orientation: Gtk.Orientation,
         panel_size: int,
@@ -56,12 +58,21 @@ class PanelControlView(Gtk.Box):
         self.element_margins: list[MarginElement] = []
         self.element_order: list[str] = []
         self.click_actions: dict[int, PanelClickAction] = {}
+        self._album_cover_scale_request: int = 0
+        self._art_cancellable: Gio.Cancellable = Gio.Cancellable()
+        self.state: PanelState = replace(state, album_cover=replace(state.album_cover))
+        self._hovered_elements: set[Gtk.Widget] = set()
+        self._hover_update_id: Optional[int] = None
+        self.power_policy: PowerPolicy = PowerPolicy.for_settings(settings)
+        self._power_policy_callback_id: int = self.power_policy.add_callback(
+            self._update_scrolling_max_fps
+        )
 
         self.album_cover: Gtk.Image = Gtk.Image.new_from_icon_name(
             "emblem-music-symbolic", Gtk.IconSize.MENU
         )
-        self.song_name_label: Gtk.Label = Gtk.Label()
-        self.song_author_label: Gtk.Label = Gtk.Label()
+        self.song_name_label: Union[Gtk.Label, ScrollingLabel] = Gtk.Label()
+        self.song_author_label: Union[Gtk.Label, ScrollingLabel] = Gtk.Label()
         self.song_separator: Gtk.Label = Gtk.Label()
         self.play_pause_button: Gtk.Button = Gtk.Button()
         self.go_previous_button: Gtk.Button = Gtk.Button()
@@ -73,8 +84,8 @@ class PanelControlView(Gtk.Box):
         album_cover_event_box.connect("button-press-event", self._song_clicked)
         self.available_elements.update({"album_cover": album_cover_event_box})
         self.element_margins.append(MarginElement(album_cover_event_box, 5))
-        if (album_cover is not None) and album_cover.cover_type != AlbumCoverType.Null:
-            self.set_album_cover(album_cover)
+        if state.album_cover.cover_type != AlbumCoverType.Null:
+            self.set_album_cover(state.album_cover)
 
         label_angle = 0 if self.orientation == Gtk.Orientation.HORIZONTAL else 270
 
@@ -104,55 +115,50 @@ class PanelControlView(Gtk.Box):
         self.element_margins.append(MarginElement(song_separator_event_box, 4))
 
         # play pause button
-        self.play_pause_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                (
-                    "media-playback-pause-symbolic"
-                    if playing
-                    else "media-playback-start-symbolic"
-                ),
-                Gtk.IconSize.MENU,
-            )
+        self.play_pause_image: SymbolicImage = SymbolicImage(
+            play_pause_icon_name(state.playing)
         )
+        self.play_pause_button.set_image(self.play_pause_image)
         self.play_pause_button.set_relief(Gtk.ReliefStyle.NONE)
-        self.play_pause_button.set_sensitive(can_play_or_pause)
+        self.play_pause_button.set_sensitive(state.can_play_or_pause)
         self.play_pause_button.connect("button-press-event", self._play_paused_clicked)
         self.play_pause_button.set_tooltip_text("Play / Pause")
         self.available_elements.update({"play_pause_button": self.play_pause_button})
 
         # backward_button
-        self.go_previous_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                "media-skip-backward-symbolic", Gtk.IconSize.MENU
-            )
-        )
+        self.go_previous_button.set_image(SymbolicImage("media-skip-backward-symbolic"))
         self.go_previous_button.set_relief(Gtk.ReliefStyle.NONE)
-        self.go_previous_button.set_sensitive(can_go_previous)
+        self.go_previous_button.set_sensitive(state.can_go_previous)
         self.go_previous_button.connect("button-press-event", self._backward_clicked)
         self.go_previous_button.set_tooltip_text("Go to the previous song / media")
         self.available_elements.update({"backward_button": self.go_previous_button})
 
         # forward_button
-        self.go_next_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                "media-skip-forward-symbolic", Gtk.IconSize.MENU
-            )
-        )
+        self.go_next_button.set_image(SymbolicImage("media-skip-forward-symbolic"))
         self.go_next_button.set_relief(Gtk.ReliefStyle.NONE)
-        self.go_next_button.set_sensitive(can_go_next)
+        self.go_next_button.set_sensitive(state.can_go_next)
         self.go_next_button.connect("button-press-event", self._forward_clicked)
         self.go_next_button.set_tooltip_text("Go to the next song / media")
         self.available_elements.update({"forward_button": self.go_next_button})
 
-        self.settings.connect("changed", self._settings_changed)
+        for element in self.available_elements.values():
+            element.connect("enter-notify-event", self._pointer_crossed)
+            element.connect("leave-notify-event", self._pointer_crossed)
 
-        self._set_length()
-        self._set_element_order(
-            settings.get_strv("element-order"), remove_previous=False
+        self._settings_handler_id: int = self.settings.connect(
+            "changed", self._settings_changed
+        )
+        self._icon_cache_callback_id: int = IconCache.get_default().add_callback(
+            self._icon_theme_changed
         )
+        self.connect("notify::scale-factor", lambda *_: self._icon_theme_changed())
+        self.connect("destroy", self._on_destroy)
+
+        self._set_length()
+        self._set_element_order(settings.get_strv("element-order"))
         self._set_element_margins()
         self.click_actions = settings.get_value("panel-click-action").unpack()
-        self._set_song_label(name=title, author=artist)
+        self._set_song_label(name=state.title, author=state.artist)
         self.show_all()
 
     def set_orientation(self, _):
@@ -177,69 +183,101 @@ class PanelControlView(Gtk.Box):
         self.set_album_cover(album_cover_data)
 
     def set_playing(self, playing: bool) -> None:
-        self.play_pause_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                (
-                    "media-playback-pause-symbolic"
-                    if playing
-                    else "media-playback-start-symbolic"
-                ),
-                Gtk.IconSize.MENU,
-            )
-        )
+        self.state.playing = playing
+        self.play_pause_image.set_icon_name(play_pause_icon_name(playing))
 
     def set_metadata(self, artist: list[str], title: str) -> None:
+        self.state.title = title
+        self.state.artist = artist
+        separator_text = self.song_separator.get_label()
         self._set_song_label(artist, title)
+        if self.song_separator.get_label() == separator_text:
+            # the separator isn't ellipsized, only the other labels are
+            self._size_bin_hint(text_only=True)
 
     def set_can_play_or_pause(self, can_play_or_pause: bool) -> None:
+        self.state.can_play_or_pause = can_play_or_pause
         self.play_pause_button.set_sensitive(can_play_or_pause)
 
     def set_can_go_previous(self, can_go_previous: bool) -> None:
+        self.state.can_go_previous = can_go_previous
         self.go_previous_button.set_sensitive(can_go_previous)
 
     def set_can_go_next(self, can_go_next: bool) -> None:
+        self.state.can_go_next = can_go_next
         self.go_next_button.set_sensitive(can_go_next)
 
     def set_album_cover(self, data: AlbumCoverData) -> None:
+        self.state.album_cover = replace(data)
+        self._album_cover_scale_request += 1
+        self._size_bin_hint(text_only=False)
         if data.cover_type == AlbumCoverType.Pixbuf:
-            if self.orientation == Gtk.Orientation.HORIZONTAL:
-                resized_pixbuf = data.song_cover_pixbuf.scale_simple(
-                    int(
-                        (self.album_cover_size / data.song_cover_pixbuf.get_height())
-                        * data.song_cover_pixbuf.get_width()
-                    ),
-                    self.album_cover_size,
-                    GdkPixbuf.InterpType.BILINEAR,
-                )
-            else:
-                resized_pixbuf = data.song_cover_pixbuf.scale_simple(
-                    self.album_cover_size,
-                    int(
-                        (self.album_cover_size / data.song_cover_pixbuf.get_width())
-                        * data.song_cover_pixbuf.get_height()
-                    ),
-                    GdkPixbuf.InterpType.BILINEAR,
-                )
-            self.album_cover.set_from_pixbuf(resized_pixbuf)
-
-        elif data.cover_type == AlbumCoverType.Gicon:
-            icon_info = Gtk.IconTheme.get_default().lookup_by_gicon(
-                data.song_cover_other,
-                min(Gtk.IconSize.lookup(Gtk.IconSize.DND)[2], self.album_cover_size),
-                Gtk.IconLookupFlags(Gtk.IconLookupFlags.FORCE_SIZE),
+            request = self._album_cover_scale_request
+            ImagePipeline.get_default().scale_to_fit(
+                data.song_cover_pixbuf,
+                (
+                    None
+                    if self.orientation == Gtk.Orientation.HORIZONTAL
+                    else self.album_cover_size
+                ),
+                (
+                    self.album_cover_size
+                    if self.orientation == Gtk.Orientation.HORIZONTAL
+                    else None
+                ),
+                lambda resized: self._on_album_cover_resized(resized, request),
+                self._art_cancellable,
+                cache_key=data.image_cache_key,
+                interp_type=self.power_policy.interp_type,
             )
-            if icon_info is not None:
-                pixbuf = icon_info.load_icon()
-                self.album_cover.set_from_pixbuf(pixbuf)
 
-        elif data.cover_type == AlbumCoverType.IconName:
-            pixbuf = Gtk.IconTheme.get_default().load_icon(
+        elif data.cover_type in {AlbumCoverType.Gicon, AlbumCoverType.IconName}:
+            scale = self.get_scale_factor()
+            pixbuf = IconCache.get_default().fallback_cover_pixbuf(
                 data.song_cover_other,
                 min(Gtk.IconSize.lookup(Gtk.IconSize.DND)[2], self.album_cover_size),
-                Gtk.IconLookupFlags(Gtk.IconLookupFlags.FORCE_SIZE),
+                scale,
             )
             if pixbuf is not None:
-                self.album_cover.set_from_pixbuf(pixbuf)
+                self.album_cover.set_from_surface(
+                    Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None)
+                )
+
+    def _on_album_cover_resized(
+        self, pixbuf: Optional[GdkPixbuf.Pixbuf], request: int
+    ) -> None:
+        if pixbuf is None or request != self._album_cover_scale_request:
+            # a newer cover or size was requested in the meantime
+            return
+        self._size_bin_hint(text_only=False)
+        self.album_cover.set_from_pixbuf(pixbuf)
+
+    def _icon_theme_changed(self) -> None:
+        if self.state.album_cover.cover_type in {
+            AlbumCoverType.Gicon,
+            AlbumCoverType.IconName,
+        }:
+            self.set_album_cover(self.state.album_cover)
+
+    def _size_bin_hint(self, text_only: bool) -> None:
+        """tell the FixedSizeBin the view is in, what kind of resize follows"""
+        size_bin = self.get_parent()
+        if not isinstance(size_bin, FixedSizeBin):
+            return
+        if text_only:
+            size_bin.text_changed()
+        else:
+            size_bin.invalidate_measurements()
+
+    def _on_destroy(self, _) -> None:
+        # drop the scaling that is still in progress, the view is gone
+        self._art_cancellable.cancel()
+        self.settings.disconnect(self._settings_handler_id)
+        self.power_policy.remove_callback(self._power_policy_callback_id)
+        IconCache.get_default().remove_callback(self._icon_cache_callback_id)
+        if self._hover_update_id is not None:
+            GLib.source_remove(self._hover_update_id)
+            self._hover_update_id = None
 
     def _play_paused_clicked(self, *_) -> None:
         self.dbus_player.call_player_method("PlayPause")
@@ -268,13 +306,15 @@ class PanelControlView(Gtk.Box):
             self.separator_text = new_text
         self.song_separator.set_label(new_text)
 
-    def _set_element_order(
-        self, order: list[str], remove_previous: bool = True
-    ) -> None:
+    def _set_element_order(self, order: list[str]) -> None:
+        """
+        Change the order of the elements in place: only the elements that were
+        removed or added are unpacked or packed and only the misplaced ones
+        are moved, so the unchanged elements are not remapped
+        """
         self.element_order = order
-        if remove_previous:
-            self.foreach(self.remove)
-
+        self._size_bin_hint(text_only=False)
+        widgets: list[Gtk.Widget] = []
         for element_name in self.element_order:
             widget = self.available_elements.get(element_name)
             if widget is None:
@@ -283,91 +323,78 @@ class PanelControlView(Gtk.Box):
                     "not in available elements - probably wrong settings -> skipping"
                 )
                 continue
-            self.pack_start(widget, False, False, 0)
+            if widget not in widgets:
+                widgets.append(widget)
 
-        self.show_all()
+        for child in self.get_children():
+            if child not in widgets:
+                self.remove(child)
 
-    def _set_song_label(self, author: Optional[list[str]], name: Optional[str]) -> None:
-        s_author = self._get_author(author)
-        s_name = self._get_name(name)
+        children = self.get_children()
+        for position, widget in enumerate(widgets):
+            if position < len(children) and children[position] is widget:
+                continue
+            if widget.get_parent() is None:
+                self.pack_start(widget, False, False, 0)
+                widget.show_all()
+            self.reorder_child(widget, position)
+            children = self.get_children()
 
-        if s_author and s_name:
-            self.song_author_label.set_label(s_author)
-            self.song_name_label.set_label(s_name)
-            self._set_separator_text(self.separator_text)
-            return
-        if s_author and not s_name:
-            self.song_author_label.set_label(s_author)
-            self.song_name_label.set_label("Unknown")
+    def _set_song_label(self, author: Optional[list[str]], name: Optional[str]) -> None:
+        name_text, author_text, show_separator = self.song_label_texts(
+            author, name, self.element_order
+        )
+        self.song_author_label.set_label(author_text)
+        self.song_name_label.set_label(name_text)
+        if show_separator:
             self._set_separator_text(self.separator_text)
-            return
-        if not s_author and s_name:
-            self.song_name_label.set_label(s_name)
-            if "song_name" in self.element_order:
-                self.song_author_label.set_label("")
-                self._set_separator_text("", override_set_text=False)
-            else:
-                self.song_author_label.set_label("Unknown")
-                self._set_separator_text(self.separator_text)
-            return
-
-        if "song_name" in self.element_order and "song_author" in self.element_order:
-            self.song_author_label.set_label("")
-            self.song_name_label.set_label("Unknown")
+        else:
             self._set_separator_text("", override_set_text=False)
-            return
-
-        self.song_author_label.set_label("Unknown")
-        self.song_name_label.set_label("Unknown")
-        self._set_separator_text("", override_set_text=False)
-
-    @staticmethod
-    def _get_name(title: Optional[str]) -> str:
-        """This func is only used in _set_song_label"""
-        if title is None:
-            return ""
-        if not title:
-            return ""
-        if title.isspace():
-            return ""
-        return title
-
-    @staticmethod
-    def _get_author(author: Optional[list[str]]) -> str:
-        """This func is only used in _set_song_label"""
-        if author is None:
-            return ""
-        if not author:
-            return ""
-        j_author = "".join(author)
-        if not j_author:
-            return ""
-        if j_author.isspace():
-            return ""
-        return ", ".join(author)
 
     def _settings_changed(self, settings: Gio.Settings, key: str) -> None:
         if key == "separator-text":
+            self._size_bin_hint(text_only=False)
             self.song_separator.set_label(settings.get_string(key))
         elif key == "element-order":
             self._set_element_order(settings.get_strv(key))
+            # the separator is shown only between the name and the author
+            self._set_song_label(self.state.artist, self.state.title)
         elif key in {
             "panel-length-mode",
             "media-title-max-length",
             "author-name-max-length",
+            "panel-text-scrolling",
         }:
             self._set_length()
         elif key == "panel-click-action":
             self.click_actions = settings.get_value(key).unpack()
+        elif key == "panel-scrolling-speed":
+            for label in (self.song_name_label, self.song_author_label):
+                if isinstance(label, ScrollingLabel):
+                    label.set_speed(settings.get_double(key))
+        elif key == "panel-scrolling-max-fps":
+            self._update_scrolling_max_fps()
+        elif key == "panel-scrolling-pause-on-leave":
+            self._update_scrolling_paused()
 
     def _set_length(self) -> None:
+        self._size_bin_hint(text_only=False)
         panel_len_mode = self.settings.get_uint("panel-length-mode")
-        if panel_len_mode in {PanelLengthMode.Variable, PanelLengthMode.Fixed}:
-            self.song_name_label.set_ellipsize(EllipsizeMode.END)
-            self.song_author_label.set_ellipsize(EllipsizeMode.END)
-        else:
-            self.song_name_label.set_ellipsize(EllipsizeMode.NONE)
-            self.song_author_label.set_ellipsize(EllipsizeMode.NONE)
+        # with no limit the text always fits, there is nothing to scroll
+        scrolling = panel_len_mode != PanelLengthMode.NoLimit and (
+            self.settings.get_boolean("panel-text-scrolling")
+        )
+        if scrolling != isinstance(self.song_name_label, ScrollingLabel):
+            self._swap_song_labels(scrolling)
+
+        if not scrolling:
+            ellipsize = (
+                EllipsizeMode.END
+                if panel_len_mode in {PanelLengthMode.Variable, PanelLengthMode.Fixed}
+                else EllipsizeMode.NONE
+            )
+            self.song_name_label.set_ellipsize(ellipsize)
+            self.song_author_label.set_ellipsize(ellipsize)
 
         if panel_len_mode == PanelLengthMode.Variable:
             self.song_name_label.set_max_width_chars(
@@ -380,6 +407,66 @@ class PanelControlView(Gtk.Box):
             self.song_name_label.set_max_width_chars(-1)
             self.song_author_label.set_max_width_chars(-1)
 
+    def _swap_song_labels(self, scrolling: bool) -> None:
+        angle = 0 if self.orientation == Gtk.Orientation.HORIZONTAL else 270
+        labels = []
+        for element_name in ("song_name", "song_author"):
+            event_box = self.available_elements[element_name]
+            event_box.get_child().destroy()
+            if scrolling:
+                label = ScrollingLabel(
+                    speed=self.settings.get_double("panel-scrolling-speed"),
+                    max_fps=self._scrolling_max_fps(),
+                )
+            else:
+                label = Gtk.Label()
+            label.set_angle(angle)
+            event_box.add(label)
+            labels.append(label)
+
+        self.song_name_label, self.song_author_label = labels
+        self._set_element_margins()
+        self._set_song_label(self.state.artist, self.state.title)
+        self._update_scrolling_paused()
+        self.show_all()
+
+    def _scrolling_max_fps(self) -> int:
+        return self.power_policy.scrolling_max_fps(
+            self.settings.get_uint("panel-scrolling-max-fps")
+        )
+
+    def _update_scrolling_max_fps(self) -> None:
+        for label in (self.song_name_label, self.song_author_label):
+            if isinstance(label, ScrollingLabel):
+                label.set_max_fps(self._scrolling_max_fps())
+
+    def _pointer_crossed(self, element: Gtk.Widget, event: EventCrossing) -> bool:
+        if event.type == EventType.ENTER_NOTIFY:
+            self._hovered_elements.add(element)
+        elif event.detail != NotifyType.INFERIOR:
+            # INFERIOR: the pointer moved into a child window, it's still inside
+            self._hovered_elements.discard(element)
+
+        # when moving between elements, the leave and the enter come right after
+        # each other, the update is deferred to not pause the scrolling in between
+        if self._hover_update_id is None:
+            self._hover_update_id = GLib.idle_add(self._on_hover_update)
+        return False
+
+    def _on_hover_update(self) -> bool:
+        self._hover_update_id = None
+        self._update_scrolling_paused()
+        return False
+
+    def _update_scrolling_paused(self) -> None:
+        paused = (
+            self.settings.get_boolean("panel-scrolling-pause-on-leave")
+            and not self._hovered_elements
+        )
+        for label in (self.song_name_label, self.song_author_label):
+            if isinstance(label, ScrollingLabel):
+                label.set_paused(paused)
+
     def _set_element_margins(self):
         # floor and ceil is used because margins can only be integers and if the spacing is odd
         # this will distribute it around the element such that one is one px larger than the other
@@ -0,0 +1,166 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Callable, Optional
+import gi
+
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gio, GLib
+
+
+class PanelFollowPolicy:
+    """
+    Moves the panel view to the player that most recently started playing,
+    when the panel-follow-playing setting is on.
+
+    To not rebuild the panel view on every spurious PlaybackStatus flip,
+    a player is followed only after it has been playing for
+    panel-follow-delay milliseconds (browsers briefly play previews),
+    and the panel player is kept for at least panel-follow-min-dwell seconds.
+
+    A player pinned by the user is never replaced, until it is unpinned
+    or goes away.
+    """
+
+    def __init__(
+        self,
+        settings: Gio.Settings,
+        is_playing: Callable[[str], bool],
+        switch_to: Callable[[str], None],
+    ):
+        """
+        is_playing(service_name) tells whether the player is still playing,
+        False if it's gone, switch_to(service_name) moves the panel view
+        """
+        self.settings: Gio.Settings = settings
+        self._is_playing: Callable[[str], bool] = is_playing
+        self._switch_to: Callable[[str], None] = switch_to
+
+        self.pinned_service_name: Optional[str] = None
+        """the player pinned to the panel by the user"""
+        self._panel_service_name: Optional[str] = None
+        self._panel_since: int = 0
+        """monotonic time at which the panel player was last changed"""
+        self._candidate: Optional[str] = None
+        """the player that started playing and may be followed"""
+        self._candidate_since: int = 0
+        self._playing: dict[str, int] = {}
+        """
+        the players last seen playing, with the monotonic time they started,
+        only a start of playback is followed
+        """
+        self._timeout_id: Optional[int] = None
+
+        self.enabled: bool = settings.get_boolean("panel-follow-playing")
+        settings.connect("changed", self._settings_changed)
+
+    def pin(self, service_name: Optional[str]) -> None:
+        """pin the player to the panel, None unpins"""
+        self.pinned_service_name = service_name
+        self._drop_candidate()
+        if service_name is None:
+            self._follow_latest()
+
+    def panel_player_changed(self, service_name: Optional[str]) -> None:
+        if service_name == self._panel_service_name:
+            return
+        self._panel_service_name = service_name
+        self._panel_since = GLib.get_monotonic_time()
+        if service_name == self._candidate:
+            self._drop_candidate()
+
+    def player_activity(self, service_name: str, playing: bool) -> None:
+        if playing == (service_name in self._playing):
+            return
+        if not playing:
+            self._playing.pop(service_name, None)
+            if service_name == self._candidate:
+                # it stopped before it could be followed, e.g. a preview
+                self._drop_candidate()
+            return
+
+        self._playing[service_name] = GLib.get_monotonic_time()
+        if (
+            not self.enabled
+            or self.pinned_service_name is not None
+            or service_name == self._panel_service_name
+            or service_name == self._candidate
+        ):
+            return
+
+        self._set_candidate(service_name)
+
+    def player_added(self, service_name: str, playing: bool) -> None:
+        """a player that already plays when it appears is not followed"""
+        if playing:
+            # the start is unknown, it's older than any seen start
+            self._playing[service_name] = 0
+
+    def player_removed(self, service_name: str) -> None:
+        self._playing.pop(service_name, None)
+        if service_name == self.pinned_service_name:
+            self.pinned_service_name = None
+        if service_name == self._candidate:
+            self._drop_candidate()
+
+    def _set_candidate(self, service_name: str) -> None:
+        self._drop_candidate()
+        self._candidate = service_name
+        self._candidate_since = self._playing[service_name]
+        self._schedule()
+
+    def _follow_latest(self) -> None:
+        """consider the player that started playing last, e.g. while pinned"""
+        if not self.enabled or self.pinned_service_name is not None:
+            return
+        started = {
+            service_name: since
+            for service_name, since in self._playing.items()
+            if service_name != self._panel_service_name
+        }
+        if started:
+            self._set_candidate(max(started, key=started.get))
+
+    def _schedule(self) -> None:
+        now = GLib.get_monotonic_time()
+        delay_us = self.settings.get_uint("panel-follow-delay") * 1000
+        dwell_us = self.settings.get_uint("panel-follow-min-dwell") * 1_000_000
+        wait_us = max(
+            self._candidate_since + delay_us - now,
+            self._panel_since + dwell_us - now,
+            0,
+        )
+        self._timeout_id = GLib.timeout_add(
+            (wait_us + 999) // 1000, self._follow_candidate
+        )
+
+    def _follow_candidate(self) -> bool:
+        self._timeout_id = None
+        service_name, self._candidate = self._candidate, None
+        if service_name is None or not self.enabled:
+            return False
+        if self.pinned_service_name is not None:
+            return False
+        if not self._is_playing(service_name):
+            return False
+        self._switch_to(service_name)
+        return False
+
+    def _drop_candidate(self) -> None:
+        self._candidate = None
+        if self._timeout_id is not None:
+            GLib.source_remove(self._timeout_id)
+            self._timeout_id = None
+
+    def _settings_changed(self, settings: Gio.Settings, changed_key: str) -> None:
+        if changed_key == "panel-follow-playing":
+            self.enabled = settings.get_boolean("panel-follow-playing")
+            if not self.enabled:
+                self._drop_candidate()
+            return
+        if changed_key in {"panel-follow-delay", "panel-follow-min-dwell"}:
+            if self._timeout_id is not None:
+                # the pending candidate waits for the new time
+                GLib.source_remove(self._timeout_id)
+                self._schedule()
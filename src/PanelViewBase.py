@@ -0,0 +1,90 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Optional
+from EnumsStructs import PanelState
+from mprisWrapper import MprisWrapper
+
+
+class PanelViewBase:
+    """
+    What PanelControlView and PanelCanvasView share, the views implement
+    the setters bind() uses (set_metadata(), set_album_cover(), set_playing(),
+    set_can_play_or_pause(), set_can_go_previous(), set_can_go_next())
+    and keep the shown state in self.state
+    """
+
+    state: PanelState
+    dbus_player: MprisWrapper
+
+    def bind(self, dbus_player: MprisWrapper, state: PanelState) -> None:
+        """
+        Show another player (or the same one again), only the parts
+        of the state that differ from the current one are updated
+        """
+        self.dbus_player = dbus_player
+        changed = self.state.changed_fields(state)
+        if changed & {"title", "artist"}:
+            self.set_metadata(state.artist, state.title)
+        if "album_cover" in changed:
+            self.set_album_cover(state.album_cover)
+        if "playing" in changed:
+            self.set_playing(state.playing)
+        if "can_play_or_pause" in changed:
+            self.set_can_play_or_pause(state.can_play_or_pause)
+        if "can_go_previous" in changed:
+            self.set_can_go_previous(state.can_go_previous)
+        if "can_go_next" in changed:
+            self.set_can_go_next(state.can_go_next)
+
+    @classmethod
+    def song_label_texts(
+        cls,
+        author: Optional[list[str]],
+        name: Optional[str],
+        element_order: list[str],
+    ) -> tuple[str, str, bool]:
+        """
+        The texts of the song name and the song author in the panel,
+        and whether the separator should be shown
+        """
+        s_author = cls._get_author(author)
+        s_name = cls._get_name(name)
+
+        if s_author and s_name:
+            return s_name, s_author, True
+        if s_author and not s_name:
+            return "Unknown", s_author, True
+        if not s_author and s_name:
+            if "song_name" in element_order:
+                return s_name, "", False
+            return s_name, "Unknown", True
+
+        if "song_name" in element_order and "song_author" in element_order:
+            return "Unknown", "", False
+        return "Unknown", "Unknown", False
+
+    @staticmethod
+    def _get_name(title: Optional[str]) -> str:
+        """This func is only used in song_label_texts"""
+        if title is None:
+            return ""
+        if not title:
+            return ""
+        if title.isspace():
+            return ""
+        return title
+
+    @staticmethod
+    def _get_author(author: Optional[list[str]]) -> str:
+        """This func is only used in song_label_texts"""
+        if author is None:
+            return ""
+        if not author:
+            return ""
+        j_author = "".join(author)
+        if not j_author:
+            return ""
+        if j_author.isspace():
+            return ""
+        return ", ".join(author)
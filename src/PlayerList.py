@@ -0,0 +1,183 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Iterable, Optional
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gio", "2.0")
+gi.require_version("GObject", "2.0")
+gi.require_version("Pango", "1.0")
+from gi.repository import Gtk, Gio, GObject
+from gi.repository.Pango import EllipsizeMode
+
+
+class PlayerItem(GObject.Object):
+    """
+    What the compact row of the player list shows of a player,
+    the player keeps it updated and the rows are bound to its properties
+    """
+
+    title = GObject.Property(type=str, default="")
+    artist = GObject.Property(type=str, default="")
+    playing = GObject.Property(type=bool, default=False)
+    gicon = GObject.Property(type=Gio.Icon)
+
+    def __init__(self, player: Gtk.Widget):
+        super().__init__()
+        self.player: Gtk.Widget = player
+        """the SingleAppPlayer, shown when its row is selected"""
+
+
+class PlayerRow(Gtk.ListBoxRow):
+    """a compact row of a player, that expands into the full controls"""
+
+    ICON_SIZE: Gtk.IconSize = Gtk.IconSize.LARGE_TOOLBAR
+
+    def __init__(self, item: PlayerItem):
+        super().__init__()
+        self.item: PlayerItem = item
+
+        icon = Gtk.Image(icon_size=self.ICON_SIZE)
+        item.bind_property("gicon", icon, "gicon", GObject.BindingFlags.SYNC_CREATE)
+
+        title_label = Gtk.Label(
+            xalign=0.0, ellipsize=EllipsizeMode.END, max_width_chars=1
+        )
+        artist_label = Gtk.Label(
+            xalign=0.0, ellipsize=EllipsizeMode.END, max_width_chars=1
+        )
+        artist_label.get_style_context().add_class("dim-label")
+        item.bind_property(
+            "title", title_label, "label", GObject.BindingFlags.SYNC_CREATE
+        )
+        item.bind_property(
+            "artist", artist_label, "label", GObject.BindingFlags.SYNC_CREATE
+        )
+
+        playing_icon = Gtk.Image.new_from_icon_name(
+            "media-playback-start-symbolic", Gtk.IconSize.MENU
+        )
+        playing_icon.set_no_show_all(True)
+        item.bind_property(
+            "playing", playing_icon, "visible", GObject.BindingFlags.SYNC_CREATE
+        )
+
+        labels_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        labels_box.set_valign(Gtk.Align.CENTER)
+        labels_box.pack_start(title_label, False, False, 0)
+        labels_box.pack_start(artist_label, False, False, 0)
+
+        header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        header_box.pack_start(icon, False, False, 0)
+        header_box.pack_start(labels_box, True, True, 0)
+        header_box.pack_start(playing_icon, False, False, 0)
+
+        self.revealer: Gtk.Revealer = Gtk.Revealer()
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4, margin=4)
+        box.pack_start(header_box, False, False, 0)
+        box.pack_start(self.revealer, False, False, 0)
+        self.add(box)
+        self.show_all()
+
+    def expand(self) -> None:
+        self.revealer.add(self.item.player)
+        self.item.player.show()
+        self.revealer.set_reveal_child(True)
+
+    def collapse(self) -> None:
+        self.revealer.set_reveal_child(False)
+        if self.item.player.get_parent() is self.revealer:
+            self.revealer.remove(self.item.player)
+
+
+class PlayerListView(Gtk.ScrolledWindow):
+    """
+    The players as a list of compact rows, the list box is bound to a store
+    of PlayerItems, so adding players creates only their rows and the rows
+    update themselves from the item properties. Only the selected row is
+    expanded into the full controls of its player, which is then its
+    current page (see SingleAppPlayer.set_current_page()).
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        self._store: Gio.ListStore = Gio.ListStore.new(PlayerItem)
+        self._expanded_row: Optional[PlayerRow] = None
+
+        self._list_box: Gtk.ListBox = Gtk.ListBox()
+        self._list_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
+        self._list_box.set_activate_on_single_click(True)
+        self._list_box.set_placeholder(
+            Gtk.Label(
+                label='<span weight="bold">No apps are currently playing audio</span>',
+                use_markup=True,
+                wrap=True,
+                max_width_chars=1,
+                visible=True,
+            )
+        )
+        self._list_box.bind_model(self._store, PlayerRow)
+        self._list_box.connect("row-selected", self._on_row_selected)
+        self.add(self._list_box)
+        self._list_box.show()
+
+    def add_players(self, items: list[PlayerItem]) -> None:
+        """add all the players with a single change of the store"""
+        self._store.splice(self._store.get_n_items(), 0, items)
+        self._select_first_if_none()
+
+    def remove_players(self, items: Iterable[PlayerItem]) -> None:
+        for item in items:
+            if self._expanded_row is not None and self._expanded_row.item is item:
+                self._collapse()
+            found, position = self._store.find(item)
+            if found:
+                self._store.remove(position)
+        self._select_first_if_none()
+
+    def move_player(self, item: PlayerItem, position: int) -> None:
+        """
+        Move the row of the player, only its light row is recreated,
+        the player itself is moved into the new row if it was expanded
+        """
+        found, old_position = self._store.find(item)
+        if not found or old_position == position:
+            return
+        was_expanded = (
+            self._expanded_row is not None and self._expanded_row.item is item
+        )
+        if was_expanded:
+            self._collapse()
+        self._store.remove(old_position)
+        self._store.insert(position, item)
+        if was_expanded:
+            self._list_box.select_row(self._list_box.get_row_at_index(position))
+
+    def detach_players(self) -> None:
+        """give the expanded player back, before the view is destroyed"""
+        self._collapse()
+
+    def _select_first_if_none(self) -> None:
+        if self._list_box.get_selected_row() is None:
+            first_row = self._list_box.get_row_at_index(0)
+            if first_row is not None:
+                self._list_box.select_row(first_row)
+
+    def _collapse(self) -> None:
+        if self._expanded_row is None:
+            return
+        self._expanded_row.collapse()
+        self._expanded_row.item.player.set_current_page(False)
+        self._expanded_row = None
+
+    def _on_row_selected(self, _, row: Optional[PlayerRow]) -> None:
+        if row is self._expanded_row:
+            return
+        self._collapse()
+        if row is None:
+            return
+        self._expanded_row = row
+        row.expand()
+        row.item.player.set_current_page(True)
@@ -0,0 +1,163 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Optional
+from mprisWrapper import MprisWrapper
+from ImagePipeline import ImagePipeline
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+gi.require_version("GdkPixbuf", "2.0")
+gi.require_version("Pango", "1.0")
+from gi.repository import Gtk, Gio, GLib, GdkPixbuf
+from gi.repository.Pango import EllipsizeMode
+
+PLAYLISTS_INTERFACE: str = "org.mpris.MediaPlayer2.Playlists"
+
+
+class PlaylistsView(Gtk.ScrolledWindow):
+    """
+    The playlists of a player that implements org.mpris.MediaPlayer2.Playlists,
+    they are loaded page by page (GetPlaylists) as the view is scrolled down
+    """
+
+    PAGE_SIZE: int = 25
+    ICON_SIZE: int = 32
+
+    def __init__(self, dbus_player: MprisWrapper, **kwargs):
+        super().__init__(**kwargs)
+        self.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        self.dbus_player: MprisWrapper = dbus_player
+
+        self._loaded_count: int = 0
+        self._loading: bool = False
+        self._all_loaded: bool = False
+        self._cancellable: Gio.Cancellable = Gio.Cancellable()
+        self._row_playlist_ids: dict[Gtk.ListBoxRow, str] = {}
+
+        self._order: str = "Alphabetical"
+        orderings = self.dbus_player.get_playlists_property("Orderings")
+        if orderings is not None and orderings.get_strv():
+            if self._order not in orderings.get_strv():
+                self._order = orderings.get_strv()[0]
+
+        self._list_box: Gtk.ListBox = Gtk.ListBox()
+        self._list_box.set_selection_mode(Gtk.SelectionMode.NONE)
+        self._list_box.set_activate_on_single_click(True)
+        self._list_box.set_placeholder(
+            Gtk.Label(label="There are no playlists", visible=True)
+        )
+        self._list_box.connect("row-activated", self._on_row_activated)
+        self.add(self._list_box)
+
+        self.connect("edge-reached", self._on_edge_reached)
+        self.connect("destroy", lambda _: self._cancellable.cancel())
+
+        self._load_next_page()
+
+    def _on_edge_reached(self, _, position: Gtk.PositionType) -> None:
+        if position == Gtk.PositionType.BOTTOM:
+            self._load_next_page()
+
+    def _load_next_page(self) -> None:
+        if self._loading or self._all_loaded:
+            return
+        self._loading = True
+        self.dbus_player.call_player_method(
+            "GetPlaylists",
+            self._on_page_loaded,
+            parameters=GLib.Variant(
+                "(uusb)", (self._loaded_count, self.PAGE_SIZE, self._order, False)
+            ),
+            interface_name=PLAYLISTS_INTERFACE,
+            cancellable=self._cancellable,
+        )
+
+    def _on_page_loaded(self, proxy: Gio.DBusProxy, result: Gio.AsyncResult, *_):
+        try:
+            playlists = proxy.call_finish(result)[0]
+        except GLib.GError as e:
+            if e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                # the view may be already destroyed
+                return
+            # the page is requested again on the next edge-reached
+            self._loading = False
+            print(f"budgie-media-player-applet: loading playlists failed: {e.message}")
+            return
+
+        self._loading = False
+        self._loaded_count += len(playlists)
+        if len(playlists) < self.PAGE_SIZE:
+            self._all_loaded = True
+
+        for playlist_id, name, icon_url in playlists:
+            self._list_box.insert(self._make_row(playlist_id, name, icon_url), -1)
+
+        if not self._all_loaded:
+            # edge-reached is not emitted until the list can be scrolled
+            GLib.idle_add(self._load_more_if_not_scrollable)
+
+    def _load_more_if_not_scrollable(self) -> bool:
+        adjustment = self.get_vadjustment()
+        if adjustment.get_upper() <= adjustment.get_page_size():
+            self._load_next_page()
+        return False
+
+    def _make_row(self, playlist_id: str, name: str, icon_url: str) -> Gtk.ListBoxRow:
+        icon = Gtk.Image.new_from_icon_name(
+            "folder-music-symbolic", Gtk.IconSize.LARGE_TOOLBAR
+        )
+        icon.set_size_request(self.ICON_SIZE, self.ICON_SIZE)
+        if icon_url:
+            ImagePipeline.get_default().load(
+                icon_url,
+                lambda pixbuf: self._on_icon_loaded(pixbuf, icon, icon_url),
+                self._cancellable,
+                ImagePipeline.PRIORITY_LOW,
+            )
+
+        label = Gtk.Label(
+            label=name, xalign=0.0, ellipsize=EllipsizeMode.END, max_width_chars=1
+        )
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8, margin=4)
+        box.pack_start(icon, False, False, 0)
+        box.pack_start(label, True, True, 0)
+
+        row = Gtk.ListBoxRow()
+        row.add(box)
+        row.show_all()
+        self._row_playlist_ids[row] = playlist_id
+        return row
+
+    def _on_icon_loaded(
+        self, pixbuf: Optional[GdkPixbuf.Pixbuf], icon: Gtk.Image, icon_url: str
+    ) -> None:
+        if pixbuf is None:
+            return
+        ImagePipeline.get_default().scale_to_fit(
+            pixbuf,
+            self.ICON_SIZE,
+            self.ICON_SIZE,
+            lambda scaled: self._on_icon_scaled(scaled, icon),
+            self._cancellable,
+            cache_key=ImagePipeline.cache_key(icon_url),
+            priority=ImagePipeline.PRIORITY_LOW,
+            prescale=False,
+        )
+
+    @staticmethod
+    def _on_icon_scaled(pixbuf: Optional[GdkPixbuf.Pixbuf], icon: Gtk.Image) -> None:
+        if pixbuf is not None:
+            icon.set_from_pixbuf(pixbuf)
+
+    def _on_row_activated(self, _, row: Gtk.ListBoxRow) -> None:
+        playlist_id = self._row_playlist_ids.get(row)
+        if playlist_id is None:
+            return
+        self.dbus_player.call_player_method(
+            "ActivatePlaylist",
+            parameters=GLib.Variant("(o)", (playlist_id,)),
+            interface_name=PLAYLISTS_INTERFACE,
+        )
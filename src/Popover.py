@@ -2,8 +2,10 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import gi
-from typing import Optional
+from typing import Iterable, Optional
 from SingleAppPlayer import SingleAppPlayer
+from PlayerList import PlayerListView
+from EnumsStructs import PopoverLayout
 from BudgieApiVersions import BUDGIE_VERSION_X11, BUDGIE_VERSION_WAYLAND
 
 gi.require_version("Gtk", "3.0")
@@ -22,6 +24,15 @@ class Popover(Budgie.Popover):
     def __init__(self, relative_to: Gtk.Widget, settings: Gio.Settings):
         super().__init__(relative_to=relative_to)
         self._nothing_is_playing_label: Optional[Gtk.Widget] = None
+        self._current_player: Optional[SingleAppPlayer] = None
+        self._in_batch: bool = False
+        """the pages are being added or removed in a batch"""
+        self._players: list[SingleAppPlayer] = []
+        self._players_ntb: Optional[Gtk.Notebook] = None
+        self._player_list: Optional[PlayerListView] = None
+        self._open: bool = False
+        self._deferred_moves: list[SingleAppPlayer] = []
+        """expanded players of the list, moved only when the popover is closed"""
 
         self.connect("closed", self._on_closed)
         self.connect("show", self._on_showed)
@@ -31,6 +42,92 @@ class Popover(Budgie.Popover):
         )
         settings.connect("changed", self._settings_changed)
 
+        self._layout: PopoverLayout = PopoverLayout(settings.get_uint("popover-layout"))
+        self._build_layout()
+
+    def add_players(self, players: Iterable[SingleAppPlayer]) -> None:
+        """
+        Add the pages of all the players in one pass, only the new pages are shown
+        and the "nothing is playing" page is updated just once
+        """
+        players = list(players)
+        self._players.extend(players)
+        for player in players:
+            player.show_all()
+
+        if self._player_list is not None:
+            self._player_list.add_players([player.list_item for player in players])
+        else:
+            self._in_batch = True
+            for player in players:
+                self._players_ntb.append_page(child=player, tab_label=player.icon)
+                player.icon.show()
+            self._in_batch = False
+            self._update_nothing_playing_page()
+
+        for player in players:
+            if player.last_active > 0:
+                self.player_activity_changed(player)
+
+    def player_activity_changed(self, player: SingleAppPlayer) -> None:
+        """
+        Move the page of the player to its place in the activity order
+        (the most recently active first), the other pages stay where they are
+        """
+        if player not in self._players:
+            return
+        if self._player_list is not None and player.current_page and self._open:
+            # moving the row would take the controls from under the pointer
+            if player not in self._deferred_moves:
+                self._deferred_moves.append(player)
+            return
+        old_position = self._players.index(player)
+        self._players.pop(old_position)
+        position = 0
+        while (
+            position < len(self._players)
+            and self._players[position].last_active > player.last_active
+        ):
+            position += 1
+        self._players.insert(position, player)
+        if position == old_position:
+            return
+
+        if self._player_list is not None:
+            self._player_list.move_player(player.list_item, position)
+        else:
+            self._players_ntb.reorder_child(player, position)
+
+    def remove_players(self, players: Iterable[SingleAppPlayer]) -> None:
+        """destroy the players, the "nothing is playing" page is updated just once"""
+        players = list(players)
+        for player in players:
+            if player in self._players:
+                self._players.remove(player)
+
+        if self._player_list is not None:
+            self._player_list.remove_players([player.list_item for player in players])
+            for player in players:
+                player.destroy()
+            return
+
+        self._in_batch = True
+        for player in players:
+            player.destroy()
+        self._in_batch = False
+        self._update_nothing_playing_page()
+
+    def _build_layout(self) -> None:
+        if self._layout == PopoverLayout.list:
+            self._player_list = PlayerListView(
+                margin_start=5,
+                margin_end=5,
+                margin_bottom=5,
+            )
+            self.add(self._player_list)
+            self._player_list.show()
+            return
+
         self._players_ntb = Gtk.Notebook(
             margin_start=5,
             margin_end=5,
@@ -40,20 +137,54 @@ class Popover(Budgie.Popover):
         )
         self._players_ntb.connect("page-removed", self._on_page_removed)
         self._players_ntb.connect("page-added", self._on_page_added)
+        self._players_ntb.connect("switch-page", self._on_switch_page)
         self.add(self._players_ntb)
-        self._on_page_removed()
+        self._players_ntb.show()
+        self._show_nothing_playing_if_empty()
 
-    def add_player(self, player: SingleAppPlayer) -> None:
-        self._players_ntb.append_page(child=player, tab_label=player.icon)
-        self._players_ntb.show_all()
+    def _teardown_layout(self) -> None:
+        """take the players out of the current layout and destroy it"""
+        if self._player_list is not None:
+            self._player_list.detach_players()
+            self._player_list.destroy()
+            self._player_list = None
+            return
+
+        # removing the pages would switch to the others, making them current
+        self._players_ntb.disconnect_by_func(self._on_switch_page)
+        if self._current_player is not None:
+            self._current_player.set_current_page(False)
+        self._in_batch = True
+        for player in self._players:
+            self._players_ntb.remove(player)
+        self._in_batch = False
+        self._players_ntb.destroy()
+        self._players_ntb = None
+        self._nothing_is_playing_label = None
+        self._current_player = None
+
+    def _set_layout(self, layout: PopoverLayout) -> None:
+        if layout == self._layout:
+            return
+        players = self._players
+        self._teardown_layout()
+        self._layout = layout
+        self._players = []
+        self._build_layout()
+        self.add_players(players)
 
     def _on_showed(self, _) -> None:
-        if self._nothing_is_playing_label is None:
-            self._players_ntb.foreach(lambda player: player.popover_to_be_open())
+        self._open = True
+        for player in self._players:
+            player.popover_to_be_open()
 
     def _on_closed(self, _) -> None:
-        if self._nothing_is_playing_label is None:
-            self._players_ntb.foreach(lambda player: player.popover_just_closed())
+        self._open = False
+        for player in self._players:
+            player.popover_just_closed()
+        deferred_moves, self._deferred_moves = self._deferred_moves, []
+        for player in deferred_moves:
+            self.player_activity_changed(player)
 
     def _settings_changed(self, settings: Gio.Settings, changed_key: str) -> None:
         if changed_key in {"popover-width", "popover-height"}:
@@ -62,8 +193,29 @@ class Popover(Budgie.Popover):
                 height=settings.get_uint("popover-height"),
             )
             return
+        if changed_key == "popover-layout":
+            self._set_layout(PopoverLayout(settings.get_uint("popover-layout")))
+
+    def _on_switch_page(self, _, page: Gtk.Widget, __) -> None:
+        if page is self._current_player:
+            return
+        if self._current_player is not None:
+            self._current_player.set_current_page(False)
+        self._current_player = page if isinstance(page, SingleAppPlayer) else None
+        if self._current_player is not None:
+            self._current_player.set_current_page(True)
 
-    def _on_page_removed(self, *_) -> None:
+    def _on_page_removed(self, _, page: Gtk.Widget, __) -> None:
+        if page is self._current_player:
+            self._current_player = None
+        if not self._in_batch:
+            self._show_nothing_playing_if_empty()
+
+    def _update_nothing_playing_page(self) -> None:
+        self._hide_nothing_playing_if_not_empty()
+        self._show_nothing_playing_if_empty()
+
+    def _show_nothing_playing_if_empty(self) -> None:
         if self._players_ntb.get_n_pages() < 1:
             self._nothing_is_playing_label = Gtk.Label(
                 label='<span weight="bold">No apps are currently playing audio</span>',
@@ -75,11 +227,15 @@ class Popover(Budgie.Popover):
             )
             self._players_ntb.append_page(
                 self._nothing_is_playing_label,
-                Gtk.Label(label=""),
+                Gtk.Label(label="", visible=True),
             )
-            self._players_ntb.show_all()
+            self._nothing_is_playing_label.show()
 
     def _on_page_added(self, *_) -> None:
+        if not self._in_batch:
+            self._hide_nothing_playing_if_not_empty()
+
+    def _hide_nothing_playing_if_not_empty(self) -> None:
         if (
             self._players_ntb.get_n_pages() > 1
             and self._nothing_is_playing_label is not None
@@ -4,6 +4,9 @@
 from SingleAppPlayer import SingleAppPlayer
 from EnumsStructs import AlbumCoverType
 from Labels import ScrollingLabel, ElliptedLabel
+from IconCache import SymbolicImage, play_pause_icon_name
+from QueueView import QueueView
+from PlaylistsView import PlaylistsView
 from typing import Callable, Optional, Union
 from enum import IntEnum
 import gi
@@ -12,7 +15,8 @@ gi.require_version("Gtk", "3.0")
 gi.require_version("GLib", "2.0")
 gi.require_version("Gio", "2.0")
 gi.require_version("Gdk", "3.0")
-from gi.repository import Gtk, GLib, Gio, Gdk
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import Gtk, GLib, Gio, Gdk, GdkPixbuf
 
 
 class TextStyle(IntEnum):
@@ -32,11 +36,42 @@ class TextStyle(IntEnum):
 
 
 class PopupPlasmaControlView(SingleAppPlayer):
+    """
+    The page of a player in the popover. The player itself is created
+    for every MPRIS name, but its widgets are built only when the page is
+    first shown and destroyed again when it wasn't shown for
+    popover-idle-eviction-minutes.
+    """
+
+    WIDGET_ATTRIBUTES: tuple[str, ...] = (
+        "main_layout_box",
+        "info_layout_hbox",
+        "info_layout_vbox",
+        "controls_layout_box",
+        "album_cover",
+        "song_name_label",
+        "song_author_label",
+        "song_separator",
+        "play_pause_button",
+        "play_pause_image",
+        "go_previous_button",
+        "go_next_button",
+        "pin_button",
+        "pin_image",
+        "queue_button",
+        "playlists_button",
+        "pages_stack",
+        "progress_label",
+        "progress_bar",
+    )
+    """the attributes that hold the widgets, they are None while not built"""
+
     def __init__(
         self,
         service_name: str,
         open_popover_func: Callable[[], None],
         on_pin_clicked: Callable[[str], None],
+        on_activity: Callable[[str], None],
         settings: Gio.Settings,
     ):
         self.album_cover_size: float = settings.get_double(
@@ -46,11 +81,45 @@ class PopupPlasmaControlView(SingleAppPlayer):
             settings.get_uint("plasma-popover-text-style"),
             default=TextStyle.ellipsis,
         )
-        settings.connect("changed", self.settings_changed)
+        self._settings_handler_id: int = settings.connect(
+            "changed", self.settings_changed
+        )
 
         self.timers_running: dict[int, bool] = {}
         self.popover_open: bool = False
+        self._deferred_changes: dict[str, Callable[[], None]] = {}
+        """changes that happened while the view couldn't be seen, by method name"""
         self.scrolling_text_value: float = 0.0
+        self.widgets_built: bool = False
+        """the widgets are built when the page is first shown, see _build_widgets()"""
+        self._eviction_timeout_id: Optional[int] = None
+        self._was_shown: bool = False
+        """the value of shown at the last _shown_changed()"""
+        self.has_playlists: bool = False
+        self.queue_view: Optional[QueueView] = None
+        self.playlists_view: Optional[PlaylistsView] = None
+
+        self.position: int = 0
+        """position of the media's playback in seconds"""
+
+        self._should_set_album_cover: bool = False
+        self._album_cover_scale_request: int = 0
+
+        SingleAppPlayer.__init__(
+            self,
+            service_name=service_name,
+            open_popover_func=open_popover_func,
+            on_pin_clicked=on_pin_clicked,
+            on_activity=on_activity,
+            settings=settings,
+        )
+
+        self.set_hexpand(True)
+        self.dbus_player.enable_playlists(self._playlists_enabled)
+
+    def _build_widgets(self) -> None:
+        """build the widgets of the page, from the current state of the player"""
+        self.widgets_built = True
         self.main_layout_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         self.info_layout_hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
         self.info_layout_hbox.set_homogeneous(True)
@@ -72,33 +141,25 @@ class PopupPlasmaControlView(SingleAppPlayer):
         self.go_previous_button: Gtk.Button = Gtk.Button()
         self.go_next_button: Gtk.Button = Gtk.Button()
         self.pin_button: Gtk.Button = Gtk.Button()
+        self.queue_button: Gtk.ToggleButton = Gtk.ToggleButton()
+        self.playlists_button: Gtk.ToggleButton = Gtk.ToggleButton()
+        self.pages_stack: Gtk.Stack = Gtk.Stack()
         self.progress_label: Gtk.Label = Gtk.Label()
         self.progress_bar: Gtk.ProgressBar = Gtk.ProgressBar()
 
-        self.position: int = 0
-        """position of the media's playback in seconds"""
-
-        SingleAppPlayer.__init__(
-            self,
-            service_name=service_name,
-            open_popover_func=open_popover_func,
-            on_pin_clicked=on_pin_clicked,
-            settings=settings,
-        )
-
         # album cover
-        self._should_set_album_cover = False
         self.album_cover.connect("size-allocate", self._on_album_cover_size_allocate)
         self.info_layout_hbox.pack_start(self.album_cover, True, True, 0)
 
         # song name label
-        song_name_size = settings.get_int("plasma-popover-media-name-size")
+        song_name_size = self.settings.get_int("plasma-popover-media-name-size")
         self.song_name_label.set_text_size(
             None if song_name_size < 0 else song_name_size
         )
         if self.text_style == TextStyle.scroll:
-            speed = settings.get_double("plasma-popover-media-name-scrolling-speed")
+            speed = self.settings.get_double("plasma-popover-media-name-scrolling-speed")
             self.song_name_label.set_speed(speed)
+            self.song_name_label.set_max_fps(self._scrolling_max_fps())
 
         self._set_title(self.title)
         self.info_layout_vbox.pack_start(self.song_name_label, False, False, 0)
@@ -114,22 +175,19 @@ class PopupPlasmaControlView(SingleAppPlayer):
         self._set_progress_label_and_bar()
 
         # song author label
-        author_name_size = settings.get_int("plasma-popover-media-author-size")
+        author_name_size = self.settings.get_int("plasma-popover-media-author-size")
         self.song_author_label.set_text_size(
             None if author_name_size < 0 else author_name_size
         )
         if self.text_style == TextStyle.scroll:
-            speed = settings.get_double("plasma-popover-media-author-scrolling-speed")
+            speed = self.settings.get_double("plasma-popover-media-author-scrolling-speed")
             self.song_author_label.set_speed(speed)
+            self.song_author_label.set_max_fps(self._scrolling_max_fps())
         self.song_author_label.set_label(", ".join(self.artist))
         self.info_layout_vbox.pack_start(self.song_author_label, False, False, 0)
 
         # go previous btn
-        self.go_previous_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                "media-skip-backward-symbolic", Gtk.IconSize.MENU
-            )
-        )
+        self.go_previous_button.set_image(SymbolicImage("media-skip-backward-symbolic"))
         self.go_previous_button.set_relief(Gtk.ReliefStyle.NONE)
         self.go_previous_button.set_sensitive(self.can_go_previous)
         self.go_previous_button.connect("pressed", self.previous_clicked)
@@ -137,16 +195,10 @@ class PopupPlasmaControlView(SingleAppPlayer):
         self.controls_layout_box.pack_start(self.go_previous_button, False, False, 0)
 
         # play pause btn
-        self.play_pause_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                (
-                    "media-playback-pause-symbolic"
-                    if self.playing
-                    else "media-playback-start-symbolic"
-                ),
-                Gtk.IconSize.MENU,
-            )
+        self.play_pause_image: SymbolicImage = SymbolicImage(
+            play_pause_icon_name(self.playing)
         )
+        self.play_pause_button.set_image(self.play_pause_image)
         self.play_pause_button.set_relief(Gtk.ReliefStyle.NONE)
         self.play_pause_button.set_sensitive(self.can_pause or self.can_play)
         self.play_pause_button.connect("pressed", self.on_play_pause_pressed)
@@ -154,11 +206,7 @@ class PopupPlasmaControlView(SingleAppPlayer):
         self.controls_layout_box.pack_start(self.play_pause_button, False, False, 0)
 
         # go next btn
-        self.go_next_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                "media-skip-forward-symbolic", Gtk.IconSize.MENU
-            )
-        )
+        self.go_next_button.set_image(SymbolicImage("media-skip-forward-symbolic"))
         self.go_next_button.set_relief(Gtk.ReliefStyle.NONE)
         self.go_next_button.set_sensitive(self.can_go_next)
         self.go_next_button.connect("pressed", self.next_clicked)
@@ -166,12 +214,8 @@ class PopupPlasmaControlView(SingleAppPlayer):
         self.controls_layout_box.pack_start(self.go_next_button, False, False, 0)
 
         # pin button
-        self.pin_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                "budgie-media-player-applet-unpinned-symbolic",
-                Gtk.IconSize.MENU,
-            )
-        )
+        self.pin_image: SymbolicImage = SymbolicImage(self._pin_icon_name())
+        self.pin_button.set_image(self.pin_image)
         self.pin_button.set_relief(Gtk.ReliefStyle.NONE)
         self.pin_button.connect("pressed", self.pin_clicked)
         self.pin_button.set_tooltip_markup(
@@ -179,7 +223,25 @@ class PopupPlasmaControlView(SingleAppPlayer):
         )
         self.controls_layout_box.pack_start(self.pin_button, False, False, 0)
 
-        self.set_hexpand(True)
+        # queue button
+        self.queue_button.set_image(SymbolicImage("view-list-symbolic"))
+        self.queue_button.set_relief(Gtk.ReliefStyle.NONE)
+        self.queue_button.connect("toggled", self.page_button_toggled, "queue")
+        self.queue_button.set_tooltip_text("Show the upcoming tracks")
+        self.queue_button.set_no_show_all(True)
+        self.queue_button.set_visible(self.has_track_list)
+        self.controls_layout_box.pack_start(self.queue_button, False, False, 0)
+
+        # playlists button
+        self.playlists_button.set_image(SymbolicImage("folder-music-symbolic"))
+        self.playlists_button.set_relief(Gtk.ReliefStyle.NONE)
+        self.playlists_button.connect(
+            "toggled", self.page_button_toggled, "playlists"
+        )
+        self.playlists_button.set_tooltip_text("Show the playlists")
+        self.playlists_button.set_no_show_all(True)
+        self.playlists_button.set_visible(self.has_playlists)
+        self.controls_layout_box.pack_start(self.playlists_button, False, False, 0)
 
         info_layout_event_box = Gtk.EventBox()
         info_layout_event_box.connect("button-press-event", self.song_info_clicked)
@@ -191,11 +253,56 @@ class PopupPlasmaControlView(SingleAppPlayer):
         self.info_layout_vbox.set_valign(Gtk.Align.CENTER)
 
         self.info_layout_hbox.pack_start(self.info_layout_vbox, True, True, 0)
-        self.main_layout_box.pack_start(info_layout_event_box, True, True, 10)
-        self.main_layout_box.pack_start(progress_bar_layout, False, False, 5)
+        player_page_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        player_page_box.pack_start(info_layout_event_box, True, True, 10)
+        player_page_box.pack_start(progress_bar_layout, False, False, 5)
+        self.pages_stack.add_named(player_page_box, "player")
+        self.main_layout_box.pack_start(self.pages_stack, True, True, 0)
         self.main_layout_box.pack_start(self.controls_layout_box, False, False, 0)
 
         self.add(self.main_layout_box)
+        self.main_layout_box.show_all()
+        self.album_cover_changed()
+
+    def _evict_widgets(self) -> bool:
+        """destroy the widgets of the page that wasn't shown for a long time"""
+        self._eviction_timeout_id = None
+        if self.shown or not self.widgets_built:
+            return False
+        self.widgets_built = False
+        self._deferred_changes = {}
+        self._album_cover_scale_request += 1
+        self._should_set_album_cover = False
+        self.main_layout_box.destroy()
+        for name in self.WIDGET_ATTRIBUTES:
+            setattr(self, name, None)
+        self.queue_view = None
+        self.playlists_view = None
+        return False
+
+    def _schedule_eviction(self) -> None:
+        self._cancel_eviction()
+        minutes = self.settings.get_uint("popover-idle-eviction-minutes")
+        if minutes == 0 or not self.widgets_built:
+            return
+        self._eviction_timeout_id = GLib.timeout_add_seconds(
+            minutes * 60, self._evict_widgets
+        )
+
+    def _cancel_eviction(self) -> None:
+        if self._eviction_timeout_id is not None:
+            GLib.source_remove(self._eviction_timeout_id)
+            self._eviction_timeout_id = None
+
+    def _playlists_enabled(self, has_playlists: bool) -> None:
+        self.has_playlists = has_playlists
+        if self.widgets_built:
+            self.playlists_button.set_visible(has_playlists)
+
+    def _pin_icon_name(self) -> str:
+        if self.panel_view is None:
+            return "budgie-media-player-applet-unpinned-symbolic"
+        return "budgie-media-player-applet-pinned-symbolic"
 
     def on_play_pause_pressed(self, *_) -> None:
         self.dbus_player.call_player_method("PlayPause")
@@ -212,42 +319,147 @@ class PopupPlasmaControlView(SingleAppPlayer):
     def pin_clicked(self, *_) -> None:
         self.on_pin_clicked(self.service_name)
 
+    def page_button_toggled(self, button: Gtk.ToggleButton, page_name: str) -> None:
+        if not button.get_active():
+            if self.pages_stack.get_visible_child_name() == page_name:
+                self.pages_stack.set_visible_child_name("player")
+            return
+
+        for other_button in (self.queue_button, self.playlists_button):
+            if other_button is not button:
+                other_button.set_active(False)
+
+        if page_name == "queue" and self.queue_view is None:
+            # built only when it's first needed, it may hold thousands of tracks
+            self.queue_view = QueueView(
+                self.dbus_player, self._track_ids, self.track_id, vexpand=True
+            )
+            self.queue_view.show_all()
+            self.pages_stack.add_named(self.queue_view, "queue")
+
+        elif page_name == "playlists" and self.playlists_view is None:
+            self.playlists_view = PlaylistsView(self.dbus_player, vexpand=True)
+            self.playlists_view.show_all()
+            self.pages_stack.add_named(self.playlists_view, "playlists")
+
+        self.pages_stack.set_visible_child_name(page_name)
+
+    # overridden parent method
+    def current_track_changed(self) -> None:
+        if self.queue_view is not None:
+            self.queue_view.set_current_track(self.track_id)
+
+    # overridden parent method
+    def track_list_replaced(self, track_ids: list[str]) -> None:
+        if self.queue_view is not None:
+            self.queue_view.replace_tracks(track_ids)
+
+    # overridden parent method
+    def track_added(self, metadata: GLib.Variant, after_track: str) -> None:
+        if self.queue_view is not None:
+            self.queue_view.track_added(metadata, after_track)
+
+    # overridden parent method
+    def track_removed(self, track_id: str) -> None:
+        if self.queue_view is not None:
+            self.queue_view.track_removed(track_id)
+
+    # overridden parent method
+    def track_metadata_changed(self, track_id: str, metadata: GLib.Variant) -> None:
+        if self.queue_view is not None:
+            self.queue_view.track_metadata_changed(track_id, metadata)
+
+    @property
+    def shown(self) -> bool:
+        """the popover is open and the page of this player is the current one"""
+        return self.popover_open and self.current_page
+
     # overridden parent method
     def popover_to_be_open(self) -> None:
         self.popover_open = True
-        if self.text_style == TextStyle.scroll:
-            self.song_name_label.to_get_visible()
-            self.song_author_label.to_get_visible()
-        self._create_timer()
+        self._shown_changed()
 
+    # overridden parent method
     def popover_just_closed(self) -> None:
         self.popover_open = False
-        if self.text_style == TextStyle.scroll:
-            self.song_name_label.to_get_invisible()
-            self.song_author_label.to_get_invisible()
-        for key in self.timers_running:
-            self.timers_running[key] = False
+        self._shown_changed()
+
+    # overridden parent method
+    def current_page_changed(self) -> None:
+        self._shown_changed()
+
+    def _shown_changed(self) -> None:
+        if self.shown == self._was_shown:
+            # e.g. the popover opened while another page is the current one,
+            # the eviction timer of a hidden page keeps running
+            return
+        self._was_shown = self.shown
+        if not self.shown:
+            for key in self.timers_running:
+                self.timers_running[key] = False
+            self._schedule_eviction()
+            return
+
+        self._cancel_eviction()
+        changes, self._deferred_changes = self._deferred_changes, {}
+        if not self.widgets_built:
+            # built from the current state, the changes are already in it
+            self._build_widgets()
+            self._create_timer()
+            return
+        for apply_change in changes.values():
+            apply_change()
+        if "metadata_changed" in changes or (
+            "playing_changed" in changes and self.playing
+        ):
+            # the progress timer was already restarted by the change
+            return
+        self._create_timer()
+
+    def _defer_while_hidden(self, change: Callable[[], None]) -> bool:
+        """
+        Returns True if the view can't be seen, then the change is applied
+        only once, when the view is shown
+        """
+        if self.shown:
+            return False
+        self._deferred_changes[change.__name__] = change
+        return True
+
+    # overridden parent method
+    def suspended_changed(self) -> None:
+        if self.suspended:
+            for key in self.timers_running:
+                self.timers_running[key] = False
+        elif self.shown and self.playing:
+            # the position is fetched again, the progress catches up
+            self._create_timer()
+
+    # overridden parent method
+    def power_policy_changed(self) -> None:
+        if self.widgets_built and self.text_style == TextStyle.scroll:
+            self.song_name_label.set_max_fps(self._scrolling_max_fps())
+            self.song_author_label.set_max_fps(self._scrolling_max_fps())
+        if self.shown and self.playing:
+            # restart the progress timer with the new interval
+            self._create_timer()
 
     def pinned_changed(self) -> None:
-        self.pin_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                (
-                    "budgie-media-player-applet-unpinned-symbolic"
-                    if self.panel_view is None
-                    else "budgie-media-player-applet-pinned-symbolic"
-                ),
-                Gtk.IconSize.MENU,
-            )
-        )
+        if self.widgets_built:
+            self.pin_image.set_icon_name(self._pin_icon_name())
 
     # overridden parent method
     def metadata_changed(self) -> None:
+        if self._defer_while_hidden(self.metadata_changed):
+            return
         self._set_title(self.title)
         self.song_author_label.set_label(", ".join(self.artist))
         self._create_timer()
 
     # overridden parent method
     def can_play_changed(self) -> None:
+        if self._defer_while_hidden(self.can_play_changed):
+            return
         if self.can_play or self.can_pause:
             self.play_pause_button.set_sensitive(True)
         else:
@@ -255,6 +467,8 @@ class PopupPlasmaControlView(SingleAppPlayer):
 
     # overridden parent method
     def can_pause_changed(self) -> None:
+        if self._defer_while_hidden(self.can_pause_changed):
+            return
         if self.can_play or self.can_pause:
             self.play_pause_button.set_sensitive(True)
         else:
@@ -262,24 +476,21 @@ class PopupPlasmaControlView(SingleAppPlayer):
 
     # overridden parent method
     def can_go_previous_changed(self) -> None:
+        if self._defer_while_hidden(self.can_go_previous_changed):
+            return
         self.go_previous_button.set_sensitive(self.can_go_previous)
 
     # overridden parent method
     def can_go_next_changed(self) -> None:
+        if self._defer_while_hidden(self.can_go_next_changed):
+            return
         self.go_next_button.set_sensitive(self.can_go_next)
 
     # overridden parent method
     def playing_changed(self) -> None:
-        self.play_pause_button.set_image(
-            Gtk.Image.new_from_icon_name(
-                (
-                    "media-playback-pause-symbolic"
-                    if self.playing
-                    else "media-playback-start-symbolic"
-                ),
-                Gtk.IconSize.MENU,
-            )
-        )
+        if self._defer_while_hidden(self.playing_changed):
+            return
+        self.play_pause_image.set_icon_name(play_pause_icon_name(self.playing))
         if self.playing:
             self._create_timer()
         else:
@@ -295,6 +506,12 @@ class PopupPlasmaControlView(SingleAppPlayer):
         expanding the popover, leading to larger get_allocated_width() and height
         values thus setting the album cover size larger, again expanding the popover.
         """
+        if not wait_for_allocation and self._defer_while_hidden(
+            self.album_cover_changed
+        ):
+            return
+        if not self.widgets_built:
+            return
         if self.album_cover_data.cover_type == AlbumCoverType.Pixbuf:
             allocated_width = self.album_cover.get_allocated_width()
             allocated_height = self.album_cover.get_allocated_height()
@@ -305,13 +522,7 @@ class PopupPlasmaControlView(SingleAppPlayer):
                 if wait_for_allocation:
                     self.album_cover.clear()
             else:
-                self.album_cover.set_from_pixbuf(
-                    self._get_resized_pixbuf(
-                        allocated_height,
-                        allocated_width,
-                        self.album_cover_size,
-                    )
-                )
+                self._set_resized_album_cover(allocated_height, allocated_width)
 
         elif self.album_cover_data.cover_type == AlbumCoverType.Gicon:
             self.album_cover.set_from_gicon(
@@ -340,11 +551,24 @@ class PopupPlasmaControlView(SingleAppPlayer):
             if style == self.text_style:
                 return
             self.text_style = style
+            if not self.widgets_built:
+                return
             self.song_name_label.destroy()
             self.song_author_label.destroy()
             if self.text_style == TextStyle.scroll:
-                self.song_name_label = ScrollingLabel()
-                self.song_author_label = ScrollingLabel()
+                max_fps = self._scrolling_max_fps()
+                self.song_name_label = ScrollingLabel(
+                    speed=settings.get_double(
+                        "plasma-popover-media-name-scrolling-speed"
+                    ),
+                    max_fps=max_fps,
+                )
+                self.song_author_label = ScrollingLabel(
+                    speed=settings.get_double(
+                        "plasma-popover-media-author-scrolling-speed"
+                    ),
+                    max_fps=max_fps,
+                )
             else:
                 self.song_name_label = ElliptedLabel()
                 self.song_author_label = ElliptedLabel()
@@ -364,6 +588,15 @@ class PopupPlasmaControlView(SingleAppPlayer):
             self.song_author_label.set_label(", ".join(self.artist))
             return
 
+        if changed_key == "popover-idle-eviction-minutes":
+            if self._eviction_timeout_id is not None:
+                self._schedule_eviction()
+            return
+
+        if not self.widgets_built:
+            # the other settings are read when the widgets are built
+            return
+
         if changed_key == "plasma-popover-media-name-size":
             size = settings.get_int("plasma-popover-media-name-size")
             self.song_name_label.set_text_size(None if size < 0 else size)
@@ -388,18 +621,60 @@ class PopupPlasmaControlView(SingleAppPlayer):
             self.song_author_label.set_speed(speed)
             return
 
+        if changed_key == "plasma-popover-scrolling-max-fps":
+            if self.text_style != TextStyle.scroll:
+                return
+            self.song_name_label.set_max_fps(self._scrolling_max_fps())
+            self.song_author_label.set_max_fps(self._scrolling_max_fps())
+            return
+
+    def _scrolling_max_fps(self) -> int:
+        return self.power_policy.scrolling_max_fps(
+            self.settings.get_uint("plasma-popover-scrolling-max-fps")
+        )
+
     def _on_album_cover_size_allocate(self, _, rect: Gdk.Rectangle) -> None:
         if not self._should_set_album_cover:
             return
         self._should_set_album_cover = False
 
-        self.album_cover.set_from_pixbuf(
-            self._get_resized_pixbuf(rect.height, rect.width, self.album_cover_size)
+        self._set_resized_album_cover(rect.height, rect.width)
+
+    def _set_resized_album_cover(self, height: int, width: int) -> None:
+        self._album_cover_scale_request += 1
+        request = self._album_cover_scale_request
+        self._get_resized_pixbuf(
+            height,
+            width,
+            self.album_cover_size,
+            lambda pixbuf: self._on_album_cover_resized(pixbuf, request),
         )
 
+    def _on_album_cover_resized(
+        self, pixbuf: Optional[GdkPixbuf.Pixbuf], request: int
+    ) -> None:
+        if pixbuf is None or request != self._album_cover_scale_request:
+            # a newer cover or size was requested in the meantime
+            return
+        if self.album_cover_data.cover_type != AlbumCoverType.Pixbuf:
+            return
+        if not self.widgets_built:
+            return
+        self.album_cover.set_from_pixbuf(pixbuf)
+
+    # overridden parent method
+    def _on_destroy(self, widget: Gtk.Widget) -> None:
+        super()._on_destroy(widget)
+        self.settings.disconnect(self._settings_handler_id)
+        self._cancel_eviction()
+        for key in self.timers_running:
+            self.timers_running[key] = False
+
     def _create_timer(self) -> None:
         for key in self.timers_running:
             self.timers_running[key] = False
+        if self.suspended:
+            return
 
         self.dbus_player.get_player_property_non_cached(
             "Position", self._on_ready_callback
@@ -426,15 +701,19 @@ class PopupPlasmaControlView(SingleAppPlayer):
             timer_id += 1
 
         self.timers_running.update({timer_id: True})
+        interval = self.power_policy.progress_interval
         if self.rate > 0:
             GLib.timeout_add(
-                round(1000 / self.rate), self._timer_updating_progress, timer_id
+                round(interval * 1000 / self.rate),
+                self._timer_updating_progress,
+                timer_id,
+                interval,
             )
         self._set_progress_label_and_bar()
 
-    def _timer_updating_progress(self, identifier: int) -> bool:
+    def _timer_updating_progress(self, identifier: int, interval: int) -> bool:
         if self.playing:
-            self.position += 1
+            self.position += interval
             self._set_progress_label_and_bar()
 
         status = self.timers_running[identifier]
@@ -450,6 +729,8 @@ class PopupPlasmaControlView(SingleAppPlayer):
         self.song_name_label.set_markup(f"<b>{esc_text}</b>")
 
     def _set_progress_label_and_bar(self) -> None:
+        if not self.widgets_built:
+            return
         len_mins, len_secs = divmod(self.song_length, 60)
         pos_mins, pos_secs = divmod(self.position, 60)
         self.progress_label.set_label(
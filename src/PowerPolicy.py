@@ -0,0 +1,178 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Callable, Optional
+from EnumsStructs import PowerSavingMode
+import gi
+
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import Gio, GLib, GdkPixbuf
+
+
+class PowerPolicy:
+    """
+    Scales down the background work of the applet while saving power.
+
+    Power saving is on depending on the power-saving-mode setting,
+    by default when the power-saver profile is enabled (Gio.PowerProfileMonitor)
+    or when the computer runs on battery (UPower). The values used while
+    saving power are set by the power-saving-* keys.
+
+    The callbacks are called when the values change, either because of
+    the power state or the settings, so that they can be applied at runtime.
+
+    There is one instance for each Gio.Settings, use PowerPolicy.for_settings(),
+    it is dropped when its last callback is removed (e.g. the applet was removed
+    from the panel), so users of the instance should keep a callback registered
+    """
+
+    _instances: dict[Gio.Settings, "PowerPolicy"] = {}
+
+    def __init__(self, settings: Gio.Settings):
+        self.settings: Gio.Settings = settings
+        self.power_saving: bool = False
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._next_callback_id: int = 0
+
+        self._power_saver_enabled: bool = False
+        self._profile_monitor: Optional[Gio.PowerProfileMonitor] = None
+        self._profile_handler_id: Optional[int] = None
+        if hasattr(Gio, "PowerProfileMonitor"):  # since GLib 2.70
+            self._profile_monitor = Gio.PowerProfileMonitor.dup_default()
+            self._profile_handler_id = self._profile_monitor.connect(
+                "notify::power-saver-enabled", lambda *_: self._update()
+            )
+
+        self._on_battery: bool = False
+        self._upower_proxy: Optional[Gio.DBusProxy] = None
+        self._upower_handler_id: Optional[int] = None
+        self._upower_cancellable: Gio.Cancellable = Gio.Cancellable()
+        Gio.DBusProxy.new_for_bus(
+            Gio.BusType.SYSTEM,
+            Gio.DBusProxyFlags.NONE,
+            None,
+            "org.freedesktop.UPower",
+            "/org/freedesktop/UPower",
+            "org.freedesktop.UPower",
+            self._upower_cancellable,
+            self._on_upower_proxy_ready,
+        )
+
+        self._settings_handler_id: int = settings.connect(
+            "changed", self._settings_changed
+        )
+        self._update()
+
+    @classmethod
+    def for_settings(cls, settings: Gio.Settings) -> "PowerPolicy":
+        if settings not in cls._instances:
+            cls._instances[settings] = cls(settings)
+        return cls._instances[settings]
+
+    def add_callback(self, callback: Callable[[], None]) -> int:
+        """callback() is called when the values change, returns its id"""
+        self._next_callback_id += 1
+        self._callbacks[self._next_callback_id] = callback
+        return self._next_callback_id
+
+    def remove_callback(self, callback_id: int) -> None:
+        self._callbacks.pop(callback_id, None)
+        if not self._callbacks:
+            self._release()
+
+    def _release(self) -> None:
+        """disconnect from everything, for_settings() then creates a new instance"""
+        if self._instances.get(self.settings) is self:
+            del self._instances[self.settings]
+        self.settings.disconnect(self._settings_handler_id)
+        if self._profile_handler_id is not None:
+            self._profile_monitor.disconnect(self._profile_handler_id)
+            self._profile_handler_id = None
+        self._upower_cancellable.cancel()
+        if self._upower_handler_id is not None:
+            self._upower_proxy.disconnect(self._upower_handler_id)
+            self._upower_handler_id = None
+
+    def scrolling_max_fps(self, max_fps: int) -> int:
+        """the frame rate to use instead of max_fps (0 is unlimited)"""
+        if not self.power_saving:
+            return max_fps
+        saving_max_fps = self.settings.get_uint("power-saving-scrolling-max-fps")
+        if saving_max_fps == 0:
+            return max_fps
+        if max_fps == 0:
+            return saving_max_fps
+        return min(max_fps, saving_max_fps)
+
+    @property
+    def progress_interval(self) -> int:
+        """in seconds, how often the progress of the playing media is updated"""
+        if not self.power_saving:
+            return 1
+        return max(1, self.settings.get_uint("power-saving-progress-interval"))
+
+    @property
+    def interp_type(self) -> GdkPixbuf.InterpType:
+        """the quality of the album cover scaling"""
+        if self.power_saving and self.settings.get_boolean(
+            "power-saving-fast-art-scaling"
+        ):
+            return GdkPixbuf.InterpType.NEAREST
+        return GdkPixbuf.InterpType.BILINEAR
+
+    @property
+    def prefetch_depth(self) -> int:
+        depth = self.settings.get_uint("art-prefetch-depth")
+        if not self.power_saving:
+            return depth
+        return min(depth, self.settings.get_uint("power-saving-prefetch-depth"))
+
+    def _on_upower_proxy_ready(self, _, result: Gio.AsyncResult) -> None:
+        try:
+            self._upower_proxy = Gio.DBusProxy.new_for_bus_finish(result)
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                print(
+                    f"budgie-media-player-applet: UPower is not available: {e.message}"
+                )
+            return
+        self._upower_handler_id = self._upower_proxy.connect(
+            "g-properties-changed", self._upower_changed
+        )
+        self._upower_changed()
+
+    def _upower_changed(self, *_) -> None:
+        on_battery = self._upower_proxy.get_cached_property("OnBattery")
+        self._on_battery = on_battery is not None and on_battery.get_boolean()
+        self._update()
+
+    def _settings_changed(self, _, key: str) -> None:
+        if key == "power-saving-mode":
+            self._update()
+        elif key.startswith("power-saving-") or key == "art-prefetch-depth":
+            self._notify()
+
+    def _update(self) -> None:
+        if self._profile_monitor is not None:
+            self._power_saver_enabled = self._profile_monitor.get_power_saver_enabled()
+
+        mode = self.settings.get_uint("power-saving-mode")
+        if mode == PowerSavingMode.always:
+            power_saving = True
+        elif mode == PowerSavingMode.never:
+            power_saving = False
+        elif mode == PowerSavingMode.power_saver_only:
+            power_saving = self._power_saver_enabled
+        else:
+            power_saving = self._power_saver_enabled or self._on_battery
+
+        if power_saving == self.power_saving:
+            return
+        self.power_saving = power_saving
+        self._notify()
+
+    def _notify(self) -> None:
+        for callback in list(self._callbacks.values()):
+            callback()
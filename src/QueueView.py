@@ -0,0 +1,315 @@
+# Copyright 2025, zalesyc and the budgie-media-player-applet contributors
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Optional
+from mprisWrapper import MprisWrapper
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+gi.require_version("GObject", "2.0")
+gi.require_version("Pango", "1.0")
+from gi.repository import Gtk, Gio, GLib, GObject
+from gi.repository.Pango import EllipsizeMode
+
+NO_TRACK: str = "/org/mpris/MediaPlayer2/TrackList/NoTrack"
+
+
+class TrackItem(GObject.Object):
+    """A single track of the org.mpris.MediaPlayer2.TrackList interface"""
+
+    track_id = GObject.Property(type=str, default="")
+    title = GObject.Property(type=str, default="")
+    artist = GObject.Property(type=str, default="")
+
+    def __init__(self, track_id: str, metadata: Optional[GLib.Variant] = None):
+        super().__init__(track_id=track_id)
+        self.has_metadata: bool = False
+        self.metadata_requested: bool = False
+        if metadata is not None:
+            self.set_metadata(metadata)
+
+    def set_metadata(self, metadata: GLib.Variant) -> None:
+        self.has_metadata = True
+        title = metadata.lookup_value("xesam:title", GLib.VariantType.new("s"))
+        artist = metadata.lookup_value("xesam:artist", GLib.VariantType.new("as"))
+        self.title = "Unknown" if title is None else title.get_string()
+        self.artist = "" if artist is None else ", ".join(artist.get_strv())
+
+
+class _TrackWindowModel(GObject.Object, Gio.ListModel):
+    """
+    Exposes only a window of the full track store: at most limit tracks
+    that follow the anchor (the current track). Gtk.ListBox (in gtk3) creates
+    a row for every item of its model, so this keeps the number of rows
+    at the size of what was scrolled into view.
+
+    The window is updated incrementally, when the anchor moves by a few tracks
+    only the rows that leave or enter the window are removed or created.
+    """
+
+    def __init__(self, store: Gio.ListStore, limit: int):
+        super().__init__()
+        self._store: Gio.ListStore = store
+        self._anchor: Optional[TrackItem] = None
+        self._offset: int = 0
+        self._limit: int = limit
+        self._n_items: int = 0
+        self._frozen: bool = False
+        self._store.connect("items-changed", self._on_store_items_changed)
+
+    def do_get_item_type(self) -> GObject.GType:
+        return TrackItem.__gtype__
+
+    def do_get_n_items(self) -> int:
+        return self._n_items
+
+    def do_get_item(self, position: int) -> Optional[TrackItem]:
+        if position >= self._n_items:
+            return None
+        return self._store.get_item(self._offset + position)
+
+    def set_anchor(self, anchor: Optional[TrackItem]) -> None:
+        """the window starts right after the anchor, or at the start if None"""
+        self._anchor = anchor
+        self._move_window(self._anchor_offset())
+
+    def replace(self, items: list[TrackItem], anchor: Optional[TrackItem]) -> None:
+        """replace the content of the store, while the window is changed just once"""
+        self._frozen = True
+        self._store.splice(0, self._store.get_n_items(), items)
+        self._frozen = False
+        self._anchor = anchor
+        self._reset()
+
+    def grow(self, by: int) -> None:
+        self._limit += by
+        old_n_items = self._n_items
+        self._n_items = self._visible_count()
+        if self._n_items != old_n_items:
+            self.items_changed(old_n_items, 0, self._n_items - old_n_items)
+
+    def _visible_count(self) -> int:
+        return max(0, min(self._store.get_n_items() - self._offset, self._limit))
+
+    def _anchor_offset(self) -> int:
+        if self._anchor is not None:
+            found, position = self._store.find(self._anchor)
+            if found:
+                return position + 1
+        return 0
+
+    def _reset(self) -> None:
+        """recreate the whole window, when its content is unknown"""
+        self._offset = self._anchor_offset()
+        old_n_items = self._n_items
+        self._n_items = self._visible_count()
+        if old_n_items or self._n_items:
+            self.items_changed(0, old_n_items, self._n_items)
+
+    def _move_window(self, offset: int) -> None:
+        """
+        Move the start of the window to offset, the items of the window
+        that stay in it keep their rows
+        """
+        delta = offset - self._offset
+        if delta == 0:
+            self._fit_to_limit()
+        elif 0 < delta < self._n_items:
+            # moved forward, e.g. to the next track
+            self._offset = offset
+            self._n_items -= delta
+            self.items_changed(0, delta, 0)
+            self._fit_to_limit()
+        elif 0 < -delta < self._limit and self._n_items:
+            # moved back, e.g. to the previous track
+            self._offset = offset
+            self._n_items -= delta
+            self.items_changed(0, 0, -delta)
+            self._fit_to_limit()
+        else:
+            self._reset()
+
+    def _fit_to_limit(self) -> None:
+        """items are shifted in or out at the end of the window"""
+        target = self._visible_count()
+        if self._n_items > target:
+            trimmed = self._n_items - target
+            self._n_items = target
+            self.items_changed(target, trimmed, 0)
+        elif self._n_items < target:
+            filled_from = self._n_items
+            self._n_items = target
+            self.items_changed(filled_from, 0, target - filled_from)
+
+    def _on_store_items_changed(
+        self, _, position: int, removed: int, added: int
+    ) -> None:
+        if self._frozen:
+            return
+
+        if position < self._offset:
+            if position + removed > self._offset:
+                # the start of the window was removed
+                self._reset()
+                return
+            # the items of the window only shifted, e.g. a played track
+            # was dropped, then the window follows the anchor
+            self._offset += added - removed
+            self._move_window(self._anchor_offset())
+            return
+
+        position -= self._offset
+        if position >= self._limit:
+            return
+
+        old_n_items = self._n_items
+        removed = min(removed, old_n_items - position)
+        added = min(added, self._limit - position)
+        self._n_items = old_n_items - removed + added
+        self.items_changed(position, removed, added)
+        self._fit_to_limit()
+
+
+class QueueView(Gtk.ScrolledWindow):
+    """
+    The upcoming tracks of a player that implements org.mpris.MediaPlayer2.TrackList.
+    The view is updated incrementally from the TrackList signals,
+    rows are created only for the part that was scrolled into view and
+    the metadata is fetched only for those rows.
+    """
+
+    PAGE_SIZE: int = 50
+
+    def __init__(
+        self,
+        dbus_player: MprisWrapper,
+        track_ids: list[str],
+        current_track_id: Optional[str],
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        self.dbus_player: MprisWrapper = dbus_player
+        self.current_track_id: Optional[str] = current_track_id
+
+        self._items: dict[str, TrackItem] = {}
+        self._store: Gio.ListStore = Gio.ListStore.new(TrackItem)
+        self._window: _TrackWindowModel = _TrackWindowModel(
+            self._store, self.PAGE_SIZE
+        )
+        self._metadata_cancellable: Gio.Cancellable = Gio.Cancellable()
+
+        self._list_box: Gtk.ListBox = Gtk.ListBox()
+        self._list_box.set_selection_mode(Gtk.SelectionMode.NONE)
+        self._list_box.set_placeholder(
+            Gtk.Label(label="The queue is empty", visible=True)
+        )
+        self._list_box.bind_model(self._window, self._create_row)
+        self.add(self._list_box)
+
+        self._window.connect(
+            "items-changed",
+            lambda _, position, __, added: self._fetch_missing(position, added),
+        )
+        self.connect("edge-reached", self._on_edge_reached)
+        self.connect("destroy", lambda _: self._metadata_cancellable.cancel())
+
+        self.replace_tracks(track_ids)
+
+    def set_current_track(self, track_id: Optional[str]) -> None:
+        if track_id == self.current_track_id:
+            return
+        self.current_track_id = track_id
+        self._window.set_anchor(self._items.get(track_id))
+
+    def replace_tracks(self, track_ids: list[str]) -> None:
+        self._metadata_cancellable.cancel()
+        self._metadata_cancellable = Gio.Cancellable()
+        items = [
+            self._items.get(track_id) or TrackItem(track_id) for track_id in track_ids
+        ]
+        for item in items:
+            # the requests were cancelled above
+            item.metadata_requested = False
+        self._items = {item.track_id: item for item in items}
+        self._window.replace(items, self._items.get(self.current_track_id))
+
+    def track_added(self, metadata: GLib.Variant, after_track: str) -> None:
+        track_id = metadata.lookup_value("mpris:trackid", None)
+        if track_id is None:
+            return
+        item = TrackItem(track_id.get_string(), metadata)
+        position = 0
+        if after_track != NO_TRACK and after_track in self._items:
+            found, index = self._store.find(self._items[after_track])
+            if found:
+                position = index + 1
+        self._items[item.track_id] = item
+        self._store.insert(position, item)
+
+    def track_removed(self, track_id: str) -> None:
+        item = self._items.pop(track_id, None)
+        if item is None:
+            return
+        found, position = self._store.find(item)
+        if found:
+            self._store.remove(position)
+
+    def track_metadata_changed(self, track_id: str, metadata: GLib.Variant) -> None:
+        item = self._items.get(track_id)
+        if item is not None:
+            # the row is bound to the item's properties, it updates itself
+            item.set_metadata(metadata)
+
+    def _on_edge_reached(self, _, position: Gtk.PositionType) -> None:
+        if position == Gtk.PositionType.BOTTOM:
+            self._window.grow(self.PAGE_SIZE)
+
+    def _fetch_missing(self, position: int, count: int) -> None:
+        """fetch the metadata of the count items of the window from position"""
+        missing = []
+        for i in range(position, position + count):
+            item = self._window.get_item(i)
+            if not item.has_metadata and not item.metadata_requested:
+                item.metadata_requested = True
+                missing.append(item.track_id)
+        if missing:
+            self.dbus_player.get_tracks_metadata(
+                missing, self._on_metadata_fetched, self._metadata_cancellable
+            )
+
+    def _on_metadata_fetched(self, metadata: Optional[list[GLib.Variant]]) -> None:
+        if metadata is None:
+            return
+        for track_metadata in metadata:
+            track_id = track_metadata.lookup_value("mpris:trackid", None)
+            if track_id is None:
+                continue
+            item = self._items.get(track_id.get_string())
+            if item is not None:
+                item.set_metadata(track_metadata)
+
+    @staticmethod
+    def _create_row(item: TrackItem) -> Gtk.Widget:
+        title_label = Gtk.Label(
+            xalign=0.0, ellipsize=EllipsizeMode.END, max_width_chars=1
+        )
+        artist_label = Gtk.Label(
+            xalign=0.0, ellipsize=EllipsizeMode.END, max_width_chars=1
+        )
+        artist_label.get_style_context().add_class("dim-label")
+        item.bind_property(
+            "title", title_label, "label", GObject.BindingFlags.SYNC_CREATE
+        )
+        item.bind_property(
+            "artist", artist_label, "label", GObject.BindingFlags.SYNC_CREATE
+        )
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, margin=4)
+        box.pack_start(title_label, False, False, 0)
+        box.pack_start(artist_label, False, False, 0)
+        row = Gtk.ListBoxRow()
+        row.add(box)
+        row.show_all()
+        return row
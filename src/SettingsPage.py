@@ -9,7 +9,13 @@ gi.require_version("GLib", "2.0")
 from gi.repository import Gtk, Gio, GLib
 
 from Labels import LabelWSubtitle
-from EnumsStructs import PanelLengthMode, PanelClickAction
+from EnumsStructs import (
+    PanelLengthMode,
+    PanelClickAction,
+    PanelRenderer,
+    PopoverLayout,
+    PowerSavingMode,
+)
 from math import ceil
 from typing import Union
 
@@ -25,6 +31,7 @@ class SettingsPage(Gtk.Box):
 
         self.stack.add_titled(PanelSettingsPage(settings), "panel", "Panel")
         self.stack.add_titled(PopoverSettingsPage(settings), "popover", "Popup")
+        self.stack.add_titled(PowerSettingsPage(settings), "power", "Power saving")
 
         stack_switcher = Gtk.StackSwitcher()
         stack_switcher.set_halign(Gtk.Align.CENTER)
@@ -267,6 +274,77 @@ class PanelSettingsPage(_SettingsPageBase):
             self._variable_len_radio_toggled,
         )
 
+        scrolling_label = LabelWSubtitle(
+            title="Scroll long text:",
+            subtitle="Instead of cutting the title and author off, scroll them, "
+            "only with the Fixed and Maximal length, when drawn with widgets",
+            wrap_subtitle=True,
+        )
+        self.scrolling_switch: Gtk.Switch = Gtk.Switch(
+            halign=Gtk.Align.START,
+            valign=Gtk.Align.CENTER,
+            active=self.settings.get_boolean("panel-text-scrolling"),
+        )
+        scrolling_speed_label = Gtk.Label(
+            label="Speed:",
+            halign=Gtk.Align.START,
+            margin_left=30,
+        )
+        scrolling_speed_scale = Gtk.Scale.new_with_range(
+            Gtk.Orientation.HORIZONTAL, 0.1, 5, 0.1
+        )
+        scrolling_speed_scale.set_value_pos(Gtk.PositionType.LEFT)
+        scrolling_speed_scale.set_value(
+            self.settings.get_double("panel-scrolling-speed")
+        )
+        scrolling_speed_scale.connect(
+            "value-changed",
+            lambda scale: self.settings.set_double(
+                "panel-scrolling-speed", scale.get_value()
+            ),
+        )
+        scrolling_max_fps_label = Gtk.Label(
+            label="Max frame rate:",
+            halign=Gtk.Align.START,
+            margin_left=30,
+        )
+        scrolling_max_fps_spin = Gtk.SpinButton.new_with_range(
+            min=0,
+            max=240,
+            step=1,
+        )
+        scrolling_max_fps_spin.set_tooltip_text(
+            "How many times per second at most the text is moved, 0 is unlimited"
+        )
+        scrolling_max_fps_spin.set_value(
+            self.settings.get_uint("panel-scrolling-max-fps")
+        )
+        scrolling_max_fps_spin.connect(
+            "value-changed",
+            lambda spin: self.settings.set_uint(
+                "panel-scrolling-max-fps", spin.get_value_as_int()
+            ),
+        )
+        scrolling_pause_label = Gtk.Label(
+            label="Only on hover:",
+            halign=Gtk.Align.START,
+            margin_left=30,
+        )
+        scrolling_pause_switch = Gtk.Switch(
+            halign=Gtk.Align.START,
+            valign=Gtk.Align.CENTER,
+            active=self.settings.get_boolean("panel-scrolling-pause-on-leave"),
+        )
+        scrolling_pause_switch.connect(
+            "state-set", self._scrolling_pause_switch_changed
+        )
+        self.scrolling_widgets: tuple[Gtk.Widget, ...] = (
+            scrolling_speed_scale,
+            scrolling_max_fps_spin,
+            scrolling_pause_switch,
+        )
+        self.scrolling_switch.connect("state-set", self._scrolling_switch_changed)
+
         separator_label = LabelWSubtitle(
             title="Separator:",
             subtitle="Symbol to use as the separator",
@@ -297,6 +375,18 @@ class PanelSettingsPage(_SettingsPageBase):
         )
         show_arrow_switch.connect("state_set", self.show_arrow_changed)
 
+        renderer_label = LabelWSubtitle(
+            title="Drawing:",
+            subtitle="Single widget is cheaper to update, but can't scroll the text",
+            wrap_subtitle=True,
+        )
+        renderer_combobox = Gtk.ComboBoxText()
+        renderer_combobox.append(str(PanelRenderer.widgets), "Widgets")
+        renderer_combobox.append(str(PanelRenderer.drawn), "Single widget")
+        renderer_combobox.set_active_id(str(self.settings.get_uint("panel-renderer")))
+        renderer_combobox.connect("changed", self._renderer_combobox_changed)
+        self._update_scrolling_sensitivity()
+
         show_nothing_playing_label = LabelWSubtitle(
             title="Show ‘Nothing Playing’ Label:",
             subtitle="Whether to show a label with the text specified below, "
@@ -398,6 +488,64 @@ class PanelSettingsPage(_SettingsPageBase):
 
         self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 2, 2, 1)
 
+        follow_enabled = self.settings.get_boolean("panel-follow-playing")
+        follow_label = LabelWSubtitle(
+            title="Follow the playing player:",
+            subtitle="Show the player that started playing, unless one is pinned",
+            wrap_subtitle=True,
+        )
+        follow_switch = Gtk.Switch(
+            halign=Gtk.Align.START,
+            valign=Gtk.Align.CENTER,
+            active=follow_enabled,
+        )
+        follow_delay_label = Gtk.Label(
+            label="After playing for (ms):",
+            halign=Gtk.Align.START,
+            margin_left=30,
+        )
+        follow_delay_spin = Gtk.SpinButton.new_with_range(
+            min=0,
+            max=30_000,
+            step=100,
+        )
+        follow_delay_spin.set_tooltip_text(
+            "Shorter plays, like previews started by browsers, are ignored"
+        )
+        follow_delay_spin.set_value(self.settings.get_uint("panel-follow-delay"))
+        follow_delay_spin.connect(
+            "value-changed",
+            lambda spin: self.settings.set_uint(
+                "panel-follow-delay", spin.get_value_as_int()
+            ),
+        )
+        follow_dwell_label = Gtk.Label(
+            label="Keep a player at least (s):",
+            halign=Gtk.Align.START,
+            margin_left=30,
+        )
+        follow_dwell_spin = Gtk.SpinButton.new_with_range(
+            min=0,
+            max=600,
+            step=1,
+        )
+        follow_dwell_spin.set_value(self.settings.get_uint("panel-follow-min-dwell"))
+        follow_dwell_spin.connect(
+            "value-changed",
+            lambda spin: self.settings.set_uint(
+                "panel-follow-min-dwell", spin.get_value_as_int()
+            ),
+        )
+        follow_widgets = (
+            follow_delay_label,
+            follow_delay_spin,
+            follow_dwell_label,
+            follow_dwell_spin,
+        )
+        for widget in follow_widgets:
+            widget.set_sensitive(follow_enabled)
+        follow_switch.connect("state-set", self._follow_switch_changed, follow_widgets)
+
         self.attach(max_len_title, 0, 3, 2, 1)
         self.attach(max_len_no_limit_box, 0, 4, 2, 1)
         self.attach(max_len_fixed_box, 0, 5, 2, 1)
@@ -411,30 +559,82 @@ class PanelSettingsPage(_SettingsPageBase):
 
         self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 10, 2, 1)
 
-        self.attach(separator_label, 0, 11, 1, 1)
-        self.attach(separator_combo, 1, 11, 1, 1)
-        self.attach(show_arrow_label, 0, 12, 1, 1)
-        self.attach(show_arrow_switch, 1, 12, 1, 1)
+        self.attach(scrolling_label, 0, 11, 1, 1)
+        self.attach(self.scrolling_switch, 1, 11, 1, 1)
+        self.attach(scrolling_speed_label, 0, 12, 1, 1)
+        self.attach(scrolling_speed_scale, 1, 12, 1, 1)
+        self.attach(scrolling_max_fps_label, 0, 13, 1, 1)
+        self.attach(scrolling_max_fps_spin, 1, 13, 1, 1)
+        self.attach(scrolling_pause_label, 0, 14, 1, 1)
+        self.attach(scrolling_pause_switch, 1, 14, 1, 1)
+
+        self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 15, 2, 1)
+
+        self.attach(separator_label, 0, 16, 1, 1)
+        self.attach(separator_combo, 1, 16, 1, 1)
+        self.attach(show_arrow_label, 0, 17, 1, 1)
+        self.attach(show_arrow_switch, 1, 17, 1, 1)
+        self.attach(renderer_label, 0, 18, 1, 1)
+        self.attach(renderer_combobox, 1, 18, 1, 1)
+
+        self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 19, 2, 1)
+
+        self.attach(show_nothing_playing_label, 0, 20, 1, 1)
+        self.attach(show_nothing_playing_switch, 1, 20, 1, 1)
+        self.attach(show_nothing_playing_text_label, 0, 21, 1, 1)
+        self.attach(self.show_nothing_playing_text_entry, 1, 21, 1, 1)
+
+        self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 22, 2, 1)
+
+        self.attach(mouse_actions_title_label, 0, 23, 2, 1)
+        self.attach(mouse_action_left_btn_label, 0, 24, 1, 1)
+        self.attach(mouse_action_left_btn_combo, 1, 24, 1, 1)
+        self.attach(mouse_action_right_btn_label, 0, 25, 1, 1)
+        self.attach(mouse_action_right_btn_combo, 1, 25, 1, 1)
+        self.attach(mouse_action_middle_btn_label, 0, 26, 1, 1)
+        self.attach(mouse_action_middle_btn_combo, 1, 26, 1, 1)
+
+        self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 27, 2, 1)
+
+        self.attach(follow_label, 0, 28, 1, 1)
+        self.attach(follow_switch, 1, 28, 1, 1)
+        self.attach(follow_delay_label, 0, 29, 1, 1)
+        self.attach(follow_delay_spin, 1, 29, 1, 1)
+        self.attach(follow_dwell_label, 0, 30, 1, 1)
+        self.attach(follow_dwell_spin, 1, 30, 1, 1)
 
-        self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 13, 2, 1)
+    def show_arrow_changed(self, _, new_state: bool) -> bool:
+        self.settings.set_boolean("show-arrow", new_state)
+        return False
 
-        self.attach(show_nothing_playing_label, 0, 14, 1, 1)
-        self.attach(show_nothing_playing_switch, 1, 14, 1, 1)
-        self.attach(show_nothing_playing_text_label, 0, 15, 1, 1)
-        self.attach(self.show_nothing_playing_text_entry, 1, 15, 1, 1)
+    def _scrolling_switch_changed(self, _, new_state: bool) -> bool:
+        self.settings.set_boolean("panel-text-scrolling", new_state)
+        self._update_scrolling_sensitivity()
+        return False
 
-        self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 16, 2, 1)
+    def _renderer_combobox_changed(self, combo: Gtk.ComboBoxText) -> None:
+        self.settings.set_uint("panel-renderer", int(combo.get_active_id()))
+        self._update_scrolling_sensitivity()
+
+    def _update_scrolling_sensitivity(self) -> None:
+        """the single widget renderer doesn't scroll, so its settings are off"""
+        scrolls = self.settings.get_uint("panel-renderer") == PanelRenderer.widgets
+        self.scrolling_switch.set_sensitive(scrolls)
+        for widget in self.scrolling_widgets:
+            widget.set_sensitive(
+                scrolls and self.settings.get_boolean("panel-text-scrolling")
+            )
 
-        self.attach(mouse_actions_title_label, 0, 17, 2, 1)
-        self.attach(mouse_action_left_btn_label, 0, 18, 1, 1)
-        self.attach(mouse_action_left_btn_combo, 1, 18, 1, 1)
-        self.attach(mouse_action_right_btn_label, 0, 19, 1, 1)
-        self.attach(mouse_action_right_btn_combo, 1, 19, 1, 1)
-        self.attach(mouse_action_middle_btn_label, 0, 20, 1, 1)
-        self.attach(mouse_action_middle_btn_combo, 1, 20, 1, 1)
+    def _follow_switch_changed(
+        self, _, new_state: bool, widgets_enabled_by_this: tuple[Gtk.Widget, ...]
+    ) -> bool:
+        self.settings.set_boolean("panel-follow-playing", new_state)
+        for widget in widgets_enabled_by_this:
+            widget.set_sensitive(new_state)
+        return False
 
-    def show_arrow_changed(self, _, new_state: bool) -> bool:
-        self.settings.set_boolean("show-arrow", new_state)
+    def _scrolling_pause_switch_changed(self, _, new_state: bool) -> bool:
+        self.settings.set_boolean("panel-scrolling-pause-on-leave", new_state)
         return False
 
     def _show_nothing_playing_switch_changed(self, _, new_state: bool) -> bool:
@@ -560,6 +760,22 @@ class PopoverSettingsPage(_SettingsPageBase):
             ),
         )
 
+        layout_label = LabelWSubtitle(
+            title="Layout:",
+            subtitle="A list stays quick to open with many players",
+            wrap_subtitle=True,
+        )
+        layout_combobox = Gtk.ComboBoxText()
+        layout_combobox.append(str(PopoverLayout.tabs), "Tabs")
+        layout_combobox.append(str(PopoverLayout.list), "List")
+        layout_combobox.set_active_id(str(self.settings.get_uint("popover-layout")))
+        layout_combobox.connect(
+            "changed",
+            lambda combo: self.settings.set_uint(
+                "popover-layout", int(combo.get_active_id())
+            ),
+        )
+
         text_style_label = LabelWSubtitle(
             title="Popup text style:",
             subtitle="Style of the text in the popup",
@@ -705,6 +921,72 @@ class PopoverSettingsPage(_SettingsPageBase):
             ),
         )
 
+        scrolling_max_fps_label = Gtk.Label(
+            label="Max frame rate:",
+            halign=Gtk.Align.START,
+            margin_left=50,
+        )
+        self.scrolling_max_fps_spin = Gtk.SpinButton.new_with_range(
+            min=0,
+            max=240,
+            step=1,
+        )
+        self.scrolling_max_fps_spin.set_tooltip_text(
+            "How many times per second at most the text is moved, 0 is unlimited"
+        )
+        self.scrolling_max_fps_spin.set_value(
+            self.settings.get_uint("plasma-popover-scrolling-max-fps")
+        )
+        self.scrolling_max_fps_spin.set_sensitive(
+            settings.get_uint("plasma-popover-text-style") == 1
+        )
+        self.scrolling_max_fps_spin.connect(
+            "value-changed",
+            lambda spin: self.settings.set_uint(
+                "plasma-popover-scrolling-max-fps", spin.get_value_as_int()
+            ),
+        )
+
+        prefetch_label = LabelWSubtitle(
+            title="Prefetch covers:",
+            subtitle="Number of upcoming tracks whose album cover is loaded in advance, "
+            "only for players that share their track list, 0 disables it",
+            wrap_subtitle=True,
+        )
+        prefetch_spin = Gtk.SpinButton.new_with_range(
+            min=0,
+            max=5,
+            step=1,
+        )
+        prefetch_spin.set_valign(Gtk.Align.CENTER)
+        prefetch_spin.set_value(self.settings.get_uint("art-prefetch-depth"))
+        prefetch_spin.connect(
+            "value-changed",
+            lambda spin: self.settings.set_uint(
+                "art-prefetch-depth", spin.get_value_as_int()
+            ),
+        )
+
+        eviction_label = LabelWSubtitle(
+            title="Free unseen players after (minutes):",
+            subtitle="The widgets of a player whose page wasn't shown for this long "
+            "are destroyed and built again when needed, 0 keeps them",
+            wrap_subtitle=True,
+        )
+        eviction_spin = Gtk.SpinButton.new_with_range(
+            min=0,
+            max=1440,
+            step=5,
+        )
+        eviction_spin.set_valign(Gtk.Align.CENTER)
+        eviction_spin.set_value(self.settings.get_uint("popover-idle-eviction-minutes"))
+        eviction_spin.connect(
+            "value-changed",
+            lambda spin: self.settings.set_uint(
+                "popover-idle-eviction-minutes", spin.get_value_as_int()
+            ),
+        )
+
         self.attach(width_label, 0, 0, 1, 1)
         self.attach(width_scale, 1, 0, 1, 1)
         self.attach(height_label, 0, 1, 1, 1)
@@ -732,6 +1014,17 @@ class PopoverSettingsPage(_SettingsPageBase):
         self.attach(self.scrolling_speed_name_scale, 1, 11, 1, 1)
         self.attach(scrolling_speed_author_label, 0, 12, 1, 1)
         self.attach(self.scrolling_speed_author_scale, 1, 12, 1, 1)
+        self.attach(scrolling_max_fps_label, 0, 13, 1, 1)
+        self.attach(self.scrolling_max_fps_spin, 1, 13, 1, 1)
+
+        self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 14, 2, 1)
+
+        self.attach(prefetch_label, 0, 15, 1, 1)
+        self.attach(prefetch_spin, 1, 15, 1, 1)
+        self.attach(eviction_label, 0, 16, 1, 1)
+        self.attach(eviction_spin, 1, 16, 1, 1)
+        self.attach(layout_label, 0, 17, 1, 1)
+        self.attach(layout_combobox, 1, 17, 1, 1)
 
     def text_style_combo_changed(self, combo: Gtk.ComboBox) -> None:
         value = 0
@@ -744,6 +1037,109 @@ class PopoverSettingsPage(_SettingsPageBase):
 
         self.scrolling_speed_name_scale.set_sensitive(value == 1)
         self.scrolling_speed_author_scale.set_sensitive(value == 1)
+        self.scrolling_max_fps_spin.set_sensitive(value == 1)
+
+
+class PowerSettingsPage(_SettingsPageBase):
+    def __init__(self, settings: Gio.Settings):
+        super().__init__(settings)
+
+        mode_label = LabelWSubtitle(
+            title="Save power:",
+            subtitle="When to reduce the work the applet does in the background",
+        )
+        mode_combobox = Gtk.ComboBoxText()
+        mode_combobox.append(
+            str(PowerSavingMode.automatic), "On power saver or on battery"
+        )
+        mode_combobox.append(str(PowerSavingMode.power_saver_only), "On power saver")
+        mode_combobox.append(str(PowerSavingMode.never), "Never")
+        mode_combobox.append(str(PowerSavingMode.always), "Always")
+        mode_combobox.set_active_id(str(self.settings.get_uint("power-saving-mode")))
+        mode_combobox.connect(
+            "changed",
+            lambda combo: self.settings.set_uint(
+                "power-saving-mode", int(combo.get_active_id())
+            ),
+        )
+
+        max_fps_label = LabelWSubtitle(
+            title="Scrolling frame rate:",
+            subtitle="The maximal frame rate of all the scrolling text, "
+            "0 means no additional limit",
+            wrap_subtitle=True,
+        )
+        max_fps_spin = Gtk.SpinButton.new_with_range(min=0, max=240, step=1)
+        max_fps_spin.set_value(
+            self.settings.get_uint("power-saving-scrolling-max-fps")
+        )
+        max_fps_spin.connect(
+            "value-changed",
+            lambda spin: self.settings.set_uint(
+                "power-saving-scrolling-max-fps", spin.get_value_as_int()
+            ),
+        )
+
+        progress_interval_label = LabelWSubtitle(
+            title="Progress update interval:",
+            subtitle="How often, in seconds, the progress in the popup is updated",
+            wrap_subtitle=True,
+        )
+        progress_interval_spin = Gtk.SpinButton.new_with_range(min=1, max=60, step=1)
+        progress_interval_spin.set_value(
+            self.settings.get_uint("power-saving-progress-interval")
+        )
+        progress_interval_spin.connect(
+            "value-changed",
+            lambda spin: self.settings.set_uint(
+                "power-saving-progress-interval", spin.get_value_as_int()
+            ),
+        )
+
+        fast_art_scaling_label = LabelWSubtitle(
+            title="Faster album cover scaling:",
+            subtitle="Scale the album covers faster, in lower quality",
+        )
+        fast_art_scaling_switch = Gtk.Switch(
+            halign=Gtk.Align.START,
+            valign=Gtk.Align.CENTER,
+            active=self.settings.get_boolean("power-saving-fast-art-scaling"),
+        )
+        fast_art_scaling_switch.connect(
+            "state-set", self._fast_art_scaling_switch_changed
+        )
+
+        prefetch_label = LabelWSubtitle(
+            title="Prefetched album covers:",
+            subtitle="The maximal number of upcoming tracks whose cover is prefetched",
+            wrap_subtitle=True,
+        )
+        prefetch_spin = Gtk.SpinButton.new_with_range(min=0, max=10, step=1)
+        prefetch_spin.set_value(self.settings.get_uint("power-saving-prefetch-depth"))
+        prefetch_spin.connect(
+            "value-changed",
+            lambda spin: self.settings.set_uint(
+                "power-saving-prefetch-depth", spin.get_value_as_int()
+            ),
+        )
+
+        self.attach(mode_label, 0, 0, 1, 1)
+        self.attach(mode_combobox, 1, 0, 1, 1)
+
+        self.attach(Gtk.Separator.new(Gtk.Orientation.HORIZONTAL), 0, 1, 2, 1)
+
+        self.attach(max_fps_label, 0, 2, 1, 1)
+        self.attach(max_fps_spin, 1, 2, 1, 1)
+        self.attach(progress_interval_label, 0, 3, 1, 1)
+        self.attach(progress_interval_spin, 1, 3, 1, 1)
+        self.attach(fast_art_scaling_label, 0, 4, 1, 1)
+        self.attach(fast_art_scaling_switch, 1, 4, 1, 1)
+        self.attach(prefetch_label, 0, 5, 1, 1)
+        self.attach(prefetch_spin, 1, 5, 1, 1)
+
+    def _fast_art_scaling_switch_changed(self, _, new_state: bool) -> bool:
+        self.settings.set_boolean("power-saving-fast-art-scaling", new_state)
+        return False
 
 
 class OrderWidget(Gtk.Grid):
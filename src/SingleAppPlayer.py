@@ -1,13 +1,17 @@
 # Copyright 2023 - 2025, zalesyc and the budgie-media-player-applet contributors
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import threading
 from typing import Optional, Union, Callable
-from dataclasses import dataclass
-from urllib.parse import urlparse, ParseResult
-import requests
+from urllib.parse import urlparse
+from dataclasses import replace
 from PanelControlView import PanelControlView
-from EnumsStructs import AlbumCoverType, AlbumCoverData
+from PanelCanvasView import PanelCanvasView
+from EnumsStructs import AlbumCoverType, AlbumCoverData, PanelState
+from ImagePipeline import ImagePipeline
+from ActivityMonitor import ActivityMonitor
+from PowerPolicy import PowerPolicy
+from DesktopEntryIndex import DesktopEntryIndex
+from PlayerList import PlayerItem
 from mprisWrapper import MprisWrapper
 
 import gi
@@ -19,35 +23,77 @@ gi.require_version("GdkPixbuf", "2.0")
 from gi.repository import Gtk, Gio, GLib, GdkPixbuf
 
 
-@dataclass
-class DownloadThreadData:
-    thread: threading.Thread
-    stop_event: threading.Event
-
-
 class SingleAppPlayer(Gtk.Bin):
     ICON_SIZE = Gtk.IconSize.MENU
+    INTERACTION_METHODS: frozenset[str] = frozenset(
+        {
+            "PlayPause",
+            "Play",
+            "Pause",
+            "Stop",
+            "Next",
+            "Previous",
+            "Seek",
+            "SetPosition",
+            "OpenUri",
+            "GoTo",
+            "ActivatePlaylist",
+            "Raise",
+        }
+    )
+    """methods that are called only when the user does something with the player"""
 
     def __init__(
         self,
         service_name: str,
         open_popover_func: Callable[[], None],
         on_pin_clicked: Callable[[str], None],
+        on_activity: Callable[[str], None],
         settings: Gio.Settings,
     ):
         super().__init__()
 
         self.settings: Gio.Settings = settings
 
-        self.panel_view: Optional[PanelControlView] = None
+        self.panel_view: Union[PanelControlView, PanelCanvasView, None] = None
 
         self.open_popover_func: Callable = open_popover_func
         self.on_pin_clicked: Callable = on_pin_clicked
+        self.on_activity: Callable = on_activity
+        """called with the service name when last_active changes"""
         self.service_name: str = service_name
         self.dbus_player: MprisWrapper = MprisWrapper(self.service_name)
-        self.current_download_thread: Optional[DownloadThreadData] = None
+        self._art_generation: int = 0
+        """bumped whenever the outstanding art work of this player becomes obsolete"""
+        self._art_cancellable: Gio.Cancellable = Gio.Cancellable()
+        self._prefetch_cancellable: Gio.Cancellable = Gio.Cancellable()
+        self.track_id: Optional[str] = None
+        self._track_ids: list[str] = []
+        """ids of the tracks in the org.mpris.MediaPlayer2.TrackList interface"""
+        self.has_track_list: bool = False
+        self.current_page: bool = False
+        """the page of the player is the current one in the popover"""
+        self.suspended: bool = ActivityMonitor.get_default().suspended
+        """the applet can't be seen, see ActivityMonitor"""
+        self._activity_callback_id: int = ActivityMonitor.get_default().add_callback(
+            self._suspended_changed
+        )
+        self.power_policy: PowerPolicy = PowerPolicy.for_settings(settings)
+        self._power_policy_callback_id: int = self.power_policy.add_callback(
+            self._power_policy_changed
+        )
+        self._prefetch_policy: tuple[int, GdkPixbuf.InterpType] = (
+            self.power_policy.prefetch_depth,
+            self.power_policy.interp_type,
+        )
+        """the power policy values the prefetched covers depend on"""
 
         self.playing: bool = False
+        self.last_active: int = 0
+        """
+        monotonic time of the last PlaybackStatus change or user interaction,
+        the players are ordered by it, 0 if there was none
+        """
         self.artist: Optional[list[str]] = []
         self.title: Optional[str] = ""
         self.song_length: int = 0
@@ -71,6 +117,7 @@ class SingleAppPlayer(Gtk.Bin):
         ) is not None:
             if playing.get_string() == "Playing":
                 self.playing = True
+                self.last_active = GLib.get_monotonic_time()
             elif playing.get_string() == "Paused":
                 self.playing = False
 
@@ -88,6 +135,10 @@ class SingleAppPlayer(Gtk.Bin):
             if new_title is not None:
                 self.title = new_title.get_string()
 
+            track_id = start_song_metadata.lookup_value("mpris:trackid", None)
+            if track_id is not None:
+                self.track_id = track_id.get_string()
+
             self._set_album_cover(
                 start_song_metadata.lookup_value("mpris:artUrl", None)
             )
@@ -126,11 +177,18 @@ class SingleAppPlayer(Gtk.Bin):
         if (app_name_var := self.dbus_player.get_app_property("Identity")) is not None:
             app_name = GLib.markup_escape_text(app_name_var.get_string())
 
+        self.list_item: PlayerItem = PlayerItem(self)
+        """the row of the player in the list layout of the popover"""
+        self._update_list_item()
+
         self.icon: Gtk.Image = Gtk.Image(
             tooltip_markup=f"<b>{app_name}</b>"
             f" - {GLib.markup_escape_text(self.service_name)}"
         )
-        self._set_icon(self.dbus_player.get_app_property("DesktopEntry"))
+        self._set_icon()
+        self._desktop_entries_callback_id: int = (
+            DesktopEntryIndex.get_default().add_callback(self._desktop_entries_changed)
+        )
 
         self.dbus_player.player_connect("PlaybackStatus", self._playing_changed)
         self.dbus_player.player_connect("Metadata", self._metadata_changed)
@@ -140,60 +198,66 @@ class SingleAppPlayer(Gtk.Bin):
         self.dbus_player.player_connect("CanGoNext", self._can_go_next_changed)
         self.dbus_player.player_connect("Rate", self._rate_changed)
         self.dbus_player.app_connect("DesktopEntry", self._set_icon)
+        self.dbus_player.method_call_connect(self._method_called)
 
-    def add_panel_view(
-        self,
-        orientation: Gtk.Orientation,
-        panel_size: int,
-    ) -> None:
-        self.panel_view = PanelControlView(
-            dbus_player=self.dbus_player,
+        if self.dbus_player.enable_track_list():
+            self.has_track_list = True
+            self._track_ids = self.dbus_player.get_track_list_tracks()
+            self.dbus_player.track_list_connect(
+                "TrackListReplaced", self._track_list_replaced
+            )
+            self.dbus_player.track_list_connect("TrackAdded", self._track_added)
+            self.dbus_player.track_list_connect("TrackRemoved", self._track_removed)
+            self.dbus_player.track_list_connect(
+                "TrackMetadataChanged", self._track_metadata_changed
+            )
+            self._prefetch_next_covers()
+
+    def panel_state(self) -> PanelState:
+        """what the panel view shows for this player"""
+        return PanelState(
             title=self.title,
             artist=self.artist,
-            album_cover=self.album_cover_data,
+            album_cover=replace(self.album_cover_data),
             playing=self.playing,
             can_play_or_pause=(self.can_play or self.can_pause),
             can_go_previous=self.can_go_previous,
             can_go_next=self.can_go_next,
-            open_popover_func=self.open_popover_func,
-            orientation=orientation,
-            panel_size=panel_size,
-            settings=self.settings,
         )
 
+    def attach_panel_view(
+        self, panel_view: Union[PanelControlView, PanelCanvasView]
+    ) -> None:
+        """
+        Make the panel view show this player, the view is owned by the applet
+        and is only rebound, so that switching the players doesn't rebuild it
+        """
+        self.panel_view = panel_view
+        self.panel_view.bind(self.dbus_player, self.panel_state())
         self.pinned_changed()
 
-    def remove_panel_view(self, on_destroy: bool = False) -> None:
-        """on destroy is used when self is being destroyed, used internally
-        in self._on_destroy"""
-        if on_destroy:
-            if self.panel_view is not None:
-                self.panel_view.destroy()
-                self.panel_view = None
-                self.pinned_changed()
-            return
-
+    def detach_panel_view(self) -> None:
         if self.panel_view is None:
             print(
-                "budgie-media-player-applet: trying to remove panel_view, "
+                "budgie-media-player-applet: trying to detach panel_view, "
                 f"which is already None, player id: {self.service_name}"
             )
             return
-        self.panel_view.destroy()
         self.panel_view = None
         self.pinned_changed()
 
-    def panel_size_changed(self, new_size: int) -> None:
-        if self.panel_view is not None:
-            self.panel_view.panel_size_changed(new_size, self.album_cover_data)
-
-    def panel_orientation_changed(self, new_orientation: Gtk.Orientation) -> None:
-        if self.panel_view is not None:
-            self.panel_view.orientation_changed(new_orientation, self.album_cover_data)
+    def set_current_page(self, current_page: bool) -> None:
+        if current_page == self.current_page:
+            return
+        self.current_page = current_page
+        self.current_page_changed()
 
     def popover_to_be_open(self) -> None:
         pass
 
+    def current_page_changed(self) -> None:
+        pass
+
     def popover_just_closed(self) -> None:
         pass
 
@@ -221,6 +285,45 @@ class SingleAppPlayer(Gtk.Bin):
     def pinned_changed(self) -> None:
         pass
 
+    def current_track_changed(self) -> None:
+        pass
+
+    def track_list_replaced(self, track_ids: list[str]) -> None:
+        pass
+
+    def track_added(self, metadata: GLib.Variant, after_track: str) -> None:
+        pass
+
+    def track_removed(self, track_id: str) -> None:
+        pass
+
+    def track_metadata_changed(self, track_id: str, metadata: GLib.Variant) -> None:
+        pass
+
+    def suspended_changed(self) -> None:
+        pass
+
+    def power_policy_changed(self) -> None:
+        pass
+
+    def _power_policy_changed(self) -> None:
+        prefetch_policy = (
+            self.power_policy.prefetch_depth,
+            self.power_policy.interp_type,
+        )
+        if prefetch_policy != self._prefetch_policy:
+            self._prefetch_policy = prefetch_policy
+            self._prefetch_next_covers()
+        self.power_policy_changed()
+
+    def _suspended_changed(self, suspended: bool) -> None:
+        self.suspended = suspended
+        if suspended:
+            self._prefetch_cancellable.cancel()
+        else:
+            self._prefetch_next_covers()
+        self.suspended_changed()
+
     def _playing_changed(self, status: GLib.Variant) -> None:
         new_playing = None
         if status.get_string() == "Playing":
@@ -231,9 +334,19 @@ class SingleAppPlayer(Gtk.Bin):
 
         if new_playing is not None and new_playing != self.playing:
             self.playing = new_playing
+            self.list_item.props.playing = self.playing
             if self.panel_view is not None:
                 self.panel_view.set_playing(self.playing)
             self.playing_changed()
+            self._mark_active()
+
+    def _method_called(self, method_name: str) -> None:
+        if method_name in self.INTERACTION_METHODS:
+            self._mark_active()
+
+    def _mark_active(self) -> None:
+        self.last_active = GLib.get_monotonic_time()
+        self.on_activity(self.service_name)
 
     def _metadata_changed(self, metadata: GLib.Variant) -> None:
         new_artist = metadata.lookup_value("xesam:artist", GLib.VariantType.new("as"))
@@ -263,6 +376,9 @@ class SingleAppPlayer(Gtk.Bin):
                 self.song_length = new_length_secs
                 changed_len = True
 
+        if changed_art_title:
+            self._update_list_item()
+
         if changed_len or changed_art_title:
             if changed_art_title and self.panel_view is not None:
                 self.panel_view.set_metadata(self.artist, self.title)
@@ -270,6 +386,12 @@ class SingleAppPlayer(Gtk.Bin):
 
         self._set_album_cover(metadata.lookup_value("mpris:artUrl", None))
 
+        new_track_id = metadata.lookup_value("mpris:trackid", None)
+        if new_track_id is not None and new_track_id.get_string() != self.track_id:
+            self.track_id = new_track_id.get_string()
+            self._prefetch_next_covers()
+            self.current_track_changed()
+
     def _can_play_changed(self, metadata: GLib.Variant) -> None:
         new_can_play = metadata.get_boolean()
         if new_can_play is not None and new_can_play != self.can_play:
@@ -330,185 +452,226 @@ class SingleAppPlayer(Gtk.Bin):
 
     def _set_album_cover(self, art_url_variant: GLib.Variant) -> None:
         if art_url_variant is None:
+            self._cancel_art_work()
             self._set_album_cover_other()
             return
 
         url = art_url_variant.get_string()
         parsed_url = urlparse(url)
 
-        if parsed_url.scheme == "file":
-            self._set_album_cover_file(parsed_url)
-            return
-
         if parsed_url.scheme == "https":
             if self.album_cover_data.image_url_http == url:
                 return
+            self._cancel_art_work()
             self.album_cover_data.image_url_http = url
 
-            self._set_album_cover_https(url)
+            self._load_album_cover(url)
+            return
+
+        self._cancel_art_work()
+        if parsed_url.scheme == "file":
+            self._load_album_cover(url)
             return
 
         self._set_album_cover_other()
 
-    def _set_album_cover_other(self) -> None:
-        desktop_file_name_variant = self.dbus_player.get_app_property("DesktopEntry")
-        if desktop_file_name_variant is not None:
-            desktop_file_name = desktop_file_name_variant.get_string()
-            try:
-                desktop_app_info = Gio.DesktopAppInfo.new(
-                    desktop_file_name + ".desktop"
-                )
-            except TypeError:
-                pass
-            else:
-                if desktop_app_info is not None:
-                    desktop_icon = desktop_app_info.get_icon()
-                    if desktop_icon is not None:
-                        self._album_cover_changed(desktop_icon, AlbumCoverType.Gicon)
-                    return
-
-            if desktop_file_name.lower() == "spotify":
-                # This is a workaround for a bug in the spotify app from flatpak,
-                # in MPRIS it reports its desktop file as spotify.desktop, but in
-                # reality it is com.spotify.Client.desktop, which breaks the code above
-                icon_theme = Gtk.IconTheme.get_default()
-                if icon_theme.has_icon("com.spotify.Client"):
-                    self._album_cover_changed(
-                        "com.spotify.Client", AlbumCoverType.IconName
-                    )
-                    return
-                if icon_theme.has_icon("spotify"):
-                    self._album_cover_changed("spotify", AlbumCoverType.IconName)
-                    return
+    def _cancel_art_work(self) -> None:
+        """
+        Cancels all the outstanding art work (downloads, decoding, scaling)
+        of this player, the results that are already on the way are dropped
+        before they touch any widget
+        """
+        self._art_cancellable.cancel()
+        self._art_cancellable = Gio.Cancellable()
+        self._art_generation += 1
+        self.album_cover_data.image_url_http = None
+
+    def _art_request(
+        self, callback: Callable[[Optional[GdkPixbuf.Pixbuf]], None]
+    ) -> tuple[Callable[[Optional[GdkPixbuf.Pixbuf]], None], Gio.Cancellable]:
+        """
+        Tags the art request with the current generation and cancellable,
+        returns the callback that is only called if the request is still current
+        """
+        generation = self._art_generation
+        cancellable = self._art_cancellable
+
+        def on_done(pixbuf: Optional[GdkPixbuf.Pixbuf]) -> None:
+            if cancellable.is_cancelled() or generation != self._art_generation:
+                return
+            callback(pixbuf)
 
-        self._album_cover_changed("emblem-music-symbolic", AlbumCoverType.IconName)
+        return on_done, cancellable
 
-    def _set_album_cover_file(self, parsed_url: ParseResult) -> None:
-        try:
-            pixbuf = GdkPixbuf.Pixbuf.new_from_file(parsed_url.path)
-            if pixbuf is not None:
-                self._album_cover_changed(pixbuf, AlbumCoverType.Pixbuf)
-                return
-        except gi.repository.GLib.GError:
-            self._set_album_cover_other()
-        else:
-            self._set_album_cover_other()
+    def _set_album_cover_other(self) -> None:
+        desktop_icon = self._desktop_icon()
+        if desktop_icon is not None:
+            self._album_cover_changed(desktop_icon, AlbumCoverType.Gicon)
+            return
+        self._album_cover_changed("emblem-music-symbolic", AlbumCoverType.IconName)
 
-    def _set_album_cover_https(self, url: str) -> None:
-        if self.current_download_thread is not None and (
-            self.current_download_thread.thread.is_alive()
-        ):
-            self.current_download_thread.stop_event.set()
-
-        event = threading.Event()
-        self.current_download_thread = DownloadThreadData(
-            thread=threading.Thread(
-                target=self._get_album_cover_image_to_gdkpixbuf,
-                args=(url, event),
-                daemon=True,
-            ),
-            stop_event=event,
+    def _load_album_cover(self, url: str) -> None:
+        cache_key = ImagePipeline.cache_key(url)
+        callback, cancellable = self._art_request(
+            lambda pixbuf: self._on_album_cover_image_loaded(pixbuf, cache_key)
         )
-        self.current_download_thread.thread.start()
+        ImagePipeline.get_default().load(url, callback, cancellable)
 
-    def _get_album_cover_image_to_gdkpixbuf(
-        self, url: str, stop_event: threading.Event
+    def _on_album_cover_image_loaded(
+        self, pixbuf: Optional[GdkPixbuf.Pixbuf], cache_key: Optional[str]
     ) -> None:
-        pixbuf = self._download_album_cover_image_to_gdkpixbuf(url, stop_event)
         if pixbuf is None:
-            GLib.idle_add(self._set_album_cover_other)
+            self._set_album_cover_other()
             return
 
-        GLib.idle_add(self._album_cover_changed, pixbuf, AlbumCoverType.Pixbuf)
+        self.album_cover_data.image_cache_key = cache_key
+        self._album_cover_changed(pixbuf, AlbumCoverType.Pixbuf)
 
-    @staticmethod
-    def _download_album_cover_image_to_gdkpixbuf(
-        url: str, stop_event: threading.Event
-    ) -> Optional[GdkPixbuf.Pixbuf]:
-        img_stream = Gio.MemoryInputStream()
-        try:
-            response = requests.get(url, stream=True, timeout=4)
-            if response.status_code != 200:
-                return None
-
-            for chunk in response.iter_content(chunk_size=1024):
-                if stop_event.is_set():
-                    response.close()
-                    return None
-                img_stream.add_bytes(GLib.Bytes.new(chunk))
+    def _prefetch_next_covers(self) -> None:
+        """
+        Loads and pre-scales the covers of the upcoming tracks at low priority,
+        only for players implementing org.mpris.MediaPlayer2.TrackList
+        """
+        depth = self.power_policy.prefetch_depth
+        if depth == 0 or self.suspended or self.track_id not in self._track_ids:
+            return
 
-            pixbuf = GdkPixbuf.Pixbuf.new_from_stream(img_stream, None)
+        index = self._track_ids.index(self.track_id)
+        next_track_ids = self._track_ids[index + 1 : index + 1 + depth]
+        if not next_track_ids:
+            return
 
-        except requests.exceptions.RequestException:
-            return None
-        finally:
-            img_stream.close()
+        self._prefetch_cancellable.cancel()
+        self._prefetch_cancellable = Gio.Cancellable()
+        self.dbus_player.get_tracks_metadata(
+            next_track_ids, self._on_next_tracks_metadata, self._prefetch_cancellable
+        )
 
-        if stop_event.is_set():
-            return None
+    def _on_next_tracks_metadata(self, metadata: Optional[list[GLib.Variant]]) -> None:
+        if metadata is None:
+            return
+        for track_metadata in metadata:
+            art_url = track_metadata.lookup_value("mpris:artUrl", None)
+            if art_url is not None:
+                ImagePipeline.get_default().prefetch(
+                    art_url.get_string(),
+                    self._prefetch_cancellable,
+                    self.power_policy.interp_type,
+                )
 
-        return pixbuf
+    def _is_upcoming_track(self, track_id: str) -> bool:
+        if self.track_id not in self._track_ids or track_id not in self._track_ids:
+            return False
+        distance = self._track_ids.index(track_id) - self._track_ids.index(
+            self.track_id
+        )
+        return 0 < distance <= self.power_policy.prefetch_depth
+
+    def _track_list_replaced(self, parameters: GLib.Variant) -> None:
+        self._track_ids = list(parameters[0])
+        # the current track of the new list, the Metadata signal may come later
+        track_id_changed = parameters[1] != self.track_id
+        self.track_id = parameters[1]
+        self._prefetch_next_covers()
+        self.track_list_replaced(self._track_ids)
+        if track_id_changed:
+            self.current_track_changed()
+
+    def _track_added(self, parameters: GLib.Variant) -> None:
+        metadata = parameters.get_child_value(0)
+        after_track = parameters[1]
+        track_id = metadata.lookup_value("mpris:trackid", None)
+        if track_id is None:
+            return
 
-    def _set_icon(self, desktop_file_name_var: GLib.Variant) -> None:
-        if desktop_file_name_var is not None:
-            desktop_file_name = desktop_file_name_var.get_string()
+        if after_track in self._track_ids:
+            self._track_ids.insert(
+                self._track_ids.index(after_track) + 1, track_id.get_string()
+            )
+        else:
+            # org/mpris/MediaPlayer2/TrackList/NoTrack means at the start
+            self._track_ids.insert(0, track_id.get_string())
+
+        if self._is_upcoming_track(track_id.get_string()):
+            self._on_next_tracks_metadata([metadata])
+        self.track_added(metadata, after_track)
+
+    def _track_removed(self, parameters: GLib.Variant) -> None:
+        track_id = parameters[0]
+        if track_id in self._track_ids:
+            self._track_ids.remove(track_id)
+            self._prefetch_next_covers()
+            self.track_removed(track_id)
+
+    def _track_metadata_changed(self, parameters: GLib.Variant) -> None:
+        metadata = parameters.get_child_value(1)
+        if self._is_upcoming_track(parameters[0]):
+            self._on_next_tracks_metadata([metadata])
+        self.track_metadata_changed(parameters[0], metadata)
+
+    def _set_icon(self, *_) -> None:
+        desktop_icon = self._desktop_icon()
+        if desktop_icon is None:
+            desktop_icon = Gio.ThemedIcon.new("emblem-music-symbolic")
+        self.icon.set_from_gicon(desktop_icon, self.ICON_SIZE)
+        self.list_item.props.gicon = desktop_icon
+
+    def _update_list_item(self) -> None:
+        self.list_item.props.title = self.title or ""
+        self.list_item.props.artist = ", ".join(self.artist or [])
+        self.list_item.props.playing = self.playing
+
+    def _desktop_icon(self) -> Optional[Gio.Icon]:
+        """the icon of the application of the player"""
+        desktop_entry = self.dbus_player.get_app_property("DesktopEntry")
+        identity = self.dbus_player.get_app_property("Identity")
+        return DesktopEntryIndex.get_default().lookup_icon(
+            None if desktop_entry is None else desktop_entry.get_string(),
+            None if identity is None else identity.get_string(),
+        )
 
-            try:
-                desktop_app_info = Gio.DesktopAppInfo.new(
-                    desktop_file_name + ".desktop"
-                )
-            except TypeError:
-                pass
-            else:
-                if desktop_app_info is not None:
-                    desktop_icon = desktop_app_info.get_icon()
-                    if desktop_icon is not None:
-                        self.icon.set_from_gicon(desktop_icon, self.ICON_SIZE)
-                        return
-
-            if desktop_file_name.lower() == "spotify":
-                # This is a workaround for a bug in the spotify app from flatpak,
-                # in MPRIS it reports its desktop file as spotify.desktop, but in
-                # reality it is com.spotify.Client.desktop, which breaks the code above
-                icon_theme = Gtk.IconTheme.get_default()
-                if icon_theme.has_icon("com.spotify.Client"):
-                    self.icon.set_from_icon_name("com.spotify.Client", self.ICON_SIZE)
-                    return
-                if icon_theme.has_icon("spotify"):
-                    self.icon.set_from_icon_name("spotify", self.ICON_SIZE)
-                    return
-
-        self.icon.set_from_icon_name("emblem-music-symbolic", self.ICON_SIZE)
+    def _desktop_entries_changed(self) -> None:
+        self._set_icon()
+        if self.album_cover_data.cover_type in {
+            AlbumCoverType.Gicon,
+            AlbumCoverType.IconName,
+        }:
+            self._set_album_cover_other()
 
     def _get_resized_pixbuf(
-        self, available_height: int, available_width: int, portion_to_fill: float
-    ) -> GdkPixbuf:
+        self,
+        available_height: int,
+        available_width: int,
+        portion_to_fill: float,
+        callback: Callable[[Optional[GdkPixbuf.Pixbuf]], None],
+    ) -> None:
+        """
+        Scales the album cover on a worker thread, the callback is then called
+        with the resized pixbuf from the main loop
+        """
         square_size = min(
             available_height,
             round(available_width * portion_to_fill),
         )
-        if (
-            self.album_cover_data.song_cover_pixbuf.get_width()
-            < self.album_cover_data.song_cover_pixbuf.get_height()
-        ):
-            resized_pixbuf = self.album_cover_data.song_cover_pixbuf.scale_simple(
-                int(
-                    (square_size / self.album_cover_data.song_cover_pixbuf.get_height())
-                    * self.album_cover_data.song_cover_pixbuf.get_width()
-                ),
-                square_size,
-                GdkPixbuf.InterpType.BILINEAR,
-            )
-        else:
-            resized_pixbuf = self.album_cover_data.song_cover_pixbuf.scale_simple(
-                square_size,
-                int(
-                    (square_size / self.album_cover_data.song_cover_pixbuf.get_width())
-                    * self.album_cover_data.song_cover_pixbuf.get_height()
-                ),
-                GdkPixbuf.InterpType.BILINEAR,
-            )
-        return resized_pixbuf
+        pixbuf = self.album_cover_data.song_cover_pixbuf
+        callback, cancellable = self._art_request(callback)
+        ImagePipeline.get_default().scale_to_fit(
+            pixbuf,
+            square_size,
+            square_size,
+            callback,
+            cancellable,
+            cache_key=self.album_cover_data.image_cache_key,
+            interp_type=self.power_policy.interp_type,
+        )
 
     def _on_destroy(self, _) -> None:
-        self.remove_panel_view(on_destroy=True)
+        ActivityMonitor.get_default().remove_callback(self._activity_callback_id)
+        self.power_policy.remove_callback(self._power_policy_callback_id)
+        DesktopEntryIndex.get_default().remove_callback(
+            self._desktop_entries_callback_id
+        )
+        self._cancel_art_work()
+        self._prefetch_cancellable.cancel()
+        # the panel view belongs to the applet, it is not destroyed with the player
+        self.panel_view = None
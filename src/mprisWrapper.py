@@ -16,8 +16,14 @@ class MprisWrapper:
         interface_name_app = "org.mpris.MediaPlayer2"
         interface_name_property = "org.freedesktop.DBus.Properties"
 
+        self._service_name: str = service_name
         self._connected_functions_player: dict[str, Callable] = {}
         self._connected_functions_app: dict[str, Callable] = {}
+        self._connected_functions_track_list: dict[str, Callable] = {}
+        self._method_called_function: Optional[Callable[[str], None]] = None
+        self.track_list_proxy: Optional[Gio.DBusProxy] = None
+        self.playlists_proxy: Optional[Gio.DBusProxy] = None
+        self._other_proxies: dict[str, Gio.DBusProxy] = {}
 
         self.player_proxy: Gio.DBusProxy = Gio.DBusProxy.new_for_bus_sync(
             Gio.BusType.SESSION,
@@ -62,6 +68,131 @@ class MprisWrapper:
     ) -> None:
         self._connected_functions_app.update({property_name: func})
 
+    def track_list_connect(
+        self, signal_name: str, func: Callable[[GLib.Variant], None]
+    ) -> None:
+        """connect to a signal of the org.mpris.MediaPlayer2.TrackList interface"""
+        self._connected_functions_track_list.update({signal_name: func})
+
+    def method_call_connect(self, func: Callable[[str], None]) -> None:
+        """func(method_name) is called whenever a method of the player is called"""
+        self._method_called_function = func
+
+    def enable_track_list(self) -> bool:
+        """
+        Start tracking the org.mpris.MediaPlayer2.TrackList interface,
+        returns False if the player doesn't implement it
+        """
+        if self.track_list_proxy is not None:
+            return True
+
+        has_track_list = self.get_app_property("HasTrackList")
+        if has_track_list is None or not has_track_list.get_boolean():
+            return False
+
+        self.track_list_proxy = Gio.DBusProxy.new_for_bus_sync(
+            Gio.BusType.SESSION,
+            Gio.DBusProxyFlags.NONE,
+            None,
+            self._service_name,
+            "/org/mpris/MediaPlayer2",
+            "org.mpris.MediaPlayer2.TrackList",
+            None,
+        )
+        self.track_list_proxy.connect("g-signal", self._track_list_signal)
+        return True
+
+    def enable_playlists(self, callback: Callable[[bool], None]) -> None:
+        """
+        Asynchronously connect to the org.mpris.MediaPlayer2.Playlists interface,
+        the callback gets whether the player implements it
+        """
+        if self.playlists_proxy is not None:
+            callback(True)
+            return
+
+        Gio.DBusProxy.new_for_bus(
+            Gio.BusType.SESSION,
+            Gio.DBusProxyFlags.NONE,
+            None,
+            self._service_name,
+            "/org/mpris/MediaPlayer2",
+            "org.mpris.MediaPlayer2.Playlists",
+            None,
+            self._enable_playlists_callback,
+            callback,
+        )
+
+    def _enable_playlists_callback(
+        self, _, result: Gio.AsyncResult, callback: Callable[[bool], None]
+    ) -> None:
+        try:
+            proxy = Gio.DBusProxy.new_for_bus_finish(result)
+        except GLib.GError:
+            callback(False)
+            return
+
+        if proxy.get_cached_property("PlaylistCount") is None:
+            # the player doesn't implement the interface
+            callback(False)
+            return
+
+        self.playlists_proxy = proxy
+        callback(True)
+
+    def get_playlists_property(self, property_name: str) -> Optional[GLib.Variant]:
+        if self.playlists_proxy is None:
+            return None
+        return self.playlists_proxy.get_cached_property(property_name)
+
+    def get_track_list_tracks(self) -> list[str]:
+        if self.track_list_proxy is None:
+            return []
+        tracks = self.track_list_proxy.get_cached_property("Tracks")
+        if tracks is None:
+            return []
+        return tracks.unpack()
+
+    def get_tracks_metadata(
+        self,
+        track_ids: list[str],
+        callback: Callable[[Optional[list[GLib.Variant]]], None],
+        cancellable: Optional[Gio.Cancellable] = None,
+    ) -> None:
+        """
+        the callback gets the metadata (a{sv}) of the tracks,
+        or None if the call failed
+        """
+        if self.track_list_proxy is None or not track_ids:
+            callback(None)
+            return
+
+        self.track_list_proxy.call(
+            "GetTracksMetadata",
+            GLib.Variant("(ao)", (track_ids,)),
+            Gio.DBusCallFlags.NONE,
+            -1,
+            cancellable,
+            self._get_tracks_metadata_callback,
+            callback,
+        )
+
+    @staticmethod
+    def _get_tracks_metadata_callback(
+        source_object: Gio.DBusProxy,
+        result: Gio.Task,
+        data: Callable[[Optional[list[GLib.Variant]]], None],
+    ) -> None:
+        try:
+            content = source_object.call_finish(result)
+        except GLib.GError:
+            data(None)
+        else:
+            metadata = content.get_child_value(0)
+            data(
+                [metadata.get_child_value(i) for i in range(metadata.n_children())]
+            )
+
     def get_player_property(self, property_name: str) -> Optional[GLib.Variant]:
         return self.player_proxy.get_cached_property(property_name)
 
@@ -97,20 +228,32 @@ class MprisWrapper:
         return self.app_proxy.get_cached_property(property_name)
 
     def call_player_method(
-        self, method_name: str, callback: Optional[Callable] = None
+        self,
+        method_name: str,
+        callback: Optional[Callable] = None,
+        parameters: Optional[GLib.Variant] = None,
+        interface_name: str = "org.mpris.MediaPlayer2.Player",
+        cancellable: Optional[Gio.Cancellable] = None,
     ) -> None:
-        self.player_proxy.call(
+        """
+        Asynchronously call a method of the player, by default in the
+        org.mpris.MediaPlayer2.Player interface, the callback gets
+        the Gio.DBusProxy and the Gio.AsyncResult
+        """
+        self._method_called(method_name)
+        self._get_proxy(interface_name).call(
             method_name=method_name,
-            parameters=None,
+            parameters=parameters,
             flags=Gio.DBusCallFlags.NONE,
             timeout_msec=-1,
-            cancellable=None,
+            cancellable=cancellable,
             callback=callback,
         )
 
     def call_app_method(
         self, method_name: str, callback: Optional[Callable] = None
     ) -> None:
+        self._method_called(method_name)
         self.app_proxy.call(
             method_name=method_name,
             parameters=None,
@@ -120,6 +263,38 @@ class MprisWrapper:
             callback=callback,
         )
 
+    def _method_called(self, method_name: str) -> None:
+        if self._method_called_function is not None:
+            self._method_called_function(method_name)
+
+    def _get_proxy(self, interface_name: str) -> Gio.DBusProxy:
+        if interface_name == "org.mpris.MediaPlayer2.Player":
+            return self.player_proxy
+        if interface_name == "org.mpris.MediaPlayer2":
+            return self.app_proxy
+        if interface_name == "org.mpris.MediaPlayer2.TrackList" and (
+            self.track_list_proxy is not None
+        ):
+            return self.track_list_proxy
+        if interface_name == "org.mpris.MediaPlayer2.Playlists" and (
+            self.playlists_proxy is not None
+        ):
+            return self.playlists_proxy
+
+        proxy = self._other_proxies.get(interface_name)
+        if proxy is None:
+            proxy = Gio.DBusProxy.new_for_bus_sync(
+                Gio.BusType.SESSION,
+                Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES,
+                None,
+                self._service_name,
+                "/org/mpris/MediaPlayer2",
+                interface_name,
+                None,
+            )
+            self._other_proxies[interface_name] = proxy
+        return proxy
+
     def _player_property_changed(
         self, _, changed_properties: GLib.Variant, *__
     ) -> None:
@@ -139,3 +314,10 @@ class MprisWrapper:
             if func is None:
                 continue
             func(property_value)
+
+    def _track_list_signal(
+        self, _, __, signal_name: str, parameters: GLib.Variant
+    ) -> None:
+        func = self._connected_functions_track_list.get(signal_name)
+        if func is not None:
+            func(parameters)